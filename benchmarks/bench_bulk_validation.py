@@ -0,0 +1,57 @@
+"""
+Measures the validation throughput of a batch of contacts (100k rows by default):
+    before:  ContactSchema with EmailStr, validated one object at a time
+    after:   ContactSchema with the cached email domain checks, one object at a time
+    bulk:    the same rows through contacts_bulk_adapter, a single TypeAdapter(list[ContactSchema]) call
+The addresses share --domains domains, as imported address books do.
+
+Usage:
+    python -m benchmarks.bench_bulk_validation --rows 100000 --domains 50
+"""
+import argparse
+import time
+from collections.abc import Callable
+
+from pydantic import EmailStr, Field
+
+from src.schemas.contact import ContactSchema
+from src.services.bulk_validation import contacts_bulk_adapter, validate_rows
+
+
+class EmailStrContactSchema(ContactSchema):
+    email: EmailStr = Field(min_length=3, max_length=30)
+
+
+def make_rows(count: int, domains: int) -> list[dict]:
+    return [{"name": f"name_{i}", "last_name": f"last_name_{i}", "email": f"c{i}@Domain{i % domains}.com",
+             "phone_number": f"+38050{i % 10 ** 7:07d}", "birthday": f"19{50 + i % 50}-{1 + i % 12:02d}-{1 + i % 28:02d}"}
+            for i in range(count)]
+
+
+def measure(label: str, validate: Callable[[list[dict]], list], rows: list[dict]) -> float:
+    start = time.perf_counter()
+    validated = validate(rows)
+    elapsed = time.perf_counter() - start
+    assert len(validated) == len(rows)
+    print(f"{label:<36} {elapsed:7.2f} s {len(rows) / elapsed:10,.0f} rows/s")
+    return elapsed
+
+
+def main(count: int, domains: int) -> None:
+    rows = make_rows(count, domains)
+    before = measure("before, EmailStr per object", lambda batch: [EmailStrContactSchema.model_validate(row)
+                                                                   for row in batch], rows)
+    per_object = measure("cached domains per object", lambda batch: [ContactSchema.model_validate(row)
+                                                                     for row in batch], rows)
+    bulk = measure("cached domains, bulk adapter", lambda batch: validate_rows(contacts_bulk_adapter, batch)[0], rows)
+    assert [body.email for body in validate_rows(contacts_bulk_adapter, rows[:100])[0]] == \
+        [EmailStrContactSchema.model_validate(row).email for row in rows[:100]]
+    print(f"speedup: {before / per_object:.1f}x per object, {before / bulk:.1f}x bulk")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="contacts in the batch")
+    parser.add_argument("--domains", type=int, default=50, help="distinct email domains")
+    args = parser.parse_args()
+    main(args.rows, args.domains)
@@ -0,0 +1,111 @@
+"""
+Measures the cost of MetricsMiddleware on a representative endpoint.
+
+The contacts list is served by main:app from an in-memory SQLite database, the requests are
+sent straight to the ASGI application, alternating rounds with and without the middleware.
+The script exits with status 1 if the middleware adds more than --max-overhead percent
+to the best mean request time.
+
+Usage:
+    python -m benchmarks.bench_metrics_overhead --requests 500 --rounds 7
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import date
+from unittest.mock import AsyncMock
+
+from fastapi_limiter import FastAPILimiter
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from src.database.connect import get_db
+from src.entity.models import Base, User, Contact
+from src.services.auth import auth_service
+from src.services.metrics import MetricsMiddleware
+
+
+async def _prepare(contacts: int) -> User:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    user = User(id=uuid.uuid4(), username="bench", email="bench@example.com", password="-", email_verified=True)
+    async with session_maker() as session:
+        session.add(user)
+        session.add_all(Contact(name=f"name_{i}", last_name=f"last_name_{i}", email=f"contact_{i}@example.com",
+                                phone_number=f"+38050{i:07d}", birthday=date(1990, 1 + i % 12, 1 + i % 28),
+                                user_id=user.id) for i in range(contacts))
+        await session.commit()
+
+    async def override_get_db():
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[auth_service.get_current_user] = lambda: user
+    FastAPILimiter.redis = AsyncMock()
+    FastAPILimiter.identifier = AsyncMock()
+    FastAPILimiter.http_callback = AsyncMock()
+    return user
+
+
+def _build(with_metrics: bool):
+    middleware = app.user_middleware
+    if not with_metrics:
+        app.user_middleware = [item for item in middleware if item.cls is not MetricsMiddleware]
+    stack = app.build_middleware_stack()
+    app.user_middleware = middleware
+    return stack
+
+
+async def _request(asgi_app, path: str, query_string: bytes) -> None:
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query_string,
+             "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 50000),
+             "server": ("bench", 80), "app": app}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await asgi_app(scope, receive, send)
+
+
+async def _round(asgi_app, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await _request(asgi_app, "/rest_api/contacts/", b"limit=100")
+    return (time.perf_counter() - start) / requests
+
+
+async def main(requests: int, rounds: int, contacts: int, max_overhead: float) -> int:
+    await _prepare(contacts)
+    plain, instrumented = _build(with_metrics=False), _build(with_metrics=True)
+    await _round(plain, 50)
+    await _round(instrumented, 50)
+    plain_times, instrumented_times = [], []
+    for _ in range(rounds):
+        plain_times.append(await _round(plain, requests))
+        instrumented_times.append(await _round(instrumented, requests))
+    best_plain, best_instrumented = min(plain_times), min(instrumented_times)
+    overhead = (best_instrumented - best_plain) / best_plain * 100
+    print(f"without metrics: {best_plain * 1e6:.1f} us/request")
+    print(f"with metrics:    {best_instrumented * 1e6:.1f} us/request")
+    print(f"overhead:        {overhead:.2f}% (limit {max_overhead}%)")
+    return 0 if overhead < max_overhead else 1
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=7, help="rounds per configuration")
+    parser.add_argument("--contacts", type=int, default=100, help="contacts returned by every request")
+    parser.add_argument("--max-overhead", type=float, default=2.0, help="allowed overhead in percent")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.requests, args.rounds, args.contacts, args.max_overhead)))
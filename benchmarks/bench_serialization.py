@@ -0,0 +1,52 @@
+"""
+Compares the serialization of a contacts list (limit=500) through the default FastAPI path,
+response model validation + jsonable_encoder + json.dumps, with the precompiled response adapter.
+
+Usage:
+    python -m benchmarks.bench_serialization --contacts 500 --repeat 200
+"""
+import argparse
+import json
+import timeit
+import uuid
+from datetime import date
+
+from fastapi.encoders import jsonable_encoder
+
+from src.entity.models import Contact
+from src.schemas.contact import ContactResponse
+from src.services.serialization import contacts_adapter, render
+
+
+def make_contacts(count: int) -> list[Contact]:
+    user_id = uuid.uuid4()
+    return [Contact(id=i, name=f"name_{i}", last_name=f"last_name_{i}", email=f"contact_{i}@example.com",
+                    phone_number=f"+38050{i:07d}", birthday=date(1990, 1 + i % 12, 1 + i % 28), user_id=user_id)
+            for i in range(1, count + 1)]
+
+
+def default_path(contacts: list[Contact]) -> bytes:
+    models = [ContactResponse.model_validate(contact, from_attributes=True) for contact in contacts]
+    content = jsonable_encoder(models)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def adapter_path(contacts: list[Contact]) -> bytes:
+    return render(contacts_adapter, contacts)
+
+
+def main(count: int, repeat: int) -> None:
+    contacts = make_contacts(count)
+    assert json.loads(default_path(contacts)) == json.loads(adapter_path(contacts))
+    default = min(timeit.repeat(lambda: default_path(contacts), number=repeat, repeat=5)) / repeat
+    adapter = min(timeit.repeat(lambda: adapter_path(contacts), number=repeat, repeat=5)) / repeat
+    print(f"default FastAPI path: {default * 1000:8.3f} ms per {count} contacts")
+    print(f"response adapter:     {adapter * 1000:8.3f} ms per {count} contacts ({default / adapter:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, default=500, help="contacts in the list")
+    parser.add_argument("--repeat", type=int, default=200, help="serializations per measurement")
+    args = parser.parse_args()
+    main(args.contacts, args.repeat)
@@ -0,0 +1,92 @@
+"""
+Compares the throughput of server.py with one worker and with N workers.
+
+Each configuration is started as a subprocess on a free port, warmed up and then driven
+by a concurrent async client for a fixed duration. Redis must be reachable, because the
+lifespan of every worker initializes the rate limiter.
+
+Usage:
+    python -m benchmarks.bench_workers --workers 4 --duration 10 --concurrency 64 --path /api_service/livez
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(client: httpx.AsyncClient, url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(url)).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"server did not start: {url}")
+
+
+async def _drive(client: httpx.AsyncClient, url: str, duration: float, concurrency: int) -> int:
+    deadline = time.monotonic() + duration
+    done = 0
+
+    async def worker():
+        nonlocal done
+        while time.monotonic() < deadline:
+            await client.get(url)
+            done += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done
+
+
+async def measure(workers: int, path: str, duration: float, concurrency: int) -> float:
+    """
+    Start the server with the given number of workers and return the requests per second it served.
+    """
+    port = _free_port()
+    env = dict(os.environ, SERVER_HOST="127.0.0.1", SERVER_PORT=str(port), SERVER_WORKERS=str(workers))
+    process = subprocess.Popen([sys.executable, "server.py"], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}{path}"
+    try:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+            await _wait_ready(client, url)
+            await _drive(client, url, 2, concurrency)
+            requests = await _drive(client, url, duration, concurrency)
+        return requests / duration
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+
+
+async def main(workers: int, path: str, duration: float, concurrency: int) -> None:
+    single = await measure(1, path, duration, concurrency)
+    multi = await measure(workers, path, duration, concurrency)
+    print(f"1 worker:   {single:10.0f} requests/s")
+    print(f"{workers} workers: {multi:10.0f} requests/s ({multi / single:.2f}x)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="workers of the second run")
+    parser.add_argument("--duration", type=float, default=10, help="measured seconds per configuration")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent client connections")
+    parser.add_argument("--path", default="/api_service/livez", help="the requested path")
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.path, args.duration, args.concurrency))
@@ -0,0 +1,242 @@
+"""
+In-process stand-ins for Redis used by the benchmarks, so they run without external services.
+
+FakeRedis implements the subset of the synchronous redis-py client the application uses for its
+cache. FakeLimiterRedis answers the rate limiter script so that every request is allowed.
+"""
+import threading
+import time
+from typing import Any
+
+from fastapi_limiter import FastAPILimiter
+from redis.exceptions import WatchError
+
+from src.services import cache_redis
+
+
+def _encode(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode()
+    return str(value).encode()
+
+
+class FakeRedis:
+    """
+    A dict-backed, thread-safe replacement for the redis-py client covering strings, sets, hashes and expiry.
+    Values are returned as bytes, like the real client returns them.
+    """
+
+    def __init__(self):
+        self._data: dict[str, Any] = {}
+        self._expires: dict[str, float] = {}
+        # Bumped by every write to a key, for WATCH
+        self._versions: dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def _touch(self, name: str) -> None:
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    def _alive(self, name: str) -> bool:
+        expires = self._expires.get(name)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(name, None)
+            self._expires.pop(name, None)
+        return name in self._data
+
+    def ping(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    def get(self, name: str) -> bytes | None:
+        with self._lock:
+            return self._data[name] if self._alive(name) else None
+
+    def set(self, name: str, value: Any, ex: int | None = None, px: int | None = None, nx: bool = False,
+            xx: bool = False, keepttl: bool = False, get: bool = False) -> Any:
+        with self._lock:
+            exists = self._alive(name)
+            previous = self._data.get(name) if exists else None
+            if (nx and exists) or (xx and not exists):
+                return previous if get else None
+            self._data[name] = _encode(value)
+            self._touch(name)
+            if ex is not None or px is not None:
+                self._expires[name] = time.monotonic() + (ex if ex is not None else px / 1000)
+            elif not keepttl:
+                self._expires.pop(name, None)
+            return previous if get else True
+
+    def expire(self, name: str, time_: int, nx: bool = False) -> bool:
+        with self._lock:
+            if not self._alive(name) or (nx and name in self._expires):
+                return False
+            self._expires[name] = time.monotonic() + time_
+            self._touch(name)
+            return True
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            value = int(self._data[name]) + amount if self._alive(name) else amount
+            self._data[name] = _encode(value)
+            self._touch(name)
+            return value
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            deleted = 0
+            for name in names:
+                if self._alive(name):
+                    deleted += 1
+                    self._touch(name)
+                self._data.pop(name, None)
+                self._expires.pop(name, None)
+            return deleted
+
+    def exists(self, *names: str) -> int:
+        with self._lock:
+            return sum(self._alive(name) for name in names)
+
+    def sadd(self, name: str, *values: Any) -> int:
+        with self._lock:
+            if not self._alive(name):
+                self._data[name] = set()
+            members = self._data[name]
+            before = len(members)
+            members.update(_encode(value) for value in values)
+            self._touch(name)
+            return len(members) - before
+
+    def smembers(self, name: str) -> "set[bytes]":
+        with self._lock:
+            return set(self._data[name]) if self._alive(name) else set()
+
+    def srem(self, name: str, *values: Any) -> int:
+        with self._lock:
+            if not self._alive(name):
+                return 0
+            members = self._data[name]
+            before = len(members)
+            members.difference_update(_encode(value) for value in values)
+            self._touch(name)
+            return before - len(members)
+
+    def hget(self, name: str, key: Any) -> bytes | None:
+        with self._lock:
+            return self._data[name].get(_encode(key)) if self._alive(name) else None
+
+    def hgetall(self, name: str) -> dict[bytes, bytes]:
+        with self._lock:
+            return dict(self._data[name]) if self._alive(name) else {}
+
+    def hset(self, name: str, key: Any = None, value: Any = None, mapping: dict | None = None) -> int:
+        with self._lock:
+            if not self._alive(name):
+                self._data[name] = {}
+            fields = self._data[name]
+            items = dict(mapping or {})
+            if key is not None:
+                items[key] = value
+            added = sum(_encode(field) not in fields for field in items)
+            fields.update({_encode(field): _encode(item) for field, item in items.items()})
+            self._touch(name)
+            return added
+
+    def hincrby(self, name: str, key: Any, amount: int = 1) -> int:
+        with self._lock:
+            if not self._alive(name):
+                self._data[name] = {}
+            fields = self._data[name]
+            value = int(fields.get(_encode(key), 0)) + amount
+            fields[_encode(key)] = _encode(value)
+            self._touch(name)
+            return value
+
+
+class FakePipeline:
+    """
+    Queues commands and runs them on the FakeRedis when executed; with watched keys, only if none of
+    them was written since the WATCH, otherwise execute raises WatchError like redis-py.
+    """
+
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._commands: list[tuple[str, tuple, dict]] = []
+        self._watched: dict[str, int] = {}
+
+    def watch(self, *names: str) -> None:
+        with self._redis._lock:
+            self._watched.update({name: self._redis._versions.get(name, 0) for name in names})
+
+    def multi(self) -> None:
+        pass
+
+    def reset(self) -> None:
+        self._commands.clear()
+        self._watched.clear()
+
+    def __getattr__(self, name: str):
+        getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def __enter__(self) -> "FakePipeline":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.reset()
+
+    def execute(self) -> list:
+        with self._redis._lock:
+            try:
+                if any(self._redis._versions.get(name, 0) != version for name, version in self._watched.items()):
+                    raise WatchError("Watched variable changed.")
+                return [getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in self._commands]
+            finally:
+                self.reset()
+
+
+class FakeLimiterRedis:
+    """
+    Answers the fastapi-limiter Lua script with 0, which means the request is allowed.
+    """
+
+    async def evalsha(self, *args) -> int:
+        return 0
+
+    async def close(self) -> None:
+        pass
+
+
+async def _identifier(request) -> str:
+    return "benchmark"
+
+
+async def _http_callback(request, response, pexpire: int) -> None:
+    pass
+
+
+def install_fakes() -> FakeRedis:
+    """
+    Replace the Redis cache client and the rate limiter backend of the application with the in-process fakes.
+
+    Returns:
+        FakeRedis: The installed cache, to inspect it after a run.
+    """
+    cache = FakeRedis()
+    cache_redis.cache = cache
+    FastAPILimiter.redis = FakeLimiterRedis()
+    FastAPILimiter.lua_sha = "benchmark"
+    FastAPILimiter.identifier = _identifier
+    FastAPILimiter.http_callback = _http_callback
+    return cache
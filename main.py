@@ -1,23 +1,67 @@
+import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any
 
 import redis.asyncio as redis
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi_limiter import FastAPILimiter
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import HTMLResponse
 import uvicorn
 
-from src.routes import contacts, auth, custom_tasks, users, api_service
+from src.routes import contacts, auth, custom_tasks, users, api_service, metrics
 from src.conf.config import config
 from src.routes.auth import templates
+from src.services.health import health_prober
+from src.services.birthdays import birthday_digest_job
+from src.services.cache_redis import close_cache
+from src.database.connect import sessionmanager
+from src.database.sharding import shardmanager
+from src.services.metrics import MetricsMiddleware
+from src.services.serialization import FastJSONResponse
+from src.services.static_files import PrecompressedStaticFiles
+from src.database.instrumentation import QueryBudgetMiddleware
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    The lifespan of the application, run once by every worker process.
+    On start it opens the Redis pool used by the FastAPI limiter, starts the background health prober
+    and the daily birthday digest job, and builds the compressed variants of the static files.
+    On shutdown it stops the background tasks and closes the Redis pools and the database engines.
+    """
+    r = await redis.Redis(
+        host=config.REDIS_DOMAIN,
+        port=config.REDIS_PORT,
+        db=0,
+        password=config.REDIS_PASSWORD,
+    )
+    await FastAPILimiter.init(r)
+    health_prober.start()
+    birthday_digest_job.start()
+    await asyncio.to_thread(static_files.precompress)
+    yield
+    await health_prober.stop()
+    await birthday_digest_job.stop()
+    await r.close()
+    close_cache()
+    await sessionmanager.close()
+    if shardmanager is not None:
+        await shardmanager.close()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 BASE_DIR = Path(__file__).parent
 # Mount the static
-app.mount("/static", StaticFiles(directory=BASE_DIR.joinpath("src/static")), name="static")
+static_files = PrecompressedStaticFiles(directory=BASE_DIR.joinpath("src/static"),
+                                        max_age=config.STATIC_CACHE_MAX_AGE,
+                                        minimum_size=config.GZIP_MINIMUM_SIZE,
+                                        compresslevel=9)
+app.mount("/static", static_files, name="static")
 
 # Includes routers from src.routes
 app.include_router(custom_tasks.router)
@@ -25,6 +69,7 @@ app.include_router(auth.router, prefix="/rest_api")
 app.include_router(contacts.router, prefix="/rest_api")
 app.include_router(users.router, prefix="/rest_api")
 app.include_router(api_service.router)
+app.include_router(metrics.router)
 
 # connection CORS
 origins = ["*"]
@@ -40,21 +85,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compresses responses larger than GZIP_MINIMUM_SIZE for clients accepting gzip
+app.add_middleware(GZipMiddleware, minimum_size=config.GZIP_MINIMUM_SIZE, compresslevel=config.GZIP_COMPRESS_LEVEL)
 
-@app.on_event("startup")
-async def startup():
-    """
-    A function that is called when the application starts up.
-    It initializes a connection to a Redis database using the
-     provided configuration and initializes the FastAPI limiter.
-    """
-    r = await redis.Redis(
-        host=config.REDIS_DOMAIN,
-        port=config.REDIS_PORT,
-        db=0,
-        password=config.REDIS_PASSWORD,
-    )
-    await FastAPILimiter.init(r)
+# Counts the SQL statements of every request and logs the ones over SQL_QUERY_BUDGET
+app.add_middleware(QueryBudgetMiddleware, budget=config.SQL_QUERY_BUDGET)
+
+# Records per-route latency and status, added last so it also times the CORS middleware
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/", response_class=HTMLResponse)
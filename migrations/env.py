@@ -2,6 +2,7 @@ import asyncio
 from logging.config import fileConfig
 
 from sqlalchemy.engine import Connection
+from sqlalchemy import text
 # from sqlalchemy import engine_from_config
 from sqlalchemy.ext.asyncio import async_engine_from_config
 from sqlalchemy import pool
@@ -29,6 +30,24 @@ target_metadata = Base.metadata
 config.set_main_option("sqlalchemy.url", app_config.DB_URL)
 
 
+def database_urls() -> list[str]:
+    """The databases to migrate: DB_URL, then every shard of DB_SHARD_URLS that is not DB_URL.
+
+    Every shard has the same schema and its own alembic_version, so
+    `alembic upgrade head` brings all of them to the same revision, one
+    after the other. `alembic -x shard=N upgrade head` migrates only the
+    shard number N, e.g. to resume after a shard failed; `-x shard=main`
+    only DB_URL.
+    """
+    shard_urls = [url.strip() for url in app_config.DB_SHARD_URLS.split(",") if url.strip()]
+    shard = context.get_x_argument(as_dictionary=True).get("shard")
+    if shard == "main":
+        return [app_config.DB_URL]
+    if shard is not None:
+        return [shard_urls[int(shard)]]
+    return [app_config.DB_URL] + [url for url in shard_urls if url != app_config.DB_URL]
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -47,27 +66,33 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = config.get_main_option("sqlalchemy.url")
-    context.configure(
-        url=url,
-        target_metadata=target_metadata,
-        literal_binds=True,
-        dialect_opts={"paramstyle": "named"},
-    )
+    for url in database_urls():
+        context.configure(
+            url=url,
+            target_metadata=target_metadata,
+            literal_binds=True,
+            dialect_opts={"paramstyle": "named"},
+            transaction_per_migration=True,
+        )
 
-    with context.begin_transaction():
-        context.run_migrations()
+        with context.begin_transaction():
+            context.run_migrations()
 
 
 def run_migrations(connection: Connection):
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # Every migration commits on its own, so the helpers in migrations/helpers.py can use autocommit
+    # blocks, and DDL waiting too long for a lock fails instead of blocking the queries behind it
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(f"SET lock_timeout = {int(app_config.MIGRATION_LOCK_TIMEOUT_MS)}"))
+        connection.commit()
+    context.configure(connection=connection, target_metadata=target_metadata, transaction_per_migration=True)
     with context.begin_transaction():
         context.run_migrations()
 
 
-async def run_async_migrations():
+async def run_async_migrations(url: str):
     connectable = async_engine_from_config(
-        config.get_section(config.config_ini_section, {}),
+        {**config.get_section(config.config_ini_section, {}), "sqlalchemy.url": url},
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
@@ -85,7 +110,8 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    asyncio.run(run_async_migrations())
+    for url in database_urls():
+        asyncio.run(run_async_migrations(url))
 
 
 if context.is_offline_mode():
@@ -0,0 +1,126 @@
+"""
+Helpers for migrations that must not block the application on large tables.
+
+env.py runs every migration in its own transaction with lock_timeout set to MIGRATION_LOCK_TIMEOUT_MS,
+so DDL waiting for a lock held by a long transaction fails instead of stalling every query queued
+behind it; run the migration again later. The helpers below step out of the migration transaction
+with autocommit blocks: everything the migration did before them is committed first.
+
+Usage in a revision:
+    from migrations.helpers import create_index_concurrently, batched_update
+
+    def upgrade() -> None:
+        op.add_column('contacts', sa.Column('nickname', sa.String(50), nullable=True))
+        batched_update('contacts', "nickname = lower(name)", "nickname IS NULL", pause=0.05)
+        create_index_concurrently('ix_contacts_user_id_nickname', 'contacts', ['user_id', 'nickname'])
+"""
+import contextlib
+import logging
+import time
+
+from alembic import op
+from sqlalchemy import text
+
+logger = logging.getLogger(f"alembic.{__name__}")
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+@contextlib.contextmanager
+def lock_timeout(milliseconds: int):
+    """
+    Change lock_timeout for the statements of the block, PostgreSQL only; 0 waits without limit.
+    The previous value is restored when the block succeeds, a failed migration ends the session anyway.
+    """
+    if not _is_postgres():
+        yield
+        return
+    connection = op.get_bind()
+    previous = connection.execute(text("SHOW lock_timeout")).scalar()
+    connection.execute(text(f"SET lock_timeout = {int(milliseconds)}"))
+    yield
+    connection.execute(text(f"SET lock_timeout = '{previous}'"))
+
+
+def create_index_concurrently(name: str, table: str, columns: list, unique: bool = False, **kw) -> None:
+    """
+    Create an index without blocking writes to the table: CREATE INDEX CONCURRENTLY in an autocommit block.
+    An invalid index left behind by an interrupted build is dropped first. The build waits for the
+    running transactions, so lock_timeout is lifted for it. Other databases get a plain CREATE INDEX.
+
+    Parameters:
+        name (str): The name of the index.
+        table (str): The name of the table.
+        columns (list): The column names or expressions, as for op.create_index.
+        unique (bool): Whether to create a unique index.
+        **kw: Further op.create_index arguments, e.g. postgresql_where.
+
+    Returns:
+        None
+    """
+    if not _is_postgres():
+        op.create_index(name, table, columns, unique=unique, **kw)
+        return
+    with op.get_context().autocommit_block(), lock_timeout(0):
+        invalid = op.get_bind().execute(text(
+            "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+            "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"), {"name": name}).scalar()
+        if invalid:
+            logger.info("dropping the invalid index %s left by an interrupted build", name)
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+        start = time.perf_counter()
+        op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True, if_not_exists=True, **kw)
+        logger.info("index %s built in %.1f s", name, time.perf_counter() - start)
+
+
+def drop_index_concurrently(name: str, table: str) -> None:
+    """
+    Drop an index without blocking the queries on the table, in an autocommit block on PostgreSQL.
+    """
+    if not _is_postgres():
+        op.drop_index(name, table_name=table)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def batched_update(table: str, values: str, condition: str | None = None, params: dict | None = None,
+                   batch_size: int = 5000, pause: float = 0.0, key: str = "id") -> int:
+    """
+    Backfill a table with UPDATE statements over ranges of `batch_size` values of the integer key,
+    each committed on its own in an autocommit block, so row locks are held only briefly and
+    vacuum keeps up. Progress is logged after every batch; `pause` seconds between the batches
+    leave room for the application's queries.
+
+    Parameters:
+        table (str): The name of the table.
+        values (str): The SET clause, e.g. "email_key = lower(email)".
+        condition (str | None): An optional WHERE condition, e.g. "email_key IS NULL" to resume a backfill.
+        params (dict | None): Bound parameters of `values` and `condition`.
+        batch_size (int): The width of the key range updated per statement.
+        pause (float): The delay between two batches in seconds.
+        key (str): The integer column the ranges are taken over, the primary key by default.
+
+    Returns:
+        int: The number of updated rows.
+    """
+    statement = text(f"UPDATE {table} SET {values} WHERE {key} >= :low AND {key} < :high"
+                     + (f" AND ({condition})" if condition else ""))
+    updated = 0
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        low, high = connection.execute(text(f"SELECT min({key}), max({key}) FROM {table}")).one()
+        if low is None:
+            return updated
+        start = time.perf_counter()
+        for batch_low in range(low, high + 1, batch_size):
+            result = connection.execute(statement, {**(params or {}), "low": batch_low, "high": batch_low + batch_size})
+            updated += result.rowcount
+            done = (min(batch_low + batch_size, high + 1) - low) / (high + 1 - low)
+            logger.info("%s: %d rows updated, %.0f%% of the key range, %.0f rows/s", table, updated, done * 100,
+                        updated / max(time.perf_counter() - start, 1e-9))
+            if pause:
+                time.sleep(pause)
+    return updated
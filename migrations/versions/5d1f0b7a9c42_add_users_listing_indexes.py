@@ -0,0 +1,28 @@
+"""add users listing indexes
+
+Revision ID: 5d1f0b7a9c42
+Revises: 33563103e662
+Create Date: 2026-10-18 10:12:03.512447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1f0b7a9c42'
+down_revision: Union[str, None] = '33563103e662'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_users_created_at'), 'users', ['created_at'], unique=False)
+    op.create_index('ix_users_email_verified_created_at', 'users', ['email_verified', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_verified_created_at', table_name='users')
+    op.drop_index(op.f('ix_users_created_at'), table_name='users')
@@ -0,0 +1,82 @@
+"""add contacts phone and email keys
+
+Revision ID: 8b3e2c6f1d07
+Revises: 5d1f0b7a9c42
+Create Date: 2026-10-19 09:41:27.204118
+
+"""
+from typing import Sequence, Union
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3e2c6f1d07'
+down_revision: Union[str, None] = '5d1f0b7a9c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+# The default country code of the application when this revision was written
+DEFAULT_COUNTRY_CODE = "380"
+NOT_DIGITS = re.compile(r"\D")
+
+
+# Copies of src.services.normalization as of this revision, so later changes to the application
+# do not change what this migration writes
+def normalize_email(email: str | None) -> str | None:
+    if not email:
+        return None
+    return email.strip().lower() or None
+
+
+def normalize_phone(phone_number: str | None) -> str | None:
+    if not phone_number:
+        return None
+    phone_number = phone_number.strip()
+    digits = NOT_DIGITS.sub("", phone_number)
+    if phone_number.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = DEFAULT_COUNTRY_CODE + digits[1:]
+    elif not digits.startswith(DEFAULT_COUNTRY_CODE):
+        digits = DEFAULT_COUNTRY_CODE + digits
+    if not 7 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
+
+
+def backfill_keys() -> None:
+    """
+    Fill phone_key and email_key of the existing contacts, BATCH_SIZE rows at a time in id order.
+    Every batch is committed on its own in an autocommit block, so its row locks are released at once.
+    """
+    select_batch = sa.text("SELECT id, phone_number, email FROM contacts WHERE id > :last_id ORDER BY id LIMIT :limit")
+    update_row = sa.text("UPDATE contacts SET phone_key = :phone_key, email_key = :email_key WHERE id = :id")
+    last_id = 0
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        while rows := connection.execute(select_batch, {"last_id": last_id, "limit": BATCH_SIZE}).all():
+            connection.execute(update_row, [{"id": row.id, "phone_key": normalize_phone(row.phone_number),
+                                             "email_key": normalize_email(row.email)} for row in rows])
+            last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('phone_key', sa.String(length=16), nullable=True))
+    op.add_column('contacts', sa.Column('email_key', sa.String(length=50), nullable=True))
+    backfill_keys()
+    op.create_index('ix_contacts_user_id_phone_key', 'contacts', ['user_id', 'phone_key'], unique=False)
+    op.create_index('ix_contacts_user_id_email_key', 'contacts', ['user_id', 'email_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_user_id_email_key', table_name='contacts')
+    op.drop_index('ix_contacts_user_id_phone_key', table_name='contacts')
+    op.drop_column('contacts', 'email_key')
+    op.drop_column('contacts', 'phone_key')
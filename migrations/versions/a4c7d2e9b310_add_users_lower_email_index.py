@@ -0,0 +1,30 @@
+"""add users lower email index
+
+Revision ID: a4c7d2e9b310
+Revises: 8b3e2c6f1d07
+Create Date: 2026-10-19 11:05:52.730614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7d2e9b310'
+down_revision: Union[str, None] = '8b3e2c6f1d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT lower(email) FROM users GROUP BY lower(email) HAVING count(*) > 1 LIMIT 10")).scalars().all()
+    if duplicates:
+        raise RuntimeError(f"Users differing only by email case must be merged first: {', '.join(duplicates)}")
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower', table_name='users')
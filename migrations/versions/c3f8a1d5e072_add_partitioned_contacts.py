@@ -0,0 +1,86 @@
+"""add partitioned contacts
+
+Revision ID: c3f8a1d5e072
+Revises: a4c7d2e9b310
+Create Date: 2026-10-19 14:12:08.516230
+
+First step of moving contacts to a table hash-partitioned by user_id, PostgreSQL only.
+It creates contacts_partitioned with CONTACTS_PARTITIONS partitions next to contacts and a trigger
+that mirrors every write to contacts into it. The existing rows are copied online by
+scripts/partition_contacts.py; revision e7b2c9f4a618 then swaps the tables.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from src.conf.config import config
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a1d5e072'
+down_revision: Union[str, None] = 'a4c7d2e9b310'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ("id", "name", "last_name", "email", "phone_number", "birthday", "phone_key", "email_key", "user_id")
+COLUMN_LIST = ", ".join(COLUMNS)
+NEW_VALUES = ", ".join(f"($1).{column}" for column in COLUMNS)
+
+# Mirrors a row of the table the trigger is on into the table named by the trigger argument.
+# Rows without an owner are not mirrored, the partition key is NOT NULL.
+MIRROR_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION contacts_mirror() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        EXECUTE format('DELETE FROM %I WHERE id = $1 AND user_id = $2', TG_ARGV[0]) USING OLD.id, OLD.user_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL THEN
+        EXECUTE format('INSERT INTO %I ({COLUMN_LIST}) VALUES ({NEW_VALUES}) ON CONFLICT DO NOTHING',
+                       TG_ARGV[0])
+            USING NEW;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("""
+        CREATE TABLE contacts_partitioned (
+            id integer NOT NULL DEFAULT nextval('contacts_id_seq'),
+            name varchar(50) NOT NULL,
+            last_name varchar(50) NOT NULL,
+            email varchar(50) NOT NULL,
+            phone_number varchar NOT NULL,
+            birthday date NOT NULL,
+            phone_key varchar(16),
+            email_key varchar(50),
+            user_id uuid NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            CONSTRAINT contacts_partitioned_pkey PRIMARY KEY (id, user_id)
+        ) PARTITION BY HASH (user_id)
+    """)
+    partitions = config.CONTACTS_PARTITIONS
+    for remainder in range(partitions):
+        op.execute(f"CREATE TABLE contacts_p{remainder} PARTITION OF contacts_partitioned "
+                   f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})")
+    # Indexes of a partitioned table are created on every partition; the names get the final
+    # ix_contacts_* form when the tables are swapped
+    op.execute("CREATE INDEX ix_contacts_partitioned_name ON contacts_partitioned (name)")
+    op.execute("CREATE INDEX ix_contacts_partitioned_user_id_phone_key "
+               "ON contacts_partitioned (user_id, phone_key)")
+    op.execute("CREATE INDEX ix_contacts_partitioned_user_id_email_key "
+               "ON contacts_partitioned (user_id, email_key)")
+    op.execute(MIRROR_FUNCTION)
+    op.execute("CREATE TRIGGER contacts_mirror AFTER INSERT OR UPDATE OR DELETE ON contacts "
+               "FOR EACH ROW EXECUTE FUNCTION contacts_mirror('contacts_partitioned')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP TRIGGER IF EXISTS contacts_mirror ON contacts")
+    op.execute("DROP FUNCTION IF EXISTS contacts_mirror()")
+    op.execute("DROP TABLE IF EXISTS contacts_partitioned")
@@ -0,0 +1,115 @@
+"""swap in partitioned contacts
+
+Revision ID: e7b2c9f4a618
+Revises: c3f8a1d5e072
+Create Date: 2026-10-19 14:37:45.082961
+
+Second step of the move to the partitioned contacts table, PostgreSQL only. Rows the copy script
+has not copied yet are copied first, in id ranges of CATCH_UP_BATCH rows committed one by one, so
+on large tables run scripts/partition_contacts.py before to keep the migration short. Writes made
+meanwhile are mirrored by the trigger. Only the swap itself holds the ACCESS EXCLUSIVE lock: a few
+renames, milliseconds once the lock is granted, blocking the contact queries for that long.
+
+Contacts without an owner (user_id IS NULL) cannot be stored in a table partitioned by user_id and
+are not copied, so the migration refuses to run while there are any. They are not visible to any
+user; delete them (DELETE FROM contacts WHERE user_id IS NULL) or assign them to a user first.
+
+The old table stays as contacts_unpartitioned and is kept in sync by the mirror trigger for a
+downgrade; drop it with scripts/partition_contacts.py --drop-unpartitioned once the partitioned
+table has proven itself. Its primary key is the id alone while the partitioned table's is
+(id, user_id): the trigger skips a row whose id is already taken in contacts_unpartitioned
+(ON CONFLICT DO NOTHING), which only rows inserted with an explicit id of another user's contact
+can hit, as every other id comes from the shared contacts_id_seq. The downgrade counts the rows
+contacts_unpartitioned is missing and refuses to run while there are any, instead of losing them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b2c9f4a618'
+down_revision: Union[str, None] = 'c3f8a1d5e072'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, name, last_name, email, phone_number, birthday, phone_key, email_key, user_id"
+CONSTRAINTS = ("pkey", "user_id_fkey")
+INDEXES = ("name", "user_id_phone_key", "user_id_email_key")
+CATCH_UP_BATCH = 10_000
+CATCH_UP_RANGE = text(f"""
+    WITH batch AS (
+        SELECT {COLUMNS} FROM contacts c
+        WHERE id >= :low AND id < :high AND user_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM contacts_partitioned p WHERE p.id = c.id AND p.user_id = c.user_id)
+        FOR SHARE
+    )
+    INSERT INTO contacts_partitioned ({COLUMNS}) SELECT {COLUMNS} FROM batch ON CONFLICT DO NOTHING
+""")
+
+
+def _catch_up() -> None:
+    """
+    Copy the rows neither copied by scripts/partition_contacts.py nor mirrored, one committed range at a time.
+    """
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        ownerless = connection.execute(text("SELECT count(*) FROM contacts WHERE user_id IS NULL")).scalar()
+        if ownerless:
+            raise RuntimeError(f"{ownerless} contacts have no user_id and would be lost by the partitioned "
+                               f"table; delete them or assign them to a user, see the revision docstring")
+        low, high = connection.execute(text("SELECT min(id), max(id) FROM contacts")).one()
+        if low is None:
+            return
+        for batch_low in range(low, high + 1, CATCH_UP_BATCH):
+            connection.execute(CATCH_UP_RANGE, {"low": batch_low, "high": batch_low + CATCH_UP_BATCH})
+
+
+def _check_mirrored() -> None:
+    """
+    Refuse the downgrade while contacts_unpartitioned lacks rows of the partitioned table.
+    """
+    missing = op.get_bind().execute(text(
+        "SELECT count(*) FROM contacts c WHERE NOT EXISTS "
+        "(SELECT 1 FROM contacts_unpartitioned u WHERE u.id = c.id AND u.user_id = c.user_id)")).scalar()
+    if missing:
+        raise RuntimeError(f"{missing} contacts are missing from contacts_unpartitioned, their ids are taken "
+                           f"there by other rows; give them new ids before the downgrade, see the revision "
+                           f"docstring")
+
+
+def _swap(replacement: str, retired: str) -> None:
+    """
+    Put `replacement` in place of the contacts table, which is renamed to `retired`, with the constraint
+    and index names following the tables, and let the mirror trigger now copy writes into `retired`.
+    """
+    op.execute("LOCK TABLE contacts IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER contacts_mirror ON contacts")
+    op.execute(f"ALTER TABLE contacts RENAME TO {retired}")
+    for constraint in CONSTRAINTS:
+        op.execute(f"ALTER TABLE {retired} RENAME CONSTRAINT contacts_{constraint} TO {retired}_{constraint}")
+    for index in INDEXES:
+        op.execute(f"ALTER INDEX ix_contacts_{index} RENAME TO ix_{retired}_{index}")
+    op.execute(f"ALTER TABLE {replacement} RENAME TO contacts")
+    for constraint in CONSTRAINTS:
+        op.execute(f"ALTER TABLE contacts RENAME CONSTRAINT {replacement}_{constraint} TO contacts_{constraint}")
+    for index in INDEXES:
+        op.execute(f"ALTER INDEX ix_{replacement}_{index} RENAME TO ix_contacts_{index}")
+    op.execute("ALTER SEQUENCE contacts_id_seq OWNED BY contacts.id")
+    op.execute(f"CREATE TRIGGER contacts_mirror AFTER INSERT OR UPDATE OR DELETE ON contacts "
+               f"FOR EACH ROW EXECUTE FUNCTION contacts_mirror('{retired}')")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    _catch_up()
+    _swap("contacts_partitioned", "contacts_unpartitioned")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    _check_mirrored()
+    _swap("contacts_unpartitioned", "contacts_partitioned")
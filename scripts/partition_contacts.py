@@ -0,0 +1,134 @@
+"""
+Copies the existing contacts into the hash-partitioned table while the application keeps running.
+
+The move to the partitioned table takes three steps on PostgreSQL:
+
+1. alembic upgrade c3f8a1d5e072 creates contacts_partitioned, CONTACTS_PARTITIONS partitions by
+   user_id, and a trigger mirroring every new write to contacts into it.
+2. This script copies the rows that existed before, in id ranges of --batch-size rows, one short
+   transaction per range with a --pause between them to limit the load. The source rows of a range
+   are locked FOR SHARE while they are copied, so a concurrent update is either copied or mirrored,
+   never lost. An interrupted run continues with --start-id; copying a row twice does nothing.
+   --verify compares the row counts of both tables.
+   Contacts without an owner (user_id IS NULL) cannot be partitioned: the copy does not start
+   while there are any; delete them or assign them to a user first.
+3. alembic upgrade e7b2c9f4a618 copies what is left in short transactions, then swaps the tables
+   under an ACCESS EXCLUSIVE lock held only for the renames. The old table stays as
+   contacts_unpartitioned, kept in sync for a downgrade, until --drop-unpartitioned drops it.
+
+Usage:
+    python -m scripts.partition_contacts --batch-size 20000 --pause 0.1
+    python -m scripts.partition_contacts --verify
+    python -m scripts.partition_contacts --drop-unpartitioned
+"""
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+
+from scripts.seed_dataset import Progress
+from src.conf.config import config
+
+COLUMNS = "id, name, last_name, email, phone_number, birthday, phone_key, email_key, user_id"
+COPY_RANGE = text(f"""
+    WITH batch AS (
+        SELECT {COLUMNS} FROM contacts
+        WHERE id > :low AND id <= :high AND user_id IS NOT NULL
+        FOR SHARE
+    )
+    INSERT INTO contacts_partitioned ({COLUMNS}) SELECT {COLUMNS} FROM batch ON CONFLICT DO NOTHING
+""")
+
+
+async def _table_exists(engine: AsyncEngine, table: str) -> bool:
+    async with engine.connect() as connection:
+        return (await connection.execute(text("SELECT to_regclass(:table)"), {"table": table})).scalar() is not None
+
+
+async def count_ownerless(engine: AsyncEngine) -> int:
+    """
+    Count the contacts without a user, which the partitioned table cannot hold.
+    """
+    async with engine.connect() as connection:
+        return (await connection.execute(text("SELECT count(*) FROM contacts WHERE user_id IS NULL"))).scalar()
+
+
+async def copy_contacts(engine: AsyncEngine, batch_size: int, pause: float, start_id: int) -> None:
+    """
+    Copy the contacts with ids above `start_id` up to the highest id at the start; later rows are mirrored.
+    """
+    async with engine.connect() as connection:
+        max_id = (await connection.execute(text("SELECT coalesce(max(id), 0) FROM contacts"))).scalar()
+    progress = Progress("contacts_partitioned")
+    low = start_id
+    while low < max_id:
+        high = min(low + batch_size, max_id)
+        async with engine.begin() as connection:
+            result = await connection.execute(COPY_RANGE, {"low": low, "high": high})
+        progress.add(result.rowcount)
+        print(f"  up to id {high}", end="", flush=True)
+        low = high
+        await asyncio.sleep(pause)
+    progress.done()
+
+
+async def verify(engine: AsyncEngine) -> bool:
+    """
+    Compare the number of owned contacts with the number of rows in the partitioned table.
+    """
+    async with engine.connect() as connection:
+        source = (await connection.execute(text("SELECT count(*) FROM contacts WHERE user_id IS NOT NULL"))).scalar()
+        target = (await connection.execute(text("SELECT count(*) FROM contacts_partitioned"))).scalar()
+    print(f"contacts: {source:,} rows, contacts_partitioned: {target:,} rows")
+    return source == target
+
+
+async def drop_unpartitioned(engine: AsyncEngine) -> None:
+    """
+    Drop the table left behind by the swap and the trigger keeping it in sync.
+    """
+    async with engine.begin() as connection:
+        await connection.execute(text("DROP TRIGGER IF EXISTS contacts_mirror ON contacts"))
+        await connection.execute(text("DROP TABLE contacts_unpartitioned"))
+    print("contacts_unpartitioned dropped")
+
+
+async def main(args: argparse.Namespace) -> int:
+    engine = create_async_engine(args.database_url)
+    try:
+        if engine.dialect.name != "postgresql":
+            print("only PostgreSQL tables are partitioned")
+            return 1
+        if args.drop_unpartitioned:
+            if not await _table_exists(engine, "contacts_unpartitioned"):
+                print("contacts_unpartitioned does not exist, the tables have not been swapped")
+                return 1
+            await drop_unpartitioned(engine)
+            return 0
+        if not await _table_exists(engine, "contacts_partitioned"):
+            print("contacts_partitioned does not exist, run alembic upgrade c3f8a1d5e072 first")
+            return 1
+        ownerless = await count_ownerless(engine)
+        if ownerless:
+            print(f"{ownerless:,} contacts have no user_id and cannot be partitioned; "
+                  f"delete them or assign them to a user first")
+            return 1
+        if not args.verify:
+            await copy_contacts(engine, args.batch_size, args.pause, args.start_id)
+        return 0 if await verify(engine) else 1
+    finally:
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=config.DB_URL, help="the database, DB_URL by default")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="ids per copy transaction")
+    parser.add_argument("--pause", type=float, default=0.05, help="seconds to wait between two batches")
+    parser.add_argument("--start-id", type=int, default=0, help="continue an interrupted copy after this id")
+    parser.add_argument("--verify", action="store_true", help="only compare the row counts")
+    parser.add_argument("--drop-unpartitioned", action="store_true",
+                        help="drop the old table after the swap")
+    sys.exit(asyncio.run(main(parser.parse_args())))
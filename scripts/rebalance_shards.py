@@ -0,0 +1,159 @@
+"""
+Moves the contacts of users to the shard the hash ring assigns them, e.g. after a shard was added
+to DB_SHARD_URLS: the ring then sends about 1/N of the users to the new shard, whose contacts are
+still on the old one.
+
+The contacts of a user are copied in batches of --batch-size rows, each batch committed on the
+target before it is deleted from the source. Every shard numbers its contacts with its own sequence,
+so a moved contact gets a new id from the target: its old id may belong to another contact there.
+The old and new ids are appended to the --mapping CSV file (user_id,old_id,new_id) once the batch is
+committed on the target; clients holding old ids can be pointed to the new ones with it. A run reads
+the file first and skips the contacts an interrupted run already copied; a run interrupted between
+the commit of a batch and its lines in the file copies that batch once more.
+The copies of the user rows are left on the source shards; they are harmless and may be the real
+rows when DB_URL is one of the shards. Afterwards the cached ETags, contact counters and birthday
+digests of the moved users are dropped. Writes keep going to the ring shard while a user is moved,
+only reads miss the contacts not moved yet.
+
+Usage:
+    python -m scripts.rebalance_shards --user-id 1b4e28ba-2fa1-11d2-883f-0016d3cca427
+    python -m scripts.rebalance_shards --all --dry-run
+"""
+import argparse
+import asyncio
+import csv
+import os
+import sys
+import uuid
+
+from sqlalchemy import select, delete
+
+from src.conf.config import config
+from src.database.sharding import ShardedSessionManager
+from src.entity.models import Contact, User
+from src.services.birthdays import invalidate_birthday_digest
+from src.services.contact_stats import invalidate_contact_stats
+from src.services.etag import bump_data_version
+
+COPIED = ("name", "last_name", "email", "phone_number", "birthday")
+
+
+class IdMapping:
+    """
+    The old and new ids of the moved contacts, by user, kept in a CSV file when a path is given.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.ids: dict[uuid.UUID, dict[int, int]] = {}
+        if path and os.path.exists(path):
+            with open(path, newline="") as file:
+                for user_id, old_id, new_id in csv.reader(file):
+                    self.ids.setdefault(uuid.UUID(user_id), {})[int(old_id)] = int(new_id)
+
+    def record(self, user_id: uuid.UUID, moves: dict[int, int]) -> None:
+        """
+        Remember the new ids of a batch, on disk before the batch is deleted from the source.
+        """
+        self.ids.setdefault(user_id, {}).update(moves)
+        if self.path:
+            with open(self.path, "a", newline="") as file:
+                csv.writer(file).writerows((user_id, old_id, new_id) for old_id, new_id in moves.items())
+                file.flush()
+                os.fsync(file.fileno())
+
+
+async def move_user(manager: ShardedSessionManager, user_id: uuid.UUID, source: int, batch_size: int,
+                    mapping: IdMapping | None = None) -> dict[int, int]:
+    """
+    Move the contacts of the user from the shard number `source` to the user's ring shard.
+
+    Returns:
+        dict[int, int]: The new id of every moved contact by its old id.
+    """
+    target = manager.shard_for(user_id)
+    mapping = mapping or IdMapping()
+    moved = {}
+    if target == source:
+        return moved
+    async with manager.shards[source].session(reraise=True) as source_db, \
+            manager.shards[target].session(reraise=True) as target_db:
+        user = await source_db.get(User, user_id)
+        if user is None:
+            return moved
+        # Detached, so the commits below do not expire the attributes used to drop the caches
+        source_db.expunge(user)
+        await manager.ensure_user(user, target_db)
+        known = mapping.ids.get(user_id, {})
+        request = select(Contact).filter_by(user_id=user_id).order_by(Contact.id).limit(batch_size)
+        while contacts := (await source_db.execute(request)).scalars().all():
+            contact_ids = [contact.id for contact in contacts]
+            # Copied by an interrupted run: the new id is recorded and the contact is on the target
+            copied = set((await target_db.execute(select(Contact.id).where(
+                Contact.user_id == user_id,
+                Contact.id.in_([known[old_id] for old_id in contact_ids if old_id in known])))).scalars())
+            moves = {old_id: known[old_id] for old_id in contact_ids if known.get(old_id) in copied}
+            copies = {contact.id: Contact(**{field: getattr(contact, field) for field in COPIED}, user_id=user_id)
+                      for contact in contacts if contact.id not in moves}
+            target_db.add_all(copies.values())
+            await target_db.flush()
+            new_ids = {old_id: copy.id for old_id, copy in copies.items()}
+            await target_db.commit()
+            mapping.record(user_id, new_ids)
+            moves.update(new_ids)
+            await source_db.execute(delete(Contact).where(Contact.user_id == user_id, Contact.id.in_(contact_ids)))
+            await source_db.commit()
+            moved.update(moves)
+        bump_data_version(user.email)
+        invalidate_contact_stats(user)
+        invalidate_birthday_digest(user)
+    return moved
+
+
+async def misplaced_users(manager: ShardedSessionManager, shard: int) -> list[uuid.UUID]:
+    """
+    The users with contacts on the shard number `shard` whose ring shard is another one.
+    """
+    async with manager.shards[shard].session() as db:
+        user_ids = (await db.execute(select(Contact.user_id).distinct())).scalars().all()
+    return [user_id for user_id in user_ids if user_id is not None and manager.shard_for(user_id) != shard]
+
+
+async def main(args: argparse.Namespace) -> int:
+    urls = [url.strip() for url in args.shard_urls.split(",") if url.strip()]
+    if not urls:
+        print("no shards, set DB_SHARD_URLS or --shard-urls")
+        return 1
+    manager = ShardedSessionManager(urls)
+    mapping = IdMapping(args.mapping)
+    try:
+        for shard in range(len(urls)):
+            user_ids = await misplaced_users(manager, shard)
+            if args.user_id:
+                user_ids = [user_id for user_id in user_ids if user_id == args.user_id]
+            for user_id in user_ids:
+                target = manager.shard_for(user_id)
+                if args.dry_run:
+                    print(f"{user_id}: shard {shard} -> {target}")
+                    continue
+                moved = await move_user(manager, user_id, shard, args.batch_size, mapping)
+                if moved:
+                    print(f"{user_id}: {len(moved)} contacts moved from shard {shard} to {target}, "
+                          f"new ids in {args.mapping}")
+    finally:
+        await manager.close()
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shard-urls", default=config.DB_SHARD_URLS,
+                        help="comma-separated shard URLs in ring order, DB_SHARD_URLS by default")
+    users = parser.add_mutually_exclusive_group(required=True)
+    users.add_argument("--user-id", type=uuid.UUID, help="move the contacts of this user")
+    users.add_argument("--all", action="store_true", help="move the contacts of every misplaced user")
+    parser.add_argument("--batch-size", type=int, default=1000, help="contacts moved per transaction")
+    parser.add_argument("--mapping", default="contact_id_moves.csv",
+                        help="CSV file the old and new contact ids are appended to, read to resume a run")
+    parser.add_argument("--dry-run", action="store_true", help="only print the moves")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,188 @@
+"""
+Seeds a database with a large synthetic dataset of users and contacts for benchmarks and capacity planning.
+
+Rows are produced by streaming generators, so memory stays flat whatever the size, and the same
+--seed always produces the same rows. The password of every user is "password"; it is hashed with
+bcrypt once and the hash is reused for all of them.
+
+PostgreSQL is loaded with COPY through asyncpg's copy_records_to_table; the tables must exist
+(alembic upgrade head). A SQLite URL falls back to executemany on the standard sqlite3 module,
+with journaling turned off, and creates the tables itself.
+
+Usage:
+    python -m scripts.seed_dataset --users 100000 --contacts-per-user 20
+    python -m scripts.seed_dataset --database-url sqlite+aiosqlite:///./seed.db --users 10000
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import random
+import sqlite3
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator
+
+from sqlalchemy import create_engine, make_url
+
+from src.conf.config import config
+from src.entity.models import Base
+from src.services.normalization import normalize_email, normalize_phone
+
+PASSWORD = "password"
+FIRST_NAMES = ("Olena", "Andrii", "Iryna", "Taras", "Oksana", "Dmytro", "Sofiia", "Maksym", "Anna", "Bohdan",
+               "Kateryna", "Serhii", "Yuliia", "Oleh", "Mariia", "Ivan", "Natalia", "Yurii", "Daria", "Petro")
+LAST_NAMES = ("Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko", "Oliinyk", "Shevchuk",
+              "Polishchuk", "Lysenko", "Moroz", "Marchenko", "Savchenko", "Rudenko", "Melnyk", "Boiko")
+DOMAINS = ("gmail.com", "ukr.net", "outlook.com", "i.ua", "meta.ua", "example.com")
+OPERATOR_CODES = (50, 63, 66, 67, 68, 73, 93, 95, 96, 97, 98, 99)
+USER_COLUMNS = ("id", "username", "email", "password", "email_verified", "open_verification_letter",
+                "created_at", "updated_at")
+CONTACT_COLUMNS = ("name", "last_name", "email", "phone_number", "birthday", "phone_key", "email_key", "user_id")
+EPOCH = datetime(2023, 1, 1)
+
+
+def user_id(seed: int, index: int) -> uuid.UUID:
+    """
+    The id of the user number `index`, derived from the seed so contacts can refer to users without keeping them.
+
+    >>> user_id(0, 1) == user_id(0, 1) != user_id(1, 1)
+    True
+    """
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=16).digest()
+    return uuid.UUID(bytes=digest, version=4)
+
+
+def generate_users(count: int, seed: int, password_hash: str) -> Iterator[tuple]:
+    """
+    Yield user rows in USER_COLUMNS order.
+    """
+    rng = random.Random(seed)
+    for index in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created_at = EPOCH + timedelta(seconds=rng.randrange(3 * 365 * 24 * 3600))
+        yield (user_id(seed, index), f"{first.lower()}_{index}", f"{first.lower()}.{last.lower()}.{index}"
+               f"@{rng.choice(DOMAINS)}", password_hash, rng.random() < 0.9, rng.random() < 0.7, created_at,
+               created_at)
+
+
+def generate_contacts(users: int, per_user: int, seed: int) -> Iterator[tuple]:
+    """
+    Yield contact rows in CONTACT_COLUMNS order, between 0 and 2 * per_user contacts for every user.
+    """
+    rng = random.Random(seed + 1)
+    for index in range(users):
+        owner = user_id(seed, index)
+        for _ in range(rng.randint(0, 2 * per_user)):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            birthday = date(1950, 1, 1) + timedelta(days=rng.randrange(55 * 365))
+            email = f"{first[0]}{last}{rng.randrange(1000)}@{rng.choice(DOMAINS)}"
+            phone_number = f"0{rng.choice(OPERATOR_CODES)} {rng.randrange(10 ** 7):07d}"
+            yield (first, last, email, phone_number, birthday, normalize_phone(phone_number), normalize_email(email),
+                   owner)
+
+
+def batched(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    """
+    >>> list(batched(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+    """
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class Progress:
+    """
+    Prints the loaded rows and the rate after every batch.
+    """
+
+    def __init__(self, table: str):
+        self.table = table
+        self.rows = 0
+        self.start = time.perf_counter()
+
+    def add(self, rows: int) -> None:
+        self.rows += rows
+        elapsed = time.perf_counter() - self.start
+        print(f"\r{self.table}: {self.rows:>12,} rows, {self.rows / elapsed * 60:>14,.0f} rows/min", end="",
+              flush=True)
+
+    def done(self) -> None:
+        print()
+
+
+async def load_postgres(url: str, tables: dict[str, tuple[tuple, Iterable[tuple]]], batch_size: int) -> None:
+    """
+    Load the rows with COPY, one copy_records_to_table call per batch.
+    """
+    import asyncpg
+
+    dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+    connection = await asyncpg.connect(dsn)
+    try:
+        for table, (columns, rows) in tables.items():
+            progress = Progress(table)
+            for batch in batched(rows, batch_size):
+                await connection.copy_records_to_table(table, records=batch, columns=columns)
+                progress.add(len(batch))
+            progress.done()
+    finally:
+        await connection.close()
+
+
+def _sqlite_value(value):
+    if isinstance(value, uuid.UUID):
+        return value.hex
+    if isinstance(value, (date, datetime)):
+        return str(value)
+    return value
+
+
+def load_sqlite(url: str, tables: dict[str, tuple[tuple, Iterable[tuple]]], batch_size: int) -> None:
+    """
+    Create the tables if needed and load the rows with executemany, values stored the way SQLAlchemy stores them.
+    """
+    database = make_url(url).database
+    Base.metadata.create_all(create_engine(f"sqlite:///{database}"))
+    connection = sqlite3.connect(database)
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    try:
+        for table, (columns, rows) in tables.items():
+            progress = Progress(table)
+            statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            for batch in batched(rows, batch_size):
+                connection.executemany(statement, [tuple(map(_sqlite_value, row)) for row in batch])
+                connection.commit()
+                progress.add(len(batch))
+            progress.done()
+    finally:
+        connection.close()
+
+
+def main(args: argparse.Namespace) -> None:
+    from src.services.auth import auth_service
+
+    password_hash = auth_service.get_password_hash(PASSWORD)
+    tables = {
+        "users": (USER_COLUMNS, generate_users(args.users, args.seed, password_hash)),
+        "contacts": (CONTACT_COLUMNS, generate_contacts(args.users, args.contacts_per_user, args.seed)),
+    }
+    start = time.perf_counter()
+    if make_url(args.database_url).get_backend_name() == "sqlite":
+        load_sqlite(args.database_url, tables, args.batch_size)
+    else:
+        asyncio.run(load_postgres(args.database_url, tables, args.batch_size))
+    print(f"done in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=config.DB_URL, help="the target database, DB_URL by default")
+    parser.add_argument("--users", type=int, default=100_000, help="users to create")
+    parser.add_argument("--contacts-per-user", type=int, default=20, help="average contacts per user")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated data")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="rows per COPY or executemany batch")
+    main(parser.parse_args())
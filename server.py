@@ -0,0 +1,44 @@
+"""
+Production entry point: runs main:app with Uvicorn configured from the SERVER_* settings.
+
+Usage:
+    python server.py
+
+Every worker is a separate process with its own lifespan, so each one opens and closes
+its own Redis pool and database engine. uvloop and httptools are used when installed
+(pip install "uvicorn[standard]") and SERVER_LOOP / SERVER_HTTP are left on "auto".
+"""
+import os
+
+import uvicorn
+
+from src.conf.config import config
+
+
+def workers_count() -> int:
+    """
+    The number of worker processes, one per CPU if SERVER_WORKERS is 0.
+    """
+    return config.SERVER_WORKERS or os.cpu_count() or 1
+
+
+def run() -> None:
+    """
+    Start Uvicorn with the production settings.
+    """
+    uvicorn.run(
+        "main:app",
+        host=config.SERVER_HOST,
+        port=config.SERVER_PORT,
+        workers=workers_count(),
+        loop=config.SERVER_LOOP,
+        http=config.SERVER_HTTP,
+        backlog=config.SERVER_BACKLOG,
+        timeout_keep_alive=config.SERVER_KEEP_ALIVE,
+        timeout_graceful_shutdown=config.SERVER_GRACEFUL_TIMEOUT,
+        proxy_headers=True,
+    )
+
+
+if __name__ == '__main__':
+    run()
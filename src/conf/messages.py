@@ -10,3 +10,5 @@ ERROR_CONNECTION_TO_DB = "Error connecting to the database"
 DATABASE_IS_NOT_CONFIGURED = "Database is not configured correctly"
 VERIFICATION_ERROR = "Verification error"
 CONTACT_NOT_FOUND = "Contact not found"
+TOKENS_REVOKED = "All refresh tokens have been revoked"
+ACCOUNT_DELETION_SCHEDULED = "Account deletion has been scheduled"
@@ -1,8 +1,11 @@
 import contextlib
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 
 from src.conf.config import config
+from src.database.instrumentation import QueryInstrumentation
+from src.services.metrics import registry, Gauge
 
 
 class DatabaseSessionManager:
@@ -17,11 +20,13 @@ class DatabaseSessionManager:
         self._engine: AsyncEngine | None = create_async_engine(url)
         self._session_maker: async_sessionmaker = async_sessionmaker(autoflush=False, autocommit=False,
                                                                      bind=self._engine)
+        QueryInstrumentation(config.SQL_SLOW_QUERY_MS, config.SQL_EXPLAIN_SLOW_QUERIES).attach(self._engine.sync_engine)
 
     @contextlib.asynccontextmanager
-    async def session(self):
+    async def session(self, reraise: bool = False):
         """
         A context manager that yields a session object for database operations.
+        An error in the block rolls the session back and is only printed, unless `reraise` is set.
         """
         if self._session_maker is None:
             raise Exception("Session is not initialized")
@@ -31,11 +36,40 @@ class DatabaseSessionManager:
         except Exception as err:
             print(err)
             await session.rollback()
+            if reraise:
+                raise
         finally:
             await session.close()
 
+    async def close(self) -> None:
+        """
+        Close all pooled connections of the engine.
+        """
+        await self._engine.dispose()
+
+    async def ping(self) -> None:
+        """
+        Run a trivial query on a pooled connection, raising if the database is unreachable.
+        """
+        async with self._engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    def pool_status(self) -> dict[tuple[str, ...], float]:
+        """
+        Report the connection pool state, used by the db_pool_connections gauge.
+        """
+        pool = self._engine.sync_engine.pool
+        status = {}
+        for state, method in (("size", "size"), ("checked_in", "checkedin"),
+                              ("checked_out", "checkedout"), ("overflow", "overflow")):
+            if hasattr(pool, method):
+                status[(state,)] = getattr(pool, method)()
+        return status
+
 
 sessionmanager = DatabaseSessionManager(config.DB_URL)
+registry.register(Gauge("db_pool_connections", "Database pool connections by state", ("state",),
+                        callback=sessionmanager.pool_status))
 
 
 async def get_db():
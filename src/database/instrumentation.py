@@ -0,0 +1,151 @@
+import contextlib
+import contextvars
+import logging
+import time
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.services.metrics import registry, Histogram
+
+logger = logging.getLogger(__name__)
+
+QUERY_LATENCY = registry.register(Histogram("db_query_duration_seconds", "SQL statement latency by statement kind",
+                                            ("kind",)))
+QUERIES_PER_REQUEST = registry.register(Histogram("db_queries_per_request", "SQL statements run by one request",
+                                                  buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100)))
+
+
+class QueryStats:
+    """
+    The SQL statements run while serving one request.
+
+    Attributes:
+        count (int): The number of statements.
+        duration (float): The total time spent in the statements in seconds.
+        rows (int): The total number of rows reported by the driver.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.rows = 0
+
+
+request_query_stats: contextvars.ContextVar[QueryStats | None] = contextvars.ContextVar("request_query_stats",
+                                                                                         default=None)
+
+
+def _statement_kind(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+
+class QueryInstrumentation:
+    """
+    Hooks the cursor events of an engine to time every statement, count it for the current request
+    and log statements slower than a threshold, optionally with their plan.
+
+    Attributes:
+        slow_query_ms (float): Statements running at least this long are logged.
+        explain_slow_queries (bool): Whether to log the EXPLAIN output of slow SELECT statements.
+    """
+
+    def __init__(self, slow_query_ms: float, explain_slow_queries: bool):
+        self.slow_query_ms = slow_query_ms
+        self.explain_slow_queries = explain_slow_queries
+
+    def attach(self, engine: Engine) -> None:
+        """
+        Register the listeners on a synchronous engine, use AsyncEngine.sync_engine for async ones.
+        """
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        QUERY_LATENCY.observe(elapsed, _statement_kind(statement))
+        stats = request_query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+            if cursor.rowcount > 0:
+                stats.rows += cursor.rowcount
+        if elapsed * 1000 >= self.slow_query_ms:
+            plan = self._explain(conn, statement, parameters) if self.explain_slow_queries else None
+            logger.warning("Slow query (%.1f ms, %s rows): %s%s", elapsed * 1000, cursor.rowcount, statement,
+                           f"\n{plan}" if plan else "")
+
+    @staticmethod
+    def _explain(conn, statement: str, parameters) -> str | None:
+        """
+        Run EXPLAIN for a SELECT statement on a raw DBAPI cursor, so it is not instrumented itself.
+        """
+        if _statement_kind(statement) != "SELECT":
+            return None
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+        except Exception as err:
+            return f"EXPLAIN failed: {err}"
+        finally:
+            cursor.close()
+
+
+@contextlib.contextmanager
+def capture_queries(engine: Engine) -> Iterator[list[str]]:
+    """
+    Collect the statements run on an engine inside the block, e.g. to assert a query budget in tests.
+
+    Parameters:
+        engine (Engine): The synchronous engine, AsyncEngine.sync_engine for async ones.
+
+    Yields:
+        list[str]: The statements, filled while the block runs.
+    """
+    statements = []
+
+    def _collect(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _collect)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _collect)
+
+
+class QueryBudgetMiddleware:
+    """
+    A pure ASGI middleware counting the SQL statements of every request.
+    Requests running more statements than the budget are logged, which points at N+1 patterns.
+
+    Attributes:
+        budget (int): The maximum number of statements per request, 0 disables the warning.
+    """
+
+    def __init__(self, app: ASGIApp, budget: int = 0):
+        self.app = app
+        self.budget = budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats()
+        token = request_query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_query_stats.reset(token)
+            QUERIES_PER_REQUEST.observe(stats.count)
+            if self.budget and stats.count > self.budget:
+                logger.warning("%s %s ran %s queries (budget %s, %.1f ms in SQL)", scope["method"], scope["path"],
+                               stats.count, self.budget, stats.duration * 1000)
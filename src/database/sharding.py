@@ -0,0 +1,142 @@
+import asyncio
+import bisect
+import hashlib
+
+from fastapi import Depends
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import config
+from src.database.connect import DatabaseSessionManager, sessionmanager, get_db
+from src.entity.models import User
+from src.services.auth import auth_service
+
+# Users remembered as present on their shard, per process; beyond this the set starts over
+ENSURED_USERS_LIMIT = 100_000
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hashing of keys onto shard numbers. Every shard owns `replicas` points on the ring and
+    a key belongs to the shard of the first point after its hash, so adding a shard moves only the
+    keys the new shard takes over, about 1/N of them.
+
+    >>> HashRing(3).shard_for("user") == HashRing(3).shard_for("user")
+    True
+
+    Attributes:
+        shards (int): The number of shards.
+    """
+
+    def __init__(self, shards: int, replicas: int = 100):
+        self.shards = shards
+        points = sorted((_hash(f"shard{shard}:{replica}"), shard)
+                        for shard in range(shards) for replica in range(replicas))
+        self._points = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_for(self, key) -> int:
+        """
+        The number of the shard owning the key.
+        """
+        index = bisect.bisect(self._points, _hash(str(key))) % len(self._points)
+        return self._owners[index]
+
+
+class ShardedSessionManager:
+    """
+    Sessions of the databases holding the contacts, sharded by user: the id of a user is mapped to one
+    of the databases with consistent hashing. The users table stays on the main database (DB_URL);
+    every shard keeps a copy of the rows of its users, which the contacts refer to.
+    `alembic upgrade head` creates and migrates the tables of every shard after DB_URL, see migrations/env.py.
+
+    Attributes:
+        shards (list[DatabaseSessionManager]): The session manager of every shard, in DB_SHARD_URLS order.
+        ring (HashRing): The mapping of user ids to shard numbers.
+    """
+
+    def __init__(self, urls: list[str], replicas: int = 100):
+        self.shards = [DatabaseSessionManager(url) for url in urls]
+        self.ring = HashRing(len(urls), replicas)
+        self._ensured: set = set()
+
+    def shard_for(self, user_id) -> int:
+        """
+        The number of the shard holding the contacts of the user.
+        """
+        return self.ring.shard_for(user_id)
+
+    def session(self, user_id, reraise: bool = False):
+        """
+        A context manager yielding a session of the user's shard, see DatabaseSessionManager.session.
+        """
+        return self.shards[self.shard_for(user_id)].session(reraise)
+
+    async def ensure_user(self, user: User, session: AsyncSession) -> None:
+        """
+        Copy the row of the user to the shard of the session unless it is there already.
+        Users found or copied are remembered, so this costs a query only once per user and process.
+
+        Parameters:
+            user (User): The user, as loaded from the main database.
+            session (AsyncSession): A session of the user's shard.
+
+        Returns:
+            None
+        """
+        if user.id in self._ensured:
+            return
+        if await session.get(User, user.id) is None:
+            values = {attribute.key: getattr(user, attribute.key) for attribute in inspect(User).column_attrs}
+            session.add(User(**{key: value for key, value in values.items() if value is not None}))
+            try:
+                await session.commit()
+            except IntegrityError:
+                # Copied by a concurrent request
+                await session.rollback()
+        if len(self._ensured) >= ENSURED_USERS_LIMIT:
+            self._ensured.clear()
+        self._ensured.add(user.id)
+
+    async def close(self) -> None:
+        """
+        Close the pooled connections of all shards.
+        """
+        await asyncio.gather(*(shard.close() for shard in self.shards))
+
+    async def ping(self) -> None:
+        """
+        Run a trivial query on every shard, raising if any of them is unreachable.
+        """
+        await asyncio.gather(*(shard.ping() for shard in self.shards))
+
+
+shard_urls = [url.strip() for url in config.DB_SHARD_URLS.split(",") if url.strip()]
+shardmanager = ShardedSessionManager(shard_urls) if shard_urls else None
+
+
+def contact_databases() -> list[DatabaseSessionManager]:
+    """
+    The session managers of all databases holding contacts: the shards, or the main database without sharding.
+    """
+    return shardmanager.shards if shardmanager is not None else [sessionmanager]
+
+
+async def get_shard_db(user: User = Depends(auth_service.get_current_user),
+                       db: AsyncSession = Depends(get_db)):
+    """
+    A coroutine that returns a session of the database holding the contacts of the authenticated user.
+    Without DB_SHARD_URLS it is the session of `get_db`.
+    """
+    if shardmanager is None:
+        yield db
+        return
+    async with shardmanager.session(user.id) as session:
+        await shardmanager.ensure_user(user, session)
+        yield session
+
@@ -1,12 +1,14 @@
 import uuid
 
-from sqlalchemy import String, Date, DateTime, func, ForeignKey, Boolean
+from sqlalchemy import String, Date, DateTime, func, ForeignKey, Boolean, Index
 from datetime import date
 from sqlalchemy.dialects.postgresql import UUID
 
-from sqlalchemy.orm import DeclarativeBase, relationship
+from sqlalchemy.orm import DeclarativeBase, relationship, validates, backref
 from sqlalchemy.orm import Mapped, mapped_column
 
+from src.services.normalization import normalize_email, normalize_phone
+
 
 class Base(DeclarativeBase):
     pass
@@ -23,23 +25,46 @@ class Contact(Base):
        email (str): The email address of the contact.
        phone_number (str): The phone number of the contact.
        birthday (date): The birthday of the contact.
-       user_id (UUID): The unique identifier for the user associated with the contact.
+       phone_key (str): The phone number in E.164 form, kept in sync with phone_number.
+       email_key (str): The lower-cased email, kept in sync with email.
+       user_id (UUID): The unique identifier for the user associated with the contact, part of the mapped identity.
        user (User): The user associated with the contact.
 
        Methods:
        None
        """
     __tablename__ = 'contacts'
+    __table_args__ = (
+        Index('ix_contacts_user_id_phone_key', 'user_id', 'phone_key'),
+        Index('ix_contacts_user_id_email_key', 'user_id', 'email_key'),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(50), index=True)
     last_name: Mapped[str] = mapped_column(String(50))
     email: Mapped[str] = mapped_column(String(50))
     phone_number: Mapped[str] = mapped_column(nullable=False)
     birthday: Mapped[date] = mapped_column(Date, nullable=False)
+    phone_key: Mapped[str] = mapped_column(String(16), nullable=True)
+    email_key: Mapped[str] = mapped_column(String(50), nullable=True)
     user_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id',
                                                                          ondelete='CASCADE'), nullable=True,)
-    user: Mapped['User'] = relationship('User', backref='contacts',
-                                        lazy='joined', cascade='all, delete')
+    # The database deletes the contacts of a deleted user (ON DELETE CASCADE), passive_deletes keeps
+    # the ORM from loading them first
+    user: Mapped['User'] = relationship('User', backref=backref('contacts', passive_deletes=True),
+                                        lazy='joined')
+    # On PostgreSQL the table is hash-partitioned by user_id (migration c3f8a1d5e072): with user_id in the
+    # identity, the UPDATE and DELETE statements of the ORM are pruned to the partition of the user
+    __mapper_args__ = {'primary_key': [id, user_id]}
+
+    @validates('phone_number')
+    def _set_phone_key(self, key, phone_number):
+        self.phone_key = normalize_phone(phone_number)
+        return phone_number
+
+    @validates('email')
+    def _set_email_key(self, key, email):
+        self.email_key = normalize_email(email)
+        return email
 
 
 class User(Base):
@@ -62,6 +87,9 @@ class User(Base):
       None
       """
     __tablename__ = 'users'
+    __table_args__ = (
+        Index('ix_users_email_verified_created_at', 'email_verified', 'created_at'),
+    )
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     username: Mapped[str] = mapped_column(String(50))
     email: Mapped[str] = mapped_column(String(150), nullable=False, unique=True)
@@ -70,5 +98,9 @@ class User(Base):
     refresh_token: Mapped[str] = mapped_column(String(255), nullable=True)
     email_verified: Mapped[bool] = mapped_column(Boolean, default=False, nullable=True)
     open_verification_letter: Mapped[bool] = mapped_column(Boolean, default=False, nullable=True)
-    created_at: Mapped[date] = mapped_column('created_at', DateTime, default=func.now())
+    created_at: Mapped[date] = mapped_column('created_at', DateTime, default=func.now(), index=True)
     updated_at: Mapped[date] = mapped_column('updated_at', DateTime, default=func.now(), onupdate=func.now())
+
+
+# Emails are compared case-insensitively, see src.services.normalization.normalize_email
+Index('ix_users_email_lower', func.lower(User.email), unique=True)
@@ -1,11 +1,13 @@
-from datetime import timedelta
+import calendar
+from datetime import date, timedelta
 from typing import Sequence
 
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func, or_, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.entity.models import Contact, User
 from src.schemas.contact import ContactSchema
+from src.services.normalization import normalize_phone
 
 
 async def get_contacts(limit: int, offset: int, db: AsyncSession, user: User) -> Sequence[Contact]:
@@ -35,6 +37,91 @@ async def get_contact(contact_id: int, db: AsyncSession, user: User) -> Contact
     return contact.scalar_one_or_none()
 
 
+async def get_contacts_by_ids(contact_ids: list[int], db: AsyncSession, user: User) -> Sequence[Contact]:
+    """
+    Retrieve several contacts of the user by their IDs with a single query.
+
+    Parameters:
+        contact_ids (list[int]): The IDs of the contacts to retrieve.
+        db (AsyncSession): The asynchronous database session to execute the query.
+        user (User): The user object associated with the contacts.
+
+    Returns:
+        Sequence[Contact]: The contacts found, in no particular order. IDs of other users' contacts are not found.
+    """
+    request = select(Contact).filter(Contact.user_id == user.id, Contact.id.in_(contact_ids))
+    contacts = await db.execute(request)
+    return contacts.scalars().all()
+
+
+async def get_contacts_by_phone(phone_number: str, db: AsyncSession, user: User) -> Sequence[Contact]:
+    """
+    Retrieve the contacts of the user with the given phone number, in any notation, through the phone_key index.
+
+    Parameters:
+        phone_number (str): The phone number to look for.
+        db (AsyncSession): The asynchronous database session to execute the query.
+        user (User): The user object associated with the contacts.
+
+    Returns:
+        Sequence[Contact]: The contacts with the phone number, empty if the number is not valid.
+    """
+    phone_key = normalize_phone(phone_number)
+    if phone_key is None:
+        return []
+    request = select(Contact).filter_by(user_id=user.id, phone_key=phone_key).order_by(Contact.id)
+    contacts = await db.execute(request)
+    return contacts.scalars().all()
+
+
+async def get_duplicate_contacts(db: AsyncSession, user: User) -> list[dict]:
+    """
+    Find the contacts of the user sharing a normalized phone number or email.
+    One query selects only the contacts whose phone_key or email_key occurs more than once,
+    they are then grouped by key in a single pass.
+
+    Parameters:
+        db (AsyncSession): The asynchronous database session to execute the query.
+        user (User): The user object associated with the contacts.
+
+    Returns:
+        list[dict]: Groups with the field ("phone" or "email"), the shared key and the contacts, ordered by ID.
+    """
+    fields = {"phone": Contact.phone_key, "email": Contact.email_key}
+    repeated = {field: select(column).filter(Contact.user_id == user.id, column.is_not(None))
+                .group_by(column).having(func.count() > 1)
+                for field, column in fields.items()}
+    request = (select(Contact)
+               .filter(Contact.user_id == user.id,
+                       or_(*(column.in_(repeated[field]) for field, column in fields.items())))
+               .order_by(Contact.id))
+    contacts = (await db.execute(request)).scalars().all()
+    groups: dict[tuple[str, str], list[Contact]] = {}
+    for contact in contacts:
+        for field, key in (("phone", contact.phone_key), ("email", contact.email_key)):
+            if key is not None:
+                groups.setdefault((field, key), []).append(contact)
+    return [{"field": field, "key": key, "contacts": members}
+            for (field, key), members in groups.items() if len(members) > 1]
+
+
+async def count_contacts_by_month(db: AsyncSession, user: User) -> dict[int, int]:
+    """
+    Count the contacts of the user by birth month with a single GROUP BY query.
+
+    Parameters:
+        db (AsyncSession): The asynchronous database session to execute the query.
+        user (User): The user object associated with the contacts.
+
+    Returns:
+        dict[int, int]: The number of contacts by month number; months without contacts are left out.
+    """
+    month = func.extract('month', Contact.birthday)
+    request = select(month, func.count()).filter(Contact.user_id == user.id).group_by(month)
+    rows = await db.execute(request)
+    return {int(number): count for number, count in rows.all()}
+
+
 async def create_contact(body: ContactSchema, db: AsyncSession, user: User) -> Contact:
     """
     Asynchronously creates a contact using the provided contact data and database session.
@@ -54,7 +141,26 @@ async def create_contact(body: ContactSchema, db: AsyncSession, user: User) -> C
     return contact
 
 
-async def update_contact(contact_id: int, body: ContactSchema, db: AsyncSession, user: User):
+async def create_contacts(bodies: list[ContactSchema], db: AsyncSession, user: User) -> list[Contact]:
+    """
+    Asynchronously creates several contacts in one transaction.
+
+    Args:
+        bodies (list[ContactSchema]): The data of the contacts.
+        db (AsyncSession): The database session.
+        user (User): The user creating the contacts.
+
+    Returns:
+        list[Contact]: The created contacts, not refreshed from the database.
+    """
+    contacts = [Contact(**body.model_dump(exclude_unset=True), user_id=user.id) for body in bodies]
+    db.add_all(contacts)
+    await db.commit()
+    return contacts
+
+
+async def update_contact(contact_id: int, body: ContactSchema, db: AsyncSession,
+                         user: User) -> tuple[Contact | None, date | None]:
     """
       Update a contact in the database with the provided contact_id using the information in the body.
 
@@ -65,12 +171,15 @@ async def update_contact(contact_id: int, body: ContactSchema, db: AsyncSession,
           user (User): The user performing the update.
 
       Returns:
-          Contact: The updated contact object.
+          tuple[Contact | None, date | None]: The updated contact object and its birthday before the update,
+          or None twice if the contact is not found.
       """
     request = select(Contact).filter_by(id=contact_id, user_id=user.id)
     response = await db.execute(request)
     contact = response.scalar_one_or_none()
+    old_birthday = None
     if contact:
+        old_birthday = contact.birthday
         contact.name = body.name
         contact.last_name = body.last_name
         contact.email = body.email
@@ -78,7 +187,7 @@ async def update_contact(contact_id: int, body: ContactSchema, db: AsyncSession,
         contact.birthday = body.birthday
         await db.commit()
         await db.refresh(contact)
-    return contact
+    return contact, old_birthday
 
 
 async def delete_contact(contact_id: int, db: AsyncSession, user: User) -> Contact:
@@ -102,28 +211,74 @@ async def delete_contact(contact_id: int, db: AsyncSession, user: User) -> Conta
     return contact
 
 
-async def get_birthdays(db: AsyncSession, user: User) -> Sequence[Contact]:
+def birthday_keys(start: date, days: int) -> list[int]:
+    """
+    The birthdays falling in the `days` days from `start`, as month * 100 + day keys.
+    February 29 birthdays are celebrated on February 28 in common years.
+
+    Parameters:
+        start (date): The first day of the period.
+        days (int): The length of the period in days.
+
+    Returns:
+        list[int]: The keys, e.g. 1231 and 101 for a period around New Year.
+    """
+    keys = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        keys.append(day.month * 100 + day.day)
+        if (day.month, day.day) == (2, 28) and not calendar.isleap(day.year):
+            keys.append(229)
+    return keys
+
+
+def _birthday_key():
+    return func.extract('month', Contact.birthday) * 100 + func.extract('day', Contact.birthday)
+
+
+async def get_birthdays(db: AsyncSession, user: User, days: int = 7, start: date | None = None) -> Sequence[Contact]:
     """
     A function that retrieves birthdays for a given user that are happening within the next week.
 
     Parameters:
     - db: An asynchronous database session.
     - user: An instance of the User class.
+    - days: The length of the period in days, a week by default.
+    - start: The first day of the period, today by default.
 
     Returns:
     - A sequence of Contact objects representing birthdays.
     """
     request = select(Contact).filter(
         Contact.user_id == user.id,
-        func.extract('month', Contact.birthday) == func.extract('month', func.current_date() + timedelta(days=7)),
-        func.extract('day', Contact.birthday) >= func.extract('day', func.current_date()),
-        func.extract('day', Contact.birthday) <= func.extract('day', func.current_date() + timedelta(days=7))
+        _birthday_key().in_(birthday_keys(start or date.today(), days)),
     )
 
     contacts = await db.execute(request)
     return contacts.scalars().all()
 
 
+async def get_all_birthdays(db: AsyncSession, days: int = 7, start: date | None = None) -> Sequence[Row]:
+    """
+    Retrieve the upcoming birthdays of all users with a single set-based query, for the daily digests.
+
+    Parameters:
+        db (AsyncSession): An asynchronous database session.
+        days (int): The length of the period in days, a week by default.
+        start (date | None): The first day of the period, today by default.
+
+    Returns:
+        Sequence[Row]: The contact columns with user_id, user_email and username, ordered by user.
+    """
+    request = (select(Contact.id, Contact.name, Contact.last_name, Contact.email, Contact.phone_number,
+                      Contact.birthday, Contact.user_id, User.email.label('user_email'), User.username)
+               .join(User, User.id == Contact.user_id)
+               .filter(_birthday_key().in_(birthday_keys(start or date.today(), days)))
+               .order_by(Contact.user_id, Contact.id))
+    rows = await db.execute(request)
+    return rows.all()
+
+
 async def search_contacts(search_string, db: AsyncSession, user: User) -> Sequence[Contact]:
     """
     A function that searches for contacts based on a search string for a specific user in the database.
@@ -1,15 +1,22 @@
+from datetime import datetime
+from typing import AsyncIterator, Sequence
+from uuid import UUID
+
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import select, Select, func, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from libgravatar import Gravatar
 
-from src.entity.models import User
+from src.conf.config import config
+from src.entity.models import User, Contact
 from src.schemas.user import UserSchema
+from src.services.normalization import normalize_email
 
 
 async def get_user_by_email(email: str, db: AsyncSession) -> User:
     """
     A function to retrieve a user from the database based on their email address.
+    The comparison ignores case and is served by the unique index on lower(email).
 
     Parameters:
     - email: a string representing the user's email address
@@ -18,7 +25,7 @@ async def get_user_by_email(email: str, db: AsyncSession) -> User:
     Returns:
     - User: the user object corresponding to the provided email address, if found
     """
-    request = select(User).filter_by(email=email)
+    request = select(User).filter(func.lower(User.email) == normalize_email(email))
     response = await db.execute(request)
     user = response.scalar_one_or_none()
     return user
@@ -96,3 +103,93 @@ async def update_avatar_url(email: str, url: str | None, db: AsyncSession) -> Us
     await db.commit()
     await db.refresh(user)
     return user
+
+
+async def purge_user(user_id: UUID, db: AsyncSession, batch_size: int | None = None) -> int:
+    """
+    Delete a user and all of their contacts. The contacts are deleted in batches, each in its own
+    short transaction, so no lock is held for long and nothing is loaded into memory; the user row
+    goes last, the ON DELETE CASCADE foreign key removes any contact created in the meantime.
+
+    Args:
+        user_id (UUID): The id of the user to delete.
+        db (AsyncSession): The async database session.
+        batch_size (int | None): Contacts deleted per transaction, ACCOUNT_PURGE_BATCH_SIZE by default.
+
+    Returns:
+        int: The number of contacts deleted in batches.
+    """
+    batch_size = batch_size or config.ACCOUNT_PURGE_BATCH_SIZE
+    deleted = 0
+    while True:
+        batch = select(Contact.id).filter(Contact.user_id == user_id).limit(batch_size)
+        # user_id on the outer DELETE as well: contact ids are unique per user only where the primary key
+        # is (id, user_id), and it prunes the statement to the partition of the user
+        result = await db.execute(delete(Contact).where(Contact.user_id == user_id,
+                                                        Contact.id.in_(batch.scalar_subquery()))
+                                  .execution_options(synchronize_session=False))
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    await db.execute(delete(User).where(User.id == user_id).execution_options(synchronize_session=False))
+    await db.commit()
+    return deleted
+
+
+def _users_query(email_verified: bool | None, created_from: datetime | None, created_to: datetime | None) -> Select:
+    """
+    Build a users query ordered by id with the optional filters applied.
+    """
+    request = select(User).order_by(User.id)
+    if email_verified is not None:
+        request = request.filter(User.email_verified == email_verified)
+    if created_from is not None:
+        request = request.filter(User.created_at >= created_from)
+    if created_to is not None:
+        request = request.filter(User.created_at < created_to)
+    return request
+
+
+async def get_users(limit: int, after: UUID | None, db: AsyncSession, email_verified: bool | None = None,
+                    created_from: datetime | None = None, created_to: datetime | None = None) -> Sequence[User]:
+    """
+    Retrieve one page of users using keyset pagination on the user id.
+
+    Args:
+        limit (int): The maximum number of users to return.
+        after (UUID | None): The id of the last user of the previous page, None for the first page.
+        db (AsyncSession): The async database session.
+        email_verified (bool | None): Return only users with this verification status, if set.
+        created_from (datetime | None): Return only users created at or after this moment, if set.
+        created_to (datetime | None): Return only users created before this moment, if set.
+
+    Returns:
+        Sequence[User]: The users of the page.
+    """
+    request = _users_query(email_verified, created_from, created_to)
+    if after is not None:
+        request = request.filter(User.id > after)
+    response = await db.execute(request.limit(limit))
+    return response.scalars().all()
+
+
+async def stream_users(db: AsyncSession, email_verified: bool | None = None, created_from: datetime | None = None,
+                       created_to: datetime | None = None, batch_size: int = 500) -> AsyncIterator[User]:
+    """
+    Stream all users matching the filters without loading them into memory at once.
+
+    Args:
+        db (AsyncSession): The async database session.
+        email_verified (bool | None): Return only users with this verification status, if set.
+        created_from (datetime | None): Return only users created at or after this moment, if set.
+        created_to (datetime | None): Return only users created before this moment, if set.
+        batch_size (int): The number of rows fetched from the server cursor at a time.
+
+    Yields:
+        User: The users one by one.
+    """
+    request = _users_query(email_verified, created_from, created_to).execution_options(yield_per=batch_size)
+    users = await db.stream_scalars(request)
+    async for user in users:
+        yield user
@@ -1,27 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.connect import get_db
 from sqlalchemy import text
 from src.conf import messages
+from src.services.health import health_prober
 
 router = APIRouter(prefix='/api_service', tags=['service'])  # Creates a new router for service-related routes
 
 
 @router.get("/health_checker")
-async def healthchecker(db: AsyncSession = Depends(get_db),
-                        request_string: str = "SELECT 1") -> dict:
+async def healthchecker(db: AsyncSession = Depends(get_db)) -> dict:
     """
-    A route for checking the health of the application.
+    A route for checking the health of the application. It runs a fixed "SELECT 1" on the database.
 
     Parameters:
         db (AsyncSession): The database session to use.
-        request_string (str): The SQL query string to execute, defaults to "SELECT 1".
 
     Returns:
         dict: A dictionary containing the health check message and operational capability of the database
     """
     try:
-        result = await db.execute(text(request_string))
+        result = await db.execute(text("SELECT 1"))
         result = result.fetchone()
         if result is None:
             raise HTTPException(status_code=500, detail= messages.DATABASE_IS_NOT_CONFIGURED)
@@ -31,3 +31,31 @@ async def healthchecker(db: AsyncSession = Depends(get_db),
         raise HTTPException(status_code=500, detail=messages.ERROR_CONNECTION_TO_DB)
 
 
+@router.get("/livez")
+async def livez() -> JSONResponse:
+    """
+    A cheap liveness probe. It does not touch any dependency.
+
+    Returns:
+        JSONResponse: 200 while the process serves requests and the background prober runs, 503 otherwise.
+    """
+    if not health_prober.alive:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "dead"})
+    return JSONResponse(content={"status": "alive"})
+
+
+@router.get("/readyz")
+async def readyz() -> JSONResponse:
+    """
+    A cheap readiness probe answered from the last result of the background prober.
+
+    Returns:
+        JSONResponse: 200 if every required dependency is healthy, 503 otherwise,
+        with the state and latency of each dependency.
+    """
+    content = {"status": "ready" if health_prober.ready else "not ready",
+               "checked_at": health_prober.checked_at,
+               "dependencies": health_prober.status}
+    if not health_prober.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=content)
+    return JSONResponse(content=content)
@@ -1,6 +1,6 @@
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks, Request
+from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm, HTTPAuthorizationCredentials, HTTPBearer
 from fastapi.responses import FileResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
@@ -9,12 +9,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connect import get_db
 from src.conf import messages
+from src.conf.config import config
 from src.entity.models import User
 from src.repository import users as repositories_users
 from src.schemas.user import UserSchema, TokenSchema, UserResponse, RequestEmail
 from src.services.auth import auth_service
 from src.services.email import send_email
 from src.services.cache_redis import get_user_cache, update_user_cache
+from src.services import refresh_tokens
+from src.services.serialization import json_response, token_adapter
+from src.services.etag import bump_data_version
 
 router = APIRouter(prefix='/auth', tags=['auth'])  # Creates a new router for authentication-related routes.
 get_refresh_token = HTTPBearer()  # Sets up a function to validate JWT tokens in incoming requests.
@@ -46,14 +50,17 @@ async def signup(body: UserSchema, background_task: BackgroundTasks, request: Re
 
 
 @router.post("/login", response_model=TokenSchema)
-async def login(body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)) -> dict:
+async def login(background_tasks: BackgroundTasks, body: OAuth2PasswordRequestForm = Depends(),
+                db: AsyncSession = Depends(get_db)) -> Response:
     """
     Asynchronous function for user login.
+    The refresh token is kept in Redis; it is written to the database only if REFRESH_TOKEN_DB_PERSIST is set.
     Parameters:
+    - background_tasks: BackgroundTasks object for the optional database persistence of the token
     - body: OAuth2PasswordRequestForm object representing the user credentials
     - db: AsyncSession object for database interaction
     Returns:
-    - Dictionary containing the access token and refresh token
+    - Response containing the access token and refresh token
     """
     user = await get_user_cache(body.username, db)
     if user is None:
@@ -65,36 +72,55 @@ async def login(body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession =
 
     access_token = await auth_service.create_access_token(data={"sub": user.email})
     refresh_token = await auth_service.create_refresh_token(data={"sub": user.email})
-    await repositories_users.update_token(user, refresh_token, db)
-    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+    await refresh_tokens.store_refresh_token(user.email, refresh_token)
+    if config.REFRESH_TOKEN_DB_PERSIST:
+        background_tasks.add_task(repositories_users.update_token, user, refresh_token, db)
+    return json_response(token_adapter, {"access_token": access_token, "refresh_token": refresh_token})
 
 
 @router.get('/refresh_token', response_model=TokenSchema)
-async def refresh_token(input_refresh: str = None,
+async def refresh_token(background_tasks: BackgroundTasks,
+                        input_refresh: str = None,
                         credentials: HTTPAuthorizationCredentials = Depends(get_refresh_token),
                         db: AsyncSession = Depends(get_db),
-                        user: User = Depends(auth_service.get_current_user)) -> dict:
+                        user: User = Depends(auth_service.get_current_user)) -> Response:
     """
     Asynchronous function for refreshing the user's access token.
+    Every refresh token can be exchanged once; reusing a rotated token revokes all tokens of the user.
     Parameters:
+    - background_tasks: BackgroundTasks object for the optional database persistence of the token
     - input_refresh: str representing the refresh token
     - credentials: HTTPAuthorizationCredentials object representing the user's credentials
     - db: AsyncSession object for database interaction
     - user: User object representing the current user
     Returns:
-    - Dictionary containing the new access token and refresh token
+    - Response containing the new access token and refresh token
     """
     token = input_refresh if input_refresh else credentials.credentials
     email = await auth_service.decode_refresh_token(token)
-    user = await get_user_cache(email, db)
-    if user.refresh_token != token:
-        await repositories_users.update_token(user, None, db)
+    if not await refresh_tokens.consume_refresh_token(email, token):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=messages.INVALID_REFRESH_TOKEN)
 
     access_token = await auth_service.create_access_token(data={"sub": email})
     refresh_token = await auth_service.create_refresh_token(data={"sub": email})
-    await repositories_users.update_token(user, refresh_token, db)
-    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+    await refresh_tokens.store_refresh_token(email, refresh_token)
+    if config.REFRESH_TOKEN_DB_PERSIST:
+        user = await get_user_cache(email, db)
+        background_tasks.add_task(repositories_users.update_token, user, refresh_token, db)
+    return json_response(token_adapter, {"access_token": access_token, "refresh_token": refresh_token})
+
+
+@router.post('/logout')
+async def logout(user: User = Depends(auth_service.get_current_user)) -> dict:
+    """
+    Asynchronous function for revoking all refresh tokens of the current user.
+    Parameters:
+    - user: User object representing the current user
+    Returns:
+    - Dictionary containing a message indicating that the tokens have been revoked
+    """
+    await refresh_tokens.revoke_all_refresh_tokens(user.email)
+    return {"message": messages.TOKENS_REVOKED}
 
 
 @router.get('/confirmed_email/{token}', response_class=HTMLResponse)
@@ -115,6 +141,7 @@ async def confirmed_email(token: str, request: Request, db: AsyncSession = Depen
     if user.email_verified:
         return {"message": messages.EMAIL_VERIFY}
     await repositories_users.email_verified(email, db)
+    bump_data_version(email)
     return templates.TemplateResponse('response_email_verification.html', context={'request': request})
 
 
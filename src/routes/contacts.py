@@ -1,77 +1,170 @@
-from typing import Sequence
+from typing import Any
 
-from fastapi import APIRouter, HTTPException, status, Depends, Path, Query
+from fastapi import APIRouter, HTTPException, status, Body, Depends, Path, Query, Request, Response
 from fastapi_limiter.depends import RateLimiter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.connect import get_db
+from src.database.sharding import get_shard_db
 from src.repository import contacts as repositories_contacts
-from src.schemas.contact import ContactSchema, ContactResponse
+from src.conf.config import config
+from src.schemas.contact import (ContactSchema, ContactResponse, ContactIdsSchema, ContactsBatchResponse,
+                                ContactsImportResponse, ContactStatsResponse, DuplicateContactsResponse)
 from src.entity.models import User, Contact
 from src.services.auth import auth_service
+from src.services.serialization import (json_response, render, contact_adapter, contacts_adapter, contacts_batch_adapter,
+                                        duplicates_adapter, contacts_import_adapter, contact_stats_adapter)
+from src.services.bulk_validation import contacts_bulk_adapter, validate_rows
+from src.services.etag import etag_guard, daily_etag_guard, etag_headers, bump_data_version
+from src.services.birthdays import get_birthday_digest, invalidate_birthday_digest
+from src.services.contact_stats import get_contact_stats, record_contacts_changed
+from src.services.single_flight import SingleFlight
 from src.conf import messages
 
 router = APIRouter(prefix='/contacts', tags=['contacts'])  # Creates a new router for contacts-related routes
+contacts_flight = SingleFlight("contacts")
+contacts_rate_limiter = RateLimiter(times=1, seconds=20)
+
+
+async def contacts_rate_limit(request: Request, response: Response) -> None:
+    """
+    The rate limit of the contacts list, except for requests joining an identical read that is running:
+    they cost no query, e.g. the same page opened in several tabs at once. Runs after `etag_guard`,
+    whose ETag is the key of the flight.
+    """
+    etag = getattr(request.state, "etag", None)
+    if etag is not None and contacts_flight.running(etag):
+        return
+    await contacts_rate_limiter(request, response)
 
 
 @router.get('/', response_model=list[ContactResponse],
-            dependencies=[Depends(RateLimiter(times=1, seconds=20))])
-async def get_contacts(limit: int = Query(10, ge=10, le=500),
+            dependencies=[Depends(etag_guard), Depends(contacts_rate_limit)])
+async def get_contacts(request: Request,
+                       limit: int = Query(10, ge=10, le=500),
                        offset: int = Query(0, ge=0),
-                       db: AsyncSession = Depends(get_db),
-                       user: User = Depends(auth_service.get_current_user)) -> Sequence[Contact]:
+                       db: AsyncSession = Depends(get_shard_db),
+                       user: User = Depends(auth_service.get_current_user)) -> Response:
     """
     Get a list of contacts.
+    The X-Total-Count header carries the number of all contacts of the user, read from the contact counters.
+    Supports conditional GET: a request with a current If-None-Match header gets 304 Not Modified.
+    Identical requests of the user running at the same time share one query and one rendered page,
+    only the first of them counts against the rate limit.
 
     Parameters:
+        request (Request): The incoming request, carrying the ETag computed by `etag_guard`.
         limit (int, optional): The maximum number of contacts to return. Default is 10.
         offset (int, optional): The number of contacts to skip before starting to collect the result set. Default is 0.
-        db (AsyncSession, optional): The database session. Provided by the dependency `get_db`.
+        db (AsyncSession, optional): The database session. Provided by the dependency `get_shard_db`.
         user (User, optional): The current user. Provided by the dependency `auth_service.get_current_user`.
 
     Returns:
-        Sequence[Contact]: A list of contacts.
+        Response: A list of contacts.
 
     Raises:
         HTTPException: If the request is rate limited.
     """
-    contacts = await repositories_contacts.get_contacts(limit, offset, db, user)
-    return contacts
+    async def load() -> tuple[bytes, int]:
+        contacts = await repositories_contacts.get_contacts(limit, offset, db, user)
+        stats = await get_contact_stats(user, db)
+        return render(contacts_adapter, contacts), stats["total"]
+
+    # The ETag stands for the user, the data version and the query parameters, so a read starting after
+    # a write never joins a flight started before it
+    key = getattr(request.state, "etag", None) or (user.id, limit, offset)
+    body, total = await contacts_flight.do(key, load)
+    headers = {**(etag_headers(request) or {}), "X-Total-Count": str(total)}
+    return Response(body, headers=headers, media_type="application/json")
+
+
+@router.get('/stats/', response_model=ContactStatsResponse,
+            dependencies=[Depends(RateLimiter(times=1, seconds=10)), Depends(etag_guard)])
+async def get_contacts_stats(request: Request,
+                             db: AsyncSession = Depends(get_shard_db),
+                             user: User = Depends(auth_service.get_current_user)) -> Response:
+    """
+    Get the counters of the user's contacts: the total and the number of birthdays in every month.
+    The counters are maintained on every write, so reading them does not scan the contacts.
+    Supports conditional GET: a request with a current If-None-Match header gets 304 Not Modified.
+
+    Parameters:
+        request (Request): The incoming request, carrying the ETag computed by `etag_guard`.
+        db (AsyncSession, optional): The database session. Provided by the dependency `get_shard_db`.
+        user (User, optional): The current user. Provided by the dependency `auth_service.get_current_user`.
+
+    Returns:
+        Response: The total and the counts by month number.
+
+    Raises:
+        HTTPException: If the request is rate limited.
+    """
+    stats = await get_contact_stats(user, db)
+    return json_response(contact_stats_adapter, stats, headers=etag_headers(request))
 
 
 @router.get('/{contact_id}', response_model=ContactResponse,
-            dependencies=[Depends(RateLimiter(times=1, seconds=10))])
-async def get_contact(contact_id: int = Path(ge=1),
-                      db: AsyncSession = Depends(get_db),
-                      user: User = Depends(auth_service.get_current_user)) -> Contact:
+            dependencies=[Depends(RateLimiter(times=1, seconds=10)), Depends(etag_guard)])
+async def get_contact(request: Request,
+                      contact_id: int = Path(ge=1),
+                      db: AsyncSession = Depends(get_shard_db),
+                      user: User = Depends(auth_service.get_current_user)) -> Response:
     """
     Asynchronous function to get a contact by ID.
+    Supports conditional GET: a request with a current If-None-Match header gets 304 Not Modified.
     Parameters:
+        request (Request): The incoming request, carrying the ETag computed by `etag_guard`.
         contact_id (int): The ID of the contact to retrieve.
         db (AsyncSession): The asynchronous database session.
         user (User): The current user.
     Returns:
-        Contact: The retrieved contact.
+        Response: The retrieved contact.
     Raises:
         HTTPException: If the contact is not found, raises HTTP 404 Not Found error.
     """
     contact = await repositories_contacts.get_contact(contact_id, db, user)
     if contact is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.CONTACT_NOT_FOUND)
-    return contact
+    return json_response(contact_adapter, contact, headers=etag_headers(request))
+
+
+@router.post('/batch', response_model=ContactsBatchResponse,
+             dependencies=[Depends(RateLimiter(times=1, seconds=10))])
+async def get_contacts_batch(body: ContactIdsSchema,
+                             db: AsyncSession = Depends(get_shard_db),
+                             user: User = Depends(auth_service.get_current_user)) -> Response:
+    """
+    Get several contacts by their IDs in one request, with a single database query.
+
+    Parameters:
+        body (ContactIdsSchema): The IDs of the contacts, at most CONTACTS_BATCH_MAX_IDS of them.
+        db (AsyncSession, optional): The database session. Provided by the dependency `get_shard_db`.
+        user (User, optional): The current user. Provided by the dependency `auth_service.get_current_user`.
+
+    Returns:
+        Response: The contacts found, in the order of the requested IDs, and the IDs that were not found.
+
+    Raises:
+        HTTPException: If the request is rate limited.
+    """
+    contact_ids = list(dict.fromkeys(body.ids))
+    found = {contact.id: contact for contact in await repositories_contacts.get_contacts_by_ids(contact_ids, db, user)}
+    return json_response(contacts_batch_adapter, {
+        "contacts": [found[contact_id] for contact_id in contact_ids if contact_id in found],
+        "missing": [contact_id for contact_id in contact_ids if contact_id not in found],
+    })
 
 
 @router.post('/', response_model=ContactResponse, status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(RateLimiter(times=1, seconds=20))])
 async def create_contact(body: ContactSchema,
-                         db: AsyncSession = Depends(get_db),
+                         db: AsyncSession = Depends(get_shard_db),
                          user: User = Depends(auth_service.get_current_user)) -> Contact:
     """
     Create a new contact.
 
     Parameters:
         body (ContactSchema): The data for the new contact.
-        db (AsyncSession, optional): The database session. Provided by the dependency `get_db`.
+        db (AsyncSession, optional): The database session. Provided by the dependency `get_shard_db`.
         user (User, optional): The current user. Provided by the dependency `auth_service.get_current_user`.
 
     Returns:
@@ -81,14 +174,48 @@ async def create_contact(body: ContactSchema,
         HTTPException: If the request is rate limited.
     """
     contact = await repositories_contacts.create_contact(body, db, user)
+    bump_data_version(user.email)
+    invalidate_birthday_digest(user)
+    record_contacts_changed(user, added=[contact.birthday])
     return contact
 
 
+@router.post('/import/', response_model=ContactsImportResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(RateLimiter(times=1, seconds=20))])
+async def import_contacts(rows: list[dict[str, Any]] = Body(min_length=1, max_length=config.CONTACTS_IMPORT_MAX_ROWS),
+                          db: AsyncSession = Depends(get_shard_db),
+                          user: User = Depends(auth_service.get_current_user)) -> Response:
+    """
+    Create up to CONTACTS_IMPORT_MAX_ROWS contacts in one request and one transaction.
+    The rows are validated as ContactSchema in a single pass; if any of them is invalid, nothing is
+    created and the 422 response lists the errors with the index of the row, the field and the message.
+
+    Parameters:
+        rows (list[dict[str, Any]]): The data of the contacts.
+        db (AsyncSession, optional): The database session. Provided by the dependency `get_shard_db`.
+        user (User, optional): The current user. Provided by the dependency `auth_service.get_current_user`.
+
+    Returns:
+        Response: The number of created contacts.
+
+    Raises:
+        HTTPException: If the request is rate limited or a row is invalid.
+    """
+    bodies, errors = validate_rows(contacts_bulk_adapter, rows)
+    if errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+    contacts = await repositories_contacts.create_contacts(bodies, db, user)
+    bump_data_version(user.email)
+    invalidate_birthday_digest(user)
+    record_contacts_changed(user, added=[contact.birthday for contact in contacts])
+    return json_response(contacts_import_adapter, {"created": len(contacts)}, status_code=status.HTTP_201_CREATED)
+
+
 @router.put('/{contact_id}', status_code=status.HTTP_201_CREATED,
             response_model=ContactResponse,
             dependencies=[Depends(RateLimiter(times=1, seconds=20))])
 async def update_contact(body: ContactSchema, contact_id: int = Path(qe=1),
-                         db: AsyncSession = Depends(get_db),
+                         db: AsyncSession = Depends(get_shard_db),
                          user: User = Depends(auth_service.get_current_user)) -> Contact:
     """
     Update an existing contact.
@@ -96,7 +223,7 @@ async def update_contact(body: ContactSchema, contact_id: int = Path(qe=1),
     Parameters:
         body (ContactSchema): The data for the updated contact.
         contact_id (int): The ID of the contact to update.
-        db (AsyncSession, optional): The database session. Provided by the dependency `get_db`.
+        db (AsyncSession, optional): The database session. Provided by the dependency `get_shard_db`.
         user (User, optional): The current user. Provided by the dependency `auth_service.get_current_user`.
 
     Returns:
@@ -105,15 +232,18 @@ async def update_contact(body: ContactSchema, contact_id: int = Path(qe=1),
     Raises:
         HTTPException: If the request is rate limited or the contact is not found.
     """
-    contact = await repositories_contacts.update_contact(contact_id, body, db, user)
+    contact, old_birthday = await repositories_contacts.update_contact(contact_id, body, db, user)
     if contact is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.CONTACT_NOT_FOUND)
+    bump_data_version(user.email)
+    invalidate_birthday_digest(user)
+    record_contacts_changed(user, added=[contact.birthday], removed=[old_birthday])
     return contact
 
 
 @router.delete('/{contact_id}', dependencies=[Depends(RateLimiter(times=1, seconds=20))])
 async def delete_contact(contact_id: int = Path(qe=1),
-                         db: AsyncSession = Depends(get_db),
+                         db: AsyncSession = Depends(get_shard_db),
                          user: User = Depends(auth_service.get_current_user),
                          ) -> str:
     """
@@ -121,7 +251,7 @@ async def delete_contact(contact_id: int = Path(qe=1),
 
     Parameters:
         contact_id (int): The ID of the contact to delete.
-        db (AsyncSession, optional): The database session. Provided by the dependency `get_db`.
+        db (AsyncSession, optional): The database session. Provided by the dependency `get_shard_db`.
         user (User, optional): The current user. Provided by the dependency `auth_service.get_current_user`.
 
     Returns:
@@ -133,48 +263,99 @@ async def delete_contact(contact_id: int = Path(qe=1),
     contact = await repositories_contacts.delete_contact(contact_id, db, user)
     if contact is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.CONTACT_NOT_FOUND)
+    bump_data_version(user.email)
+    invalidate_birthday_digest(user)
+    record_contacts_changed(user, removed=[contact.birthday])
     return f"{contact.name} {contact.last_name} has been deleted"
 
 
 @router.get('/birthdate/', response_model=list[ContactResponse],
-            dependencies=[Depends(RateLimiter(times=1, seconds=20))])
-async def get_birthdays(db: AsyncSession = Depends(get_db),
-                        user: User = Depends(auth_service.get_current_user)) -> Sequence[Contact]:
+            dependencies=[Depends(RateLimiter(times=1, seconds=20)), Depends(daily_etag_guard)])
+async def get_birthdays(request: Request,
+                        db: AsyncSession = Depends(get_shard_db),
+                        user: User = Depends(auth_service.get_current_user)) -> Response:
     """
     Get a list of contacts with upcoming seven birthdays.
+    Supports conditional GET: a request with a current If-None-Match header gets 304 Not Modified.
+    The ETag includes today's date, as the list moves on at midnight.
 
     Parameters:
-        db (AsyncSession, optional): The database session. Provided by the dependency `get_db`.
+        request (Request): The incoming request, carrying the ETag computed by `daily_etag_guard`.
+        db (AsyncSession, optional): The database session. Provided by the dependency `get_shard_db`.
         user (User, optional): The current user. Provided by the dependency `auth_service.get_current_user`.
 
     Returns:
-        Sequence[Contact]: A list of contacts with upcoming birthdays.
+        Response: A list of contacts with upcoming birthdays.
 
     Raises:
         HTTPException: If the request is rate limited.
     """
-    contacts = await repositories_contacts.get_birthdays(db, user)
-    return contacts
+    digest = await get_birthday_digest(user, db)
+    return Response(digest, media_type="application/json", headers=etag_headers(request))
 
 
 @router.get('/search/{search_string}', response_model=list[ContactResponse],
             dependencies=[Depends(RateLimiter(times=1, seconds=20))])
 async def search_contacts(search_string: str = Path(min_length=2, max_length=20),
-                          db: AsyncSession = Depends(get_db),
-                          user: User = Depends(auth_service.get_current_user)) -> Sequence[Contact]:
+                          db: AsyncSession = Depends(get_shard_db),
+                          user: User = Depends(auth_service.get_current_user)) -> Response:
     """
     Search for contacts.
 
     Parameters:
         search_string (str): The search string to use for the search.
-        db (AsyncSession, optional): The database session. Provided by the dependency `get_db`.
+        db (AsyncSession, optional): The database session. Provided by the dependency `get_shard_db`.
         user (User, optional): The current user. Provided by the dependency `auth_service.get_current_user`.
 
     Returns:
-        Sequence[Contact]: A list of contacts that match the search string.
+        Response: A list of contacts that match the search string.
 
     Raises:
         HTTPException: If the request is rate limited.
     """
     contacts = await repositories_contacts.search_contacts(search_string, db, user)
-    return contacts
+    return json_response(contacts_adapter, contacts)
+
+
+@router.get('/phone/{phone_number}', response_model=list[ContactResponse],
+            dependencies=[Depends(RateLimiter(times=1, seconds=10))])
+async def get_contacts_by_phone(phone_number: str = Path(min_length=7, max_length=20),
+                                db: AsyncSession = Depends(get_shard_db),
+                                user: User = Depends(auth_service.get_current_user)) -> Response:
+    """
+    Find contacts by phone number. The number is normalized first, so "050 123 45 67" finds "+380501234567".
+
+    Parameters:
+        phone_number (str): The phone number to look for.
+        db (AsyncSession, optional): The database session. Provided by the dependency `get_shard_db`.
+        user (User, optional): The current user. Provided by the dependency `auth_service.get_current_user`.
+
+    Returns:
+        Response: A list of contacts with the phone number.
+
+    Raises:
+        HTTPException: If the request is rate limited.
+    """
+    contacts = await repositories_contacts.get_contacts_by_phone(phone_number, db, user)
+    return json_response(contacts_adapter, contacts)
+
+
+@router.get('/duplicates/', response_model=list[DuplicateContactsResponse],
+            dependencies=[Depends(RateLimiter(times=1, seconds=20))])
+async def get_duplicate_contacts(db: AsyncSession = Depends(get_shard_db),
+                                 user: User = Depends(auth_service.get_current_user)) -> Response:
+    """
+    Find duplicate contacts: groups of contacts sharing a normalized phone number or email.
+
+    Parameters:
+        db (AsyncSession, optional): The database session. Provided by the dependency `get_shard_db`.
+        user (User, optional): The current user. Provided by the dependency `auth_service.get_current_user`.
+
+    Returns:
+        Response: A list of groups with the shared field ("phone" or "email"), the key and the contacts.
+
+    Raises:
+        HTTPException: If the request is rate limited.
+    """
+    groups = await repositories_contacts.get_duplicate_contacts(db, user)
+    return json_response(duplicates_adapter, groups)
@@ -1,31 +1,59 @@
-from typing import List, Sequence
+from datetime import datetime
+from typing import AsyncIterator, List, Sequence
+from uuid import UUID
 
-from fastapi import Depends, APIRouter
-from sqlalchemy import select
+from fastapi import Depends, APIRouter, Query, Response
+from fastapi.responses import StreamingResponse
 
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.entity.models import User
 from src.database.connect import get_db
+from src.repository import users as repositories_users
 from src.schemas.user import UserResponse
 
 router = APIRouter(prefix='/custom_tasks', tags=['dev_temporary'])  # Creates a new router for custom_tasks-related
 # routes
 
 
+async def _users_ndjson(users: AsyncIterator[User]) -> AsyncIterator[str]:
+    """
+    Serialize streamed users as newline-delimited JSON, one user per line.
+    """
+    async for user in users:
+        yield UserResponse.model_validate(user, from_attributes=True).model_dump_json() + "\n"
+
+
 @router.get("/get_users", response_model=List[UserResponse])
-async def get_signup_users(db: AsyncSession = Depends(get_db)) -> Sequence[User]:
+async def get_signup_users(response: Response,
+                           limit: int = Query(100, ge=1, le=1000),
+                           after: UUID | None = None,
+                           email_verified: bool | None = None,
+                           created_from: datetime | None = None,
+                           created_to: datetime | None = None,
+                           stream: bool = False,
+                           db: AsyncSession = Depends(get_db)) -> Sequence[User] | StreamingResponse:
     """
     Asynchronous function for retrieving a list of users.
+    Users are paginated by id: pass the X-Next-Cursor header of a page as `after` to get the next one.
+    With `stream` set, all matching users are streamed as NDJSON instead and `limit`/`after` are ignored.
     Parameters:
+    - response: Response object used to set the X-Next-Cursor header
+    - limit: the maximum number of users on a page
+    - after: the id of the last user of the previous page
+    - email_verified: return only users with this verification status
+    - created_from: return only users created at or after this moment
+    - created_to: return only users created before this moment
+    - stream: stream all matching users as NDJSON
     - db: AsyncSession object for database interaction
     Returns:
-    - Sequence of User objects representing the list of users
+    - Sequence of User objects representing the list of users, or a streaming NDJSON response
     """
-    request = select(User)
-    response = await db.execute(request)
-    result = response.scalars().all()
+    if stream:
+        users = repositories_users.stream_users(db, email_verified, created_from, created_to)
+        return StreamingResponse(_users_ndjson(users), media_type="application/x-ndjson")
+    result = await repositories_users.get_users(limit, after, db, email_verified, created_from, created_to)
+    if len(result) == limit:
+        response.headers["X-Next-Cursor"] = str(result[-1].id)
     return result
-
-
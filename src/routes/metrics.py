@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.services.metrics import registry
+
+router = APIRouter(tags=['service'])  # Creates a new router for the metrics endpoint
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> str:
+    """
+    Expose the application metrics in the Prometheus text format.
+
+    Returns:
+        str: Request latency histograms per route, in-flight requests, database pool state,
+        Redis command latency and cache hit ratios.
+    """
+    return registry.render()
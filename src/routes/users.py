@@ -1,43 +1,97 @@
-import pickle
+import functools
+from uuid import UUID
 
-import cloudinary
-import cloudinary.uploader
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     Depends,
     UploadFile,
     File,
+    Request,
+    Response,
+    status,
 )
 from fastapi_limiter.depends import RateLimiter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.connect import get_db
+from src.database.connect import get_db, sessionmanager
+from src.database.sharding import shardmanager
 from src.entity.models import User
 from src.schemas.user import UserResponse
 from src.services.auth import auth_service
-from src.services.cache_redis import update_user_cache
+from src.services import refresh_tokens
+from src.services.cache_redis import update_user_cache, invalidate_user_cache
+from src.services.serialization import json_response, user_adapter
+from src.services.etag import etag_guard, etag_headers, bump_data_version
+from src.services.contact_stats import invalidate_contact_stats
 from src.conf.config import config
+from src.conf import messages
 from src.repository import users as repositories_users
 
 router = APIRouter(prefix="/users", tags=["users"])  # Creates a new router for users-related routes
 
 
-# Configures the Cloudinary library
-cloudinary.config(
-    cloud_name=config.CLD_NAME,
-    api_key=config.CLD_API_KEY,
-    api_secret=config.CLD_API_SECRET_KEY,
-    secure=True,
-)
+@functools.cache
+def _cloudinary():
+    """
+    Import and configure the Cloudinary library on first use, so it is not loaded at application start.
+    """
+    import cloudinary
+    import cloudinary.uploader
+
+    cloudinary.config(
+        cloud_name=config.CLD_NAME,
+        api_key=config.CLD_API_KEY,
+        api_secret=config.CLD_API_SECRET_KEY,
+        secure=True,
+    )
+    return cloudinary
 
 
 @router.get("/me", response_model=UserResponse,
-            dependencies=[Depends(RateLimiter(times=1, seconds=20))], )
-async def get_current_user(user: User = Depends(auth_service.get_current_user)) -> User:
+            dependencies=[Depends(RateLimiter(times=1, seconds=20)), Depends(etag_guard)], )
+async def get_current_user(request: Request, user: User = Depends(auth_service.get_current_user)) -> Response:
     """
     A function to get the current user, taking in a user object as a parameter and returning a user object.
+    Supports conditional GET: a request with a current If-None-Match header gets 304 Not Modified.
     """
-    return user
+    return json_response(user_adapter, user, headers=etag_headers(request))
+
+
+async def _purge_account(user_id: UUID) -> None:
+    """
+    Purge the user and their contacts in sessions of its own, on the user's shard first: a background
+    task must not rely on the sessions of the request, which may be closed by the time it runs.
+    """
+    if shardmanager is not None:
+        async with shardmanager.session(user_id, reraise=True) as shard_db:
+            await repositories_users.purge_user(user_id, shard_db)
+    async with sessionmanager.session(reraise=True) as db:
+        await repositories_users.purge_user(user_id, db)
+
+
+@router.delete("/me", status_code=status.HTTP_202_ACCEPTED,
+               dependencies=[Depends(RateLimiter(times=1, seconds=20))])
+async def delete_current_user(background_tasks: BackgroundTasks,
+                              user: User = Depends(auth_service.get_current_user)) -> dict:
+    """
+    Delete the account of the current user with all of their contacts.
+    The refresh tokens are revoked and the cached user dropped right away; the rows are purged
+    in bounded batches by a background task after the response is sent, on the user's shard first.
+
+    Args:
+        background_tasks (BackgroundTasks): Runs the purge after the response.
+        user (User): The current user.
+
+    Returns:
+        dict: A message that the deletion has been scheduled.
+    """
+    await refresh_tokens.revoke_all_refresh_tokens(user.email)
+    await invalidate_user_cache(user.email)
+    bump_data_version(user.email)
+    invalidate_contact_stats(user)
+    background_tasks.add_task(_purge_account, user.id)
+    return {"message": messages.ACCOUNT_DELETION_SCHEDULED}
 
 
 #
@@ -61,6 +115,7 @@ async def get_current_user(
     Returns:
         User: The updated user object after avatar url has been updated.
     """
+    cloudinary = _cloudinary()
     public_id = f"FastAPI_contacts/{user.email}"
     res = cloudinary.uploader.upload(file.file, public_id=public_id, owerite=True)
     print(f"res: {res}")
@@ -70,4 +125,5 @@ async def get_current_user(
     print(f"res_url: {res_url}")
     user = await repositories_users.update_avatar_url(user.email, res_url, db)
     await update_user_cache(user)
+    bump_data_version(user.email)
     return user
@@ -1,13 +1,16 @@
 from datetime import date
 
 
-from pydantic import BaseModel, Field, EmailStr, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, PositiveInt
+
+from src.conf.config import config
+from src.services.normalization import EmailAddress
 
 
 class ContactSchema(BaseModel):
     name: str = Field(min_length=3, max_length=100)
     last_name: str = Field(min_length=3, max_length=100)
-    email: EmailStr = Field(min_length=3, max_length=30, description="Input correct email address")
+    email: EmailAddress = Field(min_length=3, max_length=30, description="Input correct email address")
     phone_number: str = Field(min_length=7, max_length=20)
     birthday: date
 
@@ -21,6 +24,30 @@ class ContactResponse(ContactSchema):
         from_attributes = True
 
 
+class ContactIdsSchema(BaseModel):
+    ids: list[PositiveInt] = Field(min_length=1, max_length=config.CONTACTS_BATCH_MAX_IDS)
+
+
+class ContactsBatchResponse(BaseModel):
+    contacts: list[ContactResponse]
+    missing: list[int]
+
+
+class ContactsImportResponse(BaseModel):
+    created: int
+
+
+class ContactStatsResponse(BaseModel):
+    total: int
+    by_month: dict[int, int]
+
+
+class DuplicateContactsResponse(BaseModel):
+    field: str
+    key: str
+    contacts: list[ContactResponse]
+
+
 class BirthdaysResponse(BaseModel):
 
     birthday: date
@@ -1,10 +1,12 @@
-from pydantic import BaseModel, Field, EmailStr, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict
 from uuid import UUID
 
+from src.services.normalization import EmailAddress
+
 
 class UserSchema(BaseModel):
     username: str = Field(min_length=3, max_length=1000)
-    email: EmailStr
+    email: EmailAddress
     password: str = Field(min_length=3, max_length=250)
 
     model_config = ConfigDict(extra='ignore', env_file=".env", env_file_encoding="utf-8")
@@ -13,7 +15,7 @@ class UserSchema(BaseModel):
 class UserResponse(BaseModel):
     id: UUID
     username: str
-    email: EmailStr
+    email: EmailAddress
     avatar: str | None
     email_verified: bool | None
 
@@ -27,4 +29,4 @@ class TokenSchema(BaseModel):
 
 
 class RequestEmail(BaseModel):
-    email: EmailStr
+    email: EmailAddress
@@ -1,3 +1,4 @@
+import pickle
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -11,6 +12,21 @@ from src.database.connect import get_db
 from src.entity.models import User
 from src.conf.config import config
 from src.services.cache_redis import get_user_cache
+from src.services.normalization import normalize_email
+from src.services.single_flight import SingleFlight
+
+# Concurrent requests of a user share one lookup, each getting its own copy of the user, detached like a cached one
+user_lookups = SingleFlight("current_user", share=pickle.dumps, unshare=pickle.loads)
+
+
+def _canonical_claims(data: dict) -> dict:
+    """
+    Copy the claims of a new token with the subject email normalized, so one user always gets the same `sub`.
+    """
+    to_encode = data.copy()
+    if to_encode.get("sub"):
+        to_encode["sub"] = normalize_email(to_encode["sub"])
+    return to_encode
 
 
 class Auth:
@@ -28,11 +44,12 @@ class Auth:
         create_access_token(data, expires_delta): Create a new access token.
         create_refresh_token(data, expires_delta): Create a new refresh token.
         decode_refresh_token(refresh_token): Decode a refresh token.
+        decode_access_token(token): Decode an access token.
         get_current_user(token, db): Get the current user from a token.
         create_email_token(data): Create a new email token.
         get_email_from_token(token): Get the email from an email token.
     """
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=config.PASSWORD_HASH_ROUNDS)
     SECRET_KEY = config.SECRET_KEY
     ALGORITHM = config.ALGORITHM
 
@@ -73,7 +90,7 @@ class Auth:
         Returns:
             str: The encoded access token.
         """
-        to_encode = data.copy()
+        to_encode = _canonical_claims(data)
         if expires_delta:
             expire = datetime.utcnow() + timedelta(seconds=expires_delta)
         else:
@@ -93,7 +110,7 @@ class Auth:
         Returns:
             str: The encoded refresh token.
         """
-        to_encode = data.copy()
+        to_encode = _canonical_claims(data)
         if expires_delta:
             expire = datetime.utcnow() + timedelta(seconds=expires_delta)
         else:
@@ -124,17 +141,15 @@ class Auth:
         except JWTError:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate credentials')
 
-    async def get_current_user(self, token: str = Depends(oauth2_scheme),
-                               db: AsyncSession = Depends(get_db)) -> User:
+    def decode_access_token(self, token: str) -> str:
         """
-        Get the current user from a token.
+        Decode an access token and return the email, without touching the database.
 
         Parameters:
-            token (str, optional): The token to decode.
-            db (AsyncSession, optional): The database session.
+            token (str): The access token to decode.
 
         Returns:
-            User: The current user.
+            str: The email associated with the access token.
 
         Raises:
             HTTPException: If the token has an invalid scope or could not be validated.
@@ -155,8 +170,28 @@ class Auth:
                 raise credentials_exception
         except JWTError:
             raise credentials_exception
+        return email
 
-        user: User = await get_user_cache(email, db)
+    async def get_current_user(self, token: str = Depends(oauth2_scheme),
+                               db: AsyncSession = Depends(get_db)) -> User:
+        """
+        Get the current user from a token.
+
+        Parameters:
+            token (str, optional): The token to decode.
+            db (AsyncSession, optional): The database session.
+
+        Returns:
+            User: The current user.
+
+        Raises:
+            HTTPException: If the token has an invalid scope or could not be validated, or the user does not exist.
+        """
+        email = self.decode_access_token(token)
+        user: User = await user_lookups.do(normalize_email(email), lambda: get_user_cache(email, db))
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials",
+                                headers={"WWW-Authenticate": "Bearer"})
         return user
 
     def create_email_token(self, data: dict) -> str:
@@ -169,7 +204,7 @@ class Auth:
         Returns:
             str: The encoded email token.
         """
-        to_encode = data.copy()
+        to_encode = _canonical_claims(data)
         expire = datetime.utcnow() + timedelta(days=1)
         to_encode.update({"iat": datetime.utcnow(), "exp": expire})
         token = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
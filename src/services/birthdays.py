@@ -0,0 +1,189 @@
+import asyncio
+import contextlib
+import itertools
+from datetime import date, datetime, timedelta
+from typing import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import config
+from src.database.sharding import contact_databases
+from src.entity.models import User
+from src.repository import contacts as repositories_contacts
+from src.services import cache_redis
+from src.services.email import send_birthday_reminder
+from src.services.serialization import contacts_adapter, render
+
+LOCK_KEY = "birthday_digests:lock"
+# Left in place of a digest by a contact write until midnight: a miss for readers, and the daily job,
+# which writes only where no digest is, does not put back a digest read before the write
+INVALIDATED = b""
+
+
+def _digest_key(user_id) -> str:
+    return f"birthday_digest:{user_id}"
+
+
+def _seconds_to_midnight() -> int:
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(int((midnight - now).total_seconds()), 1)
+
+
+def _days_until(birthday: date, start: date) -> int:
+    day = 28 if (birthday.month, birthday.day) == (2, 29) else birthday.day
+    upcoming = date(start.year, birthday.month, day)
+    if upcoming < start:
+        upcoming = date(start.year + 1, birthday.month, day)
+    return (upcoming - start).days
+
+
+def render_digest(contacts: Sequence, start: date) -> bytes:
+    """
+    Serialize the contacts of one user as the JSON body of the birthdays endpoint, the nearest birthday first.
+
+    Parameters:
+        contacts (Sequence): Contacts, or rows with the ContactResponse fields.
+        start (date): The first day of the period.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    ordered = sorted(contacts, key=lambda contact: (_days_until(contact.birthday, start), contact.name))
+    return render(contacts_adapter, ordered)
+
+
+async def get_birthday_digest(user: User, db: AsyncSession) -> bytes:
+    """
+    The upcoming birthdays of the user's contacts as a JSON body, read from the digest in Redis.
+    Without a digest, e.g. after a contact changed, it is computed for this user and stored until midnight.
+
+    Parameters:
+        user (User): The user.
+        db (AsyncSession): The database session for the fallback query.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    cache = cache_redis.get_cache()
+    digest = cache.get(_digest_key(user.id))
+    if digest:
+        return digest
+    today = date.today()
+    contacts = await repositories_contacts.get_birthdays(db, user, config.BIRTHDAY_DIGEST_DAYS, today)
+    digest = render_digest(contacts, today)
+    cache.set(_digest_key(user.id), digest, ex=_seconds_to_midnight())
+    return digest
+
+
+def invalidate_birthday_digest(user: User) -> None:
+    """
+    Replace the digest of the user with the INVALIDATED marker after a change to their contacts,
+    the next read rebuilds it.
+
+    Parameters:
+        user (User): The user.
+
+    Returns:
+        None
+    """
+    cache_redis.get_cache().set(_digest_key(user.id), INVALIDATED, ex=_seconds_to_midnight())
+
+
+async def send_reminders(reminders: list[tuple[str, str, list[dict]]], batch_size: int) -> None:
+    """
+    Send the reminder mails, `batch_size` of them concurrently at a time.
+
+    Parameters:
+        reminders (list[tuple]): The email, the username and the contacts of every user to remind.
+        batch_size (int): The number of mails sent concurrently.
+
+    Returns:
+        None
+    """
+    for start in range(0, len(reminders), batch_size):
+        await asyncio.gather(*(send_birthday_reminder(email, username, contacts)
+                               for email, username, contacts in reminders[start:start + batch_size]))
+
+
+class BirthdayDigestJob:
+    """
+    Builds the birthday digests of all users once a day, in a background task of every worker.
+    A Redis lock held until midnight lets only one worker of the deployment do the work each day.
+    The digests of users with upcoming birthdays are precomputed with one set-based query per shard and,
+    if BIRTHDAY_REMINDERS_ENABLED is set, these users get a reminder mail.
+
+    Attributes:
+        interval (float): The delay between two checks whether today's digests are built, in seconds.
+        built_on (date | None): The day this worker last built the digests.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.built_on: date | None = None
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self) -> bool:
+        """
+        Build today's digests unless another worker already did.
+
+        Returns:
+            bool: True if this call built the digests.
+        """
+        cache = cache_redis.get_cache()
+        today = date.today()
+        ttl = _seconds_to_midnight()
+        if not cache.set(LOCK_KEY, today.isoformat(), nx=True, ex=ttl):
+            return False
+        try:
+            rows = []
+            for database in contact_databases():
+                async with database.session(reraise=True) as db:
+                    rows.extend(await repositories_contacts.get_all_birthdays(db, config.BIRTHDAY_DIGEST_DAYS,
+                                                                              today))
+            reminders = []
+            pipe = cache.pipeline()
+            for user_id, user_rows in itertools.groupby(rows, key=lambda row: row.user_id):
+                contacts = list(user_rows)
+                # NX: a digest or INVALIDATED marker there was written after midnight, possibly after the query
+                pipe.set(_digest_key(user_id), render_digest(contacts, today), ex=ttl, nx=True)
+                reminders.append((contacts[0].user_email, contacts[0].username,
+                                  [{"name": contact.name, "last_name": contact.last_name,
+                                    "birthday": contact.birthday.strftime("%d.%m")} for contact in contacts]))
+            pipe.execute()
+        except Exception:
+            cache.delete(LOCK_KEY)
+            raise
+        self.built_on = today
+        # Sent after the lock is settled, so a failing mail server never leads to duplicate reminders
+        if config.BIRTHDAY_REMINDERS_ENABLED:
+            await send_reminders(reminders, config.BIRTHDAY_REMINDER_BATCH_SIZE)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as err:
+                print(err)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """
+        Start the job in a background task of the running event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Cancel the background task and wait for it to finish.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+birthday_digest_job = BirthdayDigestJob(interval=config.BIRTHDAY_DIGEST_CHECK_INTERVAL)
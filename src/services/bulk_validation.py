@@ -0,0 +1,36 @@
+from typing import Any
+
+from pydantic import TypeAdapter, ValidationError
+
+from src.schemas.contact import ContactSchema
+from src.schemas.user import UserSchema
+
+# List adapters built once at import: a whole batch is validated by one call into pydantic-core
+contacts_bulk_adapter = TypeAdapter(list[ContactSchema])
+users_bulk_adapter = TypeAdapter(list[UserSchema])
+
+
+def validate_rows(adapter: TypeAdapter, rows: list[Any]) -> tuple[list, list[dict]]:
+    """
+    Validate a batch of rows with a list adapter and report the errors by row index.
+    The valid rows are validated a second time, without the rows in error, only if there are errors;
+    the email domains are cached by then, see src.services.normalization.validate_email_address.
+
+    Parameters:
+        adapter (TypeAdapter): A list adapter, e.g. contacts_bulk_adapter.
+        rows (list[Any]): The rows as dicts or objects.
+
+    Returns:
+        tuple[list, list[dict]]: The validated models of the valid rows, in order, and the errors,
+        each with the "index" of the row, the "field" (None for the whole row) and the "message".
+    """
+    try:
+        return adapter.validate_python(rows), []
+    except ValidationError as error:
+        errors = [{"index": detail["loc"][0],
+                   "field": ".".join(str(part) for part in detail["loc"][1:]) or None,
+                   "message": detail["msg"]}
+                  for detail in error.errors(include_url=False, include_input=False)]
+    failed = {detail["index"] for detail in errors}
+    valid = adapter.validate_python([row for index, row in enumerate(rows) if index not in failed])
+    return valid, errors
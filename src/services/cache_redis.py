@@ -1,4 +1,5 @@
 import pickle
+import time
 
 from redis import Redis
 from fastapi import Depends, HTTPException, status
@@ -8,12 +9,56 @@ from src.entity.models import User
 from src.database.connect import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.repository import users as repository_users
+from src.services.metrics import REDIS_LATENCY, CACHE_REQUESTS
+from src.services.normalization import normalize_email
 
-# Create a Redis cache instance.
-cache = Redis(host=config.REDIS_DOMAIN,
-              port=config.REDIS_PORT,
-              db=0,
-              password=config.REDIS_PASSWORD, )
+
+class TimedRedis(Redis):
+    """
+    A Redis client recording the latency of every command in the redis_command_duration_seconds histogram.
+    """
+
+    def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            REDIS_LATENCY.observe(time.perf_counter() - start, str(args[0]).lower())
+
+
+def get_cache() -> Redis:
+    """
+    Return the shared Redis cache client, creating it on first use so importing the module stays cheap.
+
+    Returns:
+        Redis: The cache client.
+    """
+    global cache
+    try:
+        return cache
+    except NameError:
+        cache = TimedRedis(host=config.REDIS_DOMAIN,
+                           port=config.REDIS_PORT,
+                           db=0,
+                           password=config.REDIS_PASSWORD, )
+        return cache
+
+
+def close_cache() -> None:
+    """
+    Close the connections of the cache client, if it was created.
+    """
+    if "cache" in globals():
+        cache.close()
+
+
+def __getattr__(name: str):
+    """
+    Build the `cache` module attribute lazily on first access.
+    """
+    if name == "cache":
+        return get_cache()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 credentials_exception = HTTPException(
     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -33,17 +78,32 @@ async def get_user_cache(email: str, db: AsyncSession = Depends(get_db)) -> User
     Returns:
         User: The user object retrieved either from the cache or the database.
     """
-    user_hash = str(email)
-    user = cache.get(user_hash)
+    user_hash = normalize_email(str(email))
+    user = get_cache().get(user_hash)
     if user is None:
+        CACHE_REQUESTS.inc("user", "miss")
         user = await repository_users.get_user_by_email(email, db)
         # cache.set(user_hash, pickle.dumps(user))
         # cache.expire(user_hash, 1)
     else:
+        CACHE_REQUESTS.inc("user", "hit")
         user = pickle.loads(user)
     return user
 
 
+async def invalidate_user_cache(email: str) -> None:
+    """
+    Remove a user from the cache, e.g. when the account is deleted.
+
+    Parameters:
+        email (str): The email of the user.
+
+    Returns:
+        None
+    """
+    get_cache().delete(normalize_email(email))
+
+
 async def update_user_cache(user: User, time=300) -> None:
     """
     Update the user cache with the provided user object and set an expiration time.
@@ -55,5 +115,6 @@ async def update_user_cache(user: User, time=300) -> None:
     Returns:
         None
     """
-    cache.set(user.email, pickle.dumps(user))
-    cache.expire(user.email, time)
+    user_hash = normalize_email(user.email)
+    get_cache().set(user_hash, pickle.dumps(user))
+    get_cache().expire(user_hash, time)
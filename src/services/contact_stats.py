@@ -0,0 +1,111 @@
+from datetime import date
+from typing import Iterable
+
+from redis.exceptions import WatchError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import config
+from src.entity.models import User
+from src.repository import contacts as repositories_contacts
+from src.services import cache_redis
+
+# Written by a rebuild only: a hash without it was created by increments alone and is not complete
+READY_FIELD = "ready"
+TOTAL_FIELD = "total"
+
+
+def _stats_key(user_id) -> str:
+    return f"contact_stats:{user_id}"
+
+
+def _month_field(month: int) -> str:
+    return f"month:{month}"
+
+
+def _decode(stats: dict) -> dict:
+    values = {(field.decode() if isinstance(field, bytes) else field): int(value) for field, value in stats.items()}
+    return {"total": values.get(TOTAL_FIELD, 0),
+            "by_month": {month: values.get(_month_field(month), 0) for month in range(1, 13)}}
+
+
+async def get_contact_stats(user: User, db: AsyncSession) -> dict:
+    """
+    The counters of the user's contacts: the total and the number of birthdays in every month.
+    They are read from a Redis hash in O(1); without a complete hash, they are counted with one
+    GROUP BY query and stored for CONTACT_STATS_TTL seconds.
+
+    The hash is WATCHed from before the count: if a write changes or drops it in the meantime, the
+    count may miss that write and is not stored, the next read counts again. Increments do not extend
+    the TTL, so it bounds the one drift left: a write committed before the count whose increment
+    only lands after the count was stored is counted twice until the hash expires.
+
+    Parameters:
+        user (User): The user.
+        db (AsyncSession): The database session for the fallback query.
+
+    Returns:
+        dict: The total and the counts by month number, 1 to 12.
+    """
+    cache = cache_redis.get_cache()
+    key = _stats_key(user.id)
+    stats = cache.hgetall(key)
+    if stats and (READY_FIELD in stats or READY_FIELD.encode() in stats):
+        return _decode(stats)
+    pipe = cache.pipeline()
+    try:
+        pipe.watch(key)
+        by_month = await repositories_contacts.count_contacts_by_month(db, user)
+        stats = {TOTAL_FIELD: sum(by_month.values()), READY_FIELD: 1}
+        stats.update({_month_field(month): by_month.get(month, 0) for month in range(1, 13)})
+        pipe.multi()
+        pipe.hset(key, mapping=stats)
+        pipe.expire(key, config.CONTACT_STATS_TTL)
+        pipe.execute()
+    except WatchError:
+        pass
+    finally:
+        pipe.reset()
+    return _decode(stats)
+
+
+def record_contacts_changed(user: User, added: Iterable[date] = (), removed: Iterable[date] = ()) -> None:
+    """
+    Apply created, deleted and updated contacts to the counters of the user, in one round trip.
+    Bulk paths pass all the birthdays of a batch at once; an update passes the new birthday as added
+    and the old one as removed. The TTL is set only on a hash the increments create, see get_contact_stats.
+
+    Parameters:
+        user (User): The owner of the contacts.
+        added (Iterable[date]): The birthdays of the created contacts.
+        removed (Iterable[date]): The birthdays of the deleted contacts.
+
+    Returns:
+        None
+    """
+    deltas: dict[str, int] = {}
+    for birthday, delta in [(birthday, 1) for birthday in added] + [(birthday, -1) for birthday in removed]:
+        deltas[TOTAL_FIELD] = deltas.get(TOTAL_FIELD, 0) + delta
+        field = _month_field(birthday.month)
+        deltas[field] = deltas.get(field, 0) + delta
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    key = _stats_key(user.id)
+    pipe = cache_redis.get_cache().pipeline()
+    for field, delta in deltas.items():
+        pipe.hincrby(key, field, delta)
+    pipe.expire(key, config.CONTACT_STATS_TTL, nx=True)
+    pipe.execute()
+
+
+def invalidate_contact_stats(user: User) -> None:
+    """
+    Drop the counters of the user, e.g. after their contacts were moved to another shard, the next read recounts them.
+
+    Parameters:
+        user (User): The user.
+
+    Returns:
+        None
+    """
+    cache_redis.get_cache().delete(_stats_key(user.id))
@@ -1,25 +1,18 @@
 from pathlib import Path
 
 from pydantic import EmailStr
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
 
 from src.services.auth import auth_service
 from src.conf.config import config
 
 
-async def send_email(email: EmailStr, username: str, host: str) -> None:
+def _connection_config():
     """
-    A function that sends an email to the specified email address for verification.
-
-    Parameters:
-        email (EmailStr): The email address to send the verification email to.
-        username (str): The username associated with the email address.
-        host (str): The host address for the email service.
-
-    Returns:
-        None
+    The fastapi_mail connection settings. fastapi_mail is imported on first use to keep application start cheap.
     """
-    conf = ConnectionConfig(
+    from fastapi_mail import ConnectionConfig
+
+    return ConnectionConfig(
         MAIL_USERNAME=config.MAIL_USERNAME,
         MAIL_PASSWORD=config.MAIL_PASSWORD,
         MAIL_FROM=config.MAIL_FROM,
@@ -32,6 +25,23 @@ async def send_email(email: EmailStr, username: str, host: str) -> None:
         VALIDATE_CERTS=True,
         TEMPLATE_FOLDER=Path('templates')
     )
+
+
+async def send_email(email: EmailStr, username: str, host: str) -> None:
+    """
+    A function that sends an email to the specified email address for verification.
+
+    Parameters:
+        email (EmailStr): The email address to send the verification email to.
+        username (str): The username associated with the email address.
+        host (str): The host address for the email service.
+
+    Returns:
+        None
+    """
+    from fastapi_mail import FastMail, MessageSchema, MessageType
+
+    conf = _connection_config()
     try:
         token_verification = auth_service.create_email_token({"sub": email})
         message = MessageSchema(
@@ -46,3 +56,32 @@ async def send_email(email: EmailStr, username: str, host: str) -> None:
         await fm.send_message(message, template_name="request_verify_email.html")
     except ConnectionError as err:
         print(err)
+
+
+async def send_birthday_reminder(email: EmailStr, username: str, contacts: list[dict]) -> None:
+    """
+    A function that sends the upcoming birthdays of a user's contacts to the user.
+
+    Parameters:
+        email (EmailStr): The email address of the user.
+        username (str): The username of the user.
+        contacts (list[dict]): The contacts with upcoming birthdays, with name, last_name and birthday.
+
+    Returns:
+        None
+    """
+    from fastapi_mail import FastMail, MessageSchema, MessageType
+
+    try:
+        message = MessageSchema(
+            subject="Upcoming birthdays",
+            recipients=[email],
+            template_body={"username": username, "contacts": contacts},
+            subtype=MessageType.html
+        )
+
+        fm = FastMail(_connection_config())
+
+        await fm.send_message(message, template_name="birthday_reminder.html")
+    except ConnectionError as err:
+        print(err)
@@ -0,0 +1,110 @@
+import hashlib
+from datetime import date
+
+from fastapi import HTTPException, Request, status
+
+from src.services import cache_redis
+from src.services.auth import auth_service
+from src.services.normalization import normalize_email
+
+
+def _version_key(email: str) -> str:
+    return f"data_version:{normalize_email(email)}"
+
+
+def data_version(email: str) -> int:
+    """
+    Get the data version of the user. It changes whenever contacts or profile data of the user change.
+
+    Parameters:
+        email (str): The email of the user.
+
+    Returns:
+        int: The current version, 0 if the user has not written anything yet.
+    """
+    version = cache_redis.get_cache().get(_version_key(email))
+    return int(version) if version else 0
+
+
+def bump_data_version(email: str) -> None:
+    """
+    Invalidate the ETags of the user. Call it after a write to the user's data has been committed.
+
+    Parameters:
+        email (str): The email of the user.
+
+    Returns:
+        None
+    """
+    cache_redis.get_cache().incr(_version_key(email))
+
+
+def make_etag(email: str, version: int, request: Request, day: date | None = None) -> str:
+    """
+    Build the ETag of a read request from the user's data version, the path and the query parameters.
+
+    Parameters:
+        email (str): The email of the user.
+        version (int): The data version of the user.
+        request (Request): The read request.
+        day (date | None): The day the representation is valid for, if it depends on the date.
+
+    Returns:
+        str: A weak ETag.
+    """
+    key = f"{normalize_email(email)}:{version}:{request.url.path}?{request.url.query}"
+    if day is not None:
+        key = f"{key}:{day.isoformat()}"
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+
+async def etag_guard(request: Request) -> None:
+    """
+    A route dependency for conditional GET. It reads the user from the access token only, so a matching
+    If-None-Match header is answered with 304 Not Modified before the database is touched.
+    Otherwise the ETag is stored in request.state.etag for the response.
+
+    Parameters:
+        request (Request): The incoming request.
+
+    Raises:
+        HTTPException: 304 Not Modified if the client already has the current representation.
+    """
+    _check_etag(request)
+
+
+async def daily_etag_guard(request: Request) -> None:
+    """
+    The etag_guard of reads that also depend on today's date, e.g. the upcoming birthdays:
+    their ETags change at midnight even if the user's data did not.
+
+    Parameters:
+        request (Request): The incoming request.
+
+    Raises:
+        HTTPException: 304 Not Modified if the client already has today's representation.
+    """
+    _check_etag(request, date.today())
+
+
+def _check_etag(request: Request, day: date | None = None) -> None:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return
+    try:
+        email = auth_service.decode_access_token(token)
+    except HTTPException:
+        return
+    etag = make_etag(email, data_version(email), request, day)
+    request.state.etag = etag
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in {tag.strip() for tag in if_none_match.split(",")}):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def etag_headers(request: Request) -> dict[str, str] | None:
+    """
+    The ETag header computed by etag_guard for the response, if any.
+    """
+    etag = getattr(request.state, "etag", None)
+    return {"ETag": etag} if etag else None
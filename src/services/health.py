@@ -0,0 +1,129 @@
+import asyncio
+import contextlib
+import time
+from typing import Awaitable, Callable
+
+from src.conf.config import config
+from src.database.connect import sessionmanager
+from src.database.sharding import shardmanager
+from src.services import cache_redis
+
+
+async def check_postgres() -> None:
+    """
+    Check that the database answers a trivial query.
+    """
+    await sessionmanager.ping()
+
+
+async def check_shards() -> None:
+    """
+    Check that every contacts shard answers a trivial query.
+    """
+    await shardmanager.ping()
+
+
+async def check_redis() -> None:
+    """
+    Check that Redis answers a PING. The client is synchronous, so the call runs in a thread.
+    """
+    await asyncio.to_thread(cache_redis.get_cache().ping)
+
+
+async def check_smtp() -> None:
+    """
+    Check that the mail server accepts TCP connections.
+    """
+    _, writer = await asyncio.open_connection(config.MAIL_SERVER, config.MAIL_PORT)
+    writer.close()
+    await writer.wait_closed()
+
+
+class HealthProber:
+    """
+    Probes the application dependencies in the background and keeps the last result,
+    so health endpoints answer from memory instead of hitting the dependencies on every request.
+
+    Attributes:
+        checks (dict): The dependency name mapped to its check coroutine function.
+        required (set): The dependencies which must be healthy for the application to be ready.
+        interval (float): The delay between two probe rounds in seconds.
+        timeout (float): The time limit of a single check in seconds.
+        status (dict): The last result of every check.
+        checked_at (float | None): The timestamp of the last probe round, None before the first one.
+    """
+
+    def __init__(self, checks: dict[str, Callable[[], Awaitable[None]]], required: set[str],
+                 interval: float, timeout: float):
+        self.checks = checks
+        self.required = required
+        self.interval = interval
+        self.timeout = timeout
+        self.status: dict[str, dict] = {}
+        self.checked_at: float | None = None
+        self._task: asyncio.Task | None = None
+
+    async def _probe(self, name: str, check: Callable[[], Awaitable[None]]) -> None:
+        error = None
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+        except Exception as err:
+            error = str(err) or type(err).__name__
+        self.status[name] = {"ok": error is None,
+                             "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+                             "error": error}
+
+    async def probe_once(self) -> None:
+        """
+        Run all checks concurrently and store their results.
+        """
+        await asyncio.gather(*(self._probe(name, check) for name, check in self.checks.items()))
+        self.checked_at = time.time()
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """
+        Start probing in a background task of the running event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Cancel the background task and wait for it to finish.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    @property
+    def alive(self) -> bool:
+        """
+        The prober is alive unless its background task died.
+        """
+        return self._task is None or not self._task.done()
+
+    @property
+    def ready(self) -> bool:
+        """
+        The application is ready when a recent probe round found every required dependency healthy.
+        """
+        if self.checked_at is None or time.time() - self.checked_at > 3 * self.interval + self.timeout:
+            return False
+        return all(self.status.get(name, {}).get("ok") for name in self.required)
+
+
+health_prober = HealthProber(checks={"postgres": check_postgres, "redis": check_redis, "smtp": check_smtp},
+                             required={"postgres", "redis"},
+                             interval=config.HEALTH_PROBE_INTERVAL,
+                             timeout=config.HEALTH_PROBE_TIMEOUT)
+if shardmanager is not None:
+    health_prober.checks["shards"] = check_shards
+    health_prober.required.add("shards")
@@ -0,0 +1,224 @@
+import bisect
+import time
+from typing import Callable
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """
+    A monotonically increasing value per label set.
+
+    Attributes:
+        name (str): The metric name.
+        description (str): The help text of the metric.
+        labels (tuple): The label names.
+    """
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for label_values, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Gauge:
+    """
+    A value that can go up and down. If a callback is given, it is called at render time
+    and must return a mapping of label values to the current values.
+
+    Attributes:
+        name (str): The metric name.
+        description (str): The help text of the metric.
+        labels (tuple): The label names.
+    """
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = (),
+                 callback: Callable[[], dict[tuple[str, ...], float]] | None = None):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.callback = callback
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) - amount
+
+    def render(self) -> list[str]:
+        values = self.callback() if self.callback else self._values
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} gauge"]
+        for label_values, value in values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Counts observations in buckets per label set. Observing is a bisect and three additions,
+    the cumulative bucket counts are only computed at render time.
+
+    Attributes:
+        name (str): The metric name.
+        description (str): The help text of the metric.
+        labels (tuple): The label names.
+        buckets (tuple): The upper bounds of the buckets in ascending order.
+    """
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for label_values, (bucket_counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else bound
+                labels = _format_labels(self.labels + ("le",), label_values + (str(le),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Holds the metrics of the application and renders them in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.register(Histogram("http_request_duration_seconds",
+                                              "HTTP request latency by route template",
+                                              ("method", "route")))
+REQUESTS_TOTAL = registry.register(Counter("http_requests_total", "HTTP requests by route template and status",
+                                           ("method", "route", "status")))
+REQUESTS_IN_FLIGHT = registry.register(Gauge("http_requests_in_flight", "HTTP requests being served"))
+REDIS_LATENCY = registry.register(Histogram("redis_command_duration_seconds", "Redis command latency",
+                                            ("command",),
+                                            (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)))
+CACHE_REQUESTS = registry.register(Counter("cache_requests_total", "Cache lookups by result",
+                                           ("cache", "result")))
+SINGLE_FLIGHT_CALLS = registry.register(Counter("single_flight_calls_total",
+                                                "Coalesced reads by flight, run (leader) or shared (follower)",
+                                                ("flight", "role")))
+
+
+def _cache_hit_ratio() -> dict[tuple[str, ...], float]:
+    caches = {label_values[0] for label_values in CACHE_REQUESTS._values}
+    ratios = {}
+    for cache in caches:
+        hits = CACHE_REQUESTS.value(cache, "hit")
+        total = hits + CACHE_REQUESTS.value(cache, "miss")
+        ratios[(cache,)] = hits / total if total else 0
+    return ratios
+
+
+CACHE_HIT_RATIO = registry.register(Gauge("cache_hit_ratio", "Share of cache lookups served from the cache",
+                                          ("cache",), callback=_cache_hit_ratio))
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    Find the path template of the route which served the request, e.g. /rest_api/contacts/{contact_id},
+    so the label cardinality stays bounded by the number of routes.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    app = scope.get("app")
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    A pure ASGI middleware recording latency, status and in-flight requests per route template.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            route = _route_template(scope)
+            REQUEST_LATENCY.observe(elapsed, scope["method"], route)
+            REQUESTS_TOTAL.inc(scope["method"], route, str(status_code))
@@ -0,0 +1,98 @@
+import functools
+import re
+from typing import Annotated
+
+import email_validator
+from pydantic import AfterValidator, Field
+from pydantic.networks import validate_email
+
+from src.conf.config import config
+
+_NOT_DIGITS = re.compile(r"\D")
+# An unquoted ASCII local part, the only kind validate_email_address checks by itself
+_DOT_ATOM = re.compile(r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*")
+EMAIL_DOMAINS_CACHED = 4096
+
+
+def normalize_email(email: str | None) -> str | None:
+    """
+    Normalize an email address for comparisons and lookups: surrounding whitespace removed, lower-cased.
+
+    Parameters:
+        email (str | None): The email address as entered.
+
+    Returns:
+        str | None: The normalized email, or None for an empty value.
+    """
+    if not email:
+        return None
+    return email.strip().lower() or None
+
+
+def normalize_phone(phone_number: str | None, country_code: str | None = None) -> str | None:
+    """
+    Normalize a phone number to the E.164 form, e.g. "+380501234567".
+    Separators are dropped, the "00" international prefix becomes "+", and national numbers,
+    with or without the trunk "0", get the default country code.
+
+    Parameters:
+        phone_number (str | None): The phone number as entered.
+        country_code (str | None): The country code of national numbers, PHONE_DEFAULT_COUNTRY_CODE by default.
+
+    Returns:
+        str | None: The normalized number, or None if it does not have 7 to 15 digits.
+    """
+    if not phone_number:
+        return None
+    country_code = country_code or config.PHONE_DEFAULT_COUNTRY_CODE
+    phone_number = phone_number.strip()
+    digits = _NOT_DIGITS.sub("", phone_number)
+    if phone_number.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = country_code + digits[1:]
+    elif not digits.startswith(country_code):
+        digits = country_code + digits
+    if not 7 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
+
+
+@functools.lru_cache(maxsize=EMAIL_DOMAINS_CACHED)
+def _check_email_domain(domain: str) -> tuple[str, str] | None:
+    try:
+        checked = email_validator.validate_email(f"postmaster@{domain}", check_deliverability=False)
+    except email_validator.EmailNotValidError:
+        return None
+    return checked.domain, checked.ascii_domain
+
+
+def validate_email_address(value: str) -> str:
+    """
+    Validate and normalize an email address the way EmailStr does, with the domain checks cached.
+    Addresses share few domains, and the domain check (IDNA encoding, special-use names) is what
+    makes email-validator slow; an ASCII dot-atom local part is checked here with a regular expression.
+    Anything else, and every address that fails the fast path, goes through the full validation,
+    so the results and error messages are those of EmailStr.
+
+    Parameters:
+        value (str): The email address as entered.
+
+    Returns:
+        str: The normalized address, with the domain lower-cased.
+
+    Raises:
+        PydanticCustomError: If the address is not valid.
+    """
+    local, _, domain = value.partition("@")
+    if len(local) <= 64 and _DOT_ATOM.fullmatch(local):
+        checked = _check_email_domain(domain)
+        if checked is not None and len(local) + 1 + len(max(checked, key=len)) <= 254:
+            return f"{local}@{checked[0]}"
+    return validate_email(value)[1]
+
+
+# A drop-in replacement of EmailStr in the request schemas, see validate_email_address
+EmailAddress = Annotated[str, AfterValidator(validate_email_address), Field(json_schema_extra={"format": "email"})]
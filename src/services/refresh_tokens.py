@@ -0,0 +1,89 @@
+import hashlib
+import time
+
+from jose import jwt
+
+from src.services import cache_redis
+from src.services.normalization import normalize_email
+
+ACTIVE = b"active"
+USED = b"used"
+
+
+def _token_hash(token: str) -> str:
+    """
+    Hash a refresh token so the raw token never lands in Redis.
+
+    Parameters:
+        token (str): The encoded refresh token.
+
+    Returns:
+        str: The hex sha256 digest of the token.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _token_key(email: str, token_hash: str) -> str:
+    return f"refresh_token:{normalize_email(email)}:{token_hash}"
+
+
+def _user_key(email: str) -> str:
+    return f"refresh_tokens:{normalize_email(email)}"
+
+
+async def store_refresh_token(email: str, token: str) -> None:
+    """
+    Store a newly issued refresh token for the user.
+    The key lives exactly as long as the token itself, so expired tokens disappear on their own.
+
+    Parameters:
+        email (str): The email of the token owner.
+        token (str): The encoded refresh token.
+
+    Returns:
+        None
+    """
+    expire = jwt.get_unverified_claims(token)["exp"]
+    ttl = max(int(expire - time.time()), 1)
+    token_hash = _token_hash(token)
+    pipe = cache_redis.get_cache().pipeline()
+    pipe.set(_token_key(email, token_hash), ACTIVE, ex=ttl)
+    pipe.sadd(_user_key(email), token_hash)
+    pipe.expire(_user_key(email), ttl)
+    pipe.execute()
+
+
+async def consume_refresh_token(email: str, token: str) -> bool:
+    """
+    Mark a refresh token as used, so it can be exchanged only once.
+    Presenting an already used token means it leaked, and all tokens of the user are revoked.
+
+    Parameters:
+        email (str): The email of the token owner.
+        token (str): The encoded refresh token.
+
+    Returns:
+        bool: True if the token was active and may be rotated, False otherwise.
+    """
+    cache = cache_redis.get_cache()
+    previous = cache.set(_token_key(email, _token_hash(token)), USED, xx=True, keepttl=True, get=True)
+    if previous == USED:
+        await revoke_all_refresh_tokens(email)
+        return False
+    return previous == ACTIVE
+
+
+async def revoke_all_refresh_tokens(email: str) -> None:
+    """
+    Revoke every refresh token issued to the user.
+
+    Parameters:
+        email (str): The email of the token owner.
+
+    Returns:
+        None
+    """
+    cache = cache_redis.get_cache()
+    token_hashes = cache.smembers(_user_key(email))
+    keys = [_token_key(email, token_hash.decode()) for token_hash in token_hashes]
+    cache.delete(_user_key(email), *keys)
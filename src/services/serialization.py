@@ -0,0 +1,62 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from src.schemas.contact import (ContactResponse, ContactsBatchResponse, ContactsImportResponse, ContactStatsResponse,
+                                DuplicateContactsResponse)
+from src.schemas.user import UserResponse, TokenSchema
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    The default response class of the application. It encodes the content with pydantic-core
+    instead of the standard json module.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+# Response adapters built once at import, so the validators and serializers are compiled only once
+contact_adapter = TypeAdapter(ContactResponse)
+contacts_adapter = TypeAdapter(list[ContactResponse])
+contacts_batch_adapter = TypeAdapter(ContactsBatchResponse)
+duplicates_adapter = TypeAdapter(list[DuplicateContactsResponse])
+contacts_import_adapter = TypeAdapter(ContactsImportResponse)
+contact_stats_adapter = TypeAdapter(ContactStatsResponse)
+user_adapter = TypeAdapter(UserResponse)
+token_adapter = TypeAdapter(TokenSchema)
+
+
+def render(adapter: TypeAdapter, obj: Any) -> bytes:
+    """
+    Validate ORM objects or dicts against a response schema and serialize them to JSON in one pass,
+    skipping jsonable_encoder.
+
+    Parameters:
+        adapter (TypeAdapter): The response adapter, e.g. contacts_adapter.
+        obj (Any): The object to serialize.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+
+
+def json_response(adapter: TypeAdapter, obj: Any, status_code: int = 200,
+                  headers: dict[str, str] | None = None) -> Response:
+    """
+    Build a JSON response with a precompiled response adapter.
+
+    Parameters:
+        adapter (TypeAdapter): The response adapter, e.g. contacts_adapter.
+        obj (Any): The object to serialize.
+        status_code (int): The status code of the response.
+        headers (dict[str, str] | None): Additional response headers.
+
+    Returns:
+        Response: The response with the serialized body.
+    """
+    return Response(render(adapter, obj), status_code=status_code, headers=headers, media_type="application/json")
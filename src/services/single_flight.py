@@ -0,0 +1,97 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+from src.conf.config import config
+from src.services.metrics import SINGLE_FLIGHT_CALLS
+
+T = TypeVar("T")
+
+enabled_flights = {name.strip() for name in config.SINGLE_FLIGHT_ROUTES.split(",") if name.strip()}
+
+
+class _Flight:
+    __slots__ = ("future", "followers")
+
+    def __init__(self):
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical reads within a worker: while a call for a key is running, further
+    calls for the same key wait for its result instead of running their own, e.g. the same page of
+    contacts requested from several browser tabs at once. Calls starting after it finished run again,
+    nothing is cached. An error of the call is raised in all of the waiting callers; if the running
+    call is cancelled because its client went away, the waiting callers run it once more themselves.
+
+    Results bound to the caller, like ORM objects attached to its session, must not be handed to other
+    requests: `share` turns the result into something that can be shared, once and only if others are
+    waiting, and `unshare` gives every waiting caller its own copy of it.
+
+    Attributes:
+        name (str): The name of the flight, in SINGLE_FLIGHT_ROUTES and the metrics.
+        enabled (bool): Whether calls are coalesced; a disabled flight runs every call.
+    """
+
+    def __init__(self, name: str, share: Callable[[Any], Any] | None = None,
+                 unshare: Callable[[Any], Any] | None = None):
+        self.name = name
+        self.enabled = name in enabled_flights
+        self._share = share
+        self._unshare = unshare
+        self._flights: dict[Hashable, _Flight] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` unless a call for the key is running already, and return its result.
+
+        Parameters:
+            key (Hashable): What makes two calls identical, e.g. the user, the route and the query parameters.
+            fn (Callable[[], Awaitable[T]]): Runs the read.
+
+        Returns:
+            T: The result of `fn`, run by this caller or by the one it waited for.
+        """
+        if not self.enabled:
+            return await fn()
+        flight = self._flights.get(key)
+        if flight is not None:
+            return await self._follow(key, flight, fn)
+        flight = self._flights[key] = _Flight()
+        SINGLE_FLIGHT_CALLS.inc(self.name, "leader")
+        try:
+            result = await fn()
+            # In the try block: a result that cannot be shared is an error of the call, the followers must not hang
+            shared = self._share(result) if self._share and flight.followers else result
+        except asyncio.CancelledError:
+            flight.future.cancel()
+            raise
+        except Exception as error:
+            flight.future.set_exception(error)
+            flight.future.exception()  # retrieved, so a flight nobody waited for is not logged as unhandled
+            raise
+        else:
+            flight.future.set_result(shared)
+            return result
+        finally:
+            del self._flights[key]
+
+    def running(self, key: Hashable) -> bool:
+        """
+        Whether a call for the key is running, so a call made now would wait for it instead of running.
+        """
+        return self.enabled and key in self._flights
+
+    async def _follow(self, key: Hashable, flight: _Flight, fn: Callable[[], Awaitable[T]]) -> T:
+        flight.followers += 1
+        SINGLE_FLIGHT_CALLS.inc(self.name, "follower")
+        try:
+            # Shielded: a waiting caller that is cancelled must not cancel the call of the others
+            shared = await asyncio.shield(flight.future)
+        except asyncio.CancelledError:
+            if not flight.future.cancelled():
+                raise
+            return await self.do(key, fn)
+        return self._unshare(shared) if self._unshare else shared
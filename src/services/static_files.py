@@ -0,0 +1,63 @@
+import gzip
+import os
+from pathlib import Path
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Scope
+
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".map", ".svg", ".html", ".txt", ".json"}
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Static files served with long-lived cache headers, and gzip-compressed for clients accepting it.
+    The compressed variants are built once (see precompress) and kept in memory, so compression
+    does not cost anything per request.
+
+    Attributes:
+        max_age (int): The max-age of the Cache-Control header in seconds.
+        minimum_size (int): Files smaller than this are served uncompressed.
+        compresslevel (int): The gzip compression level.
+    """
+
+    def __init__(self, *, directory: str | os.PathLike, max_age: int, minimum_size: int, compresslevel: int,
+                 **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.max_age = max_age
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self._compressed: dict[str, bytes | None] = {}
+
+    def _compress(self, relative_path: str) -> bytes | None:
+        if relative_path not in self._compressed:
+            path = Path(self.directory, relative_path)
+            compressed = None
+            if path.suffix in COMPRESSIBLE_SUFFIXES and path.stat().st_size >= self.minimum_size:
+                compressed = gzip.compress(path.read_bytes(), self.compresslevel, mtime=0)
+            self._compressed[relative_path] = compressed
+        return self._compressed[relative_path]
+
+    def precompress(self) -> None:
+        """
+        Build the compressed variants of all compressible files of the directory.
+        Called from the application lifespan; files missed here are compressed on their first request.
+        """
+        for path in Path(self.directory).rglob("*"):
+            if path.is_file():
+                self._compress(path.relative_to(self.directory).as_posix())
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        response.headers["Cache-Control"] = f"public, max-age={self.max_age}"
+        if not isinstance(response, FileResponse) or response.status_code != 200 or scope["method"] != "GET":
+            return response
+        if "gzip" not in Headers(scope=scope).get("accept-encoding", ""):
+            return response
+        compressed = self._compress(path.replace(os.sep, "/"))
+        if compressed is None:
+            return response
+        headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+        headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+        return Response(compressed, headers=headers, media_type=response.media_type)
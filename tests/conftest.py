@@ -1,28 +1,71 @@
+# The suite runs on a SQLite database of its own process, without fsync, and with the cheapest bcrypt
+# cost, so every pytest-xdist worker gets its own database: pytest -n auto --dist loadfile
+# (loadfile keeps the tests of a module together, they share the data of the module).
+# pytest-xdist is not in the pyproject test group, install it by hand to run the suite in parallel.
+# Not an in-memory database: a connection dropped after a failing request would lose all the data.
+# Isolation: repository tests on this database run in the `db_session` SAVEPOINT and leave nothing behind
+# (test_db_sharding creates databases of its own).
+# The e2e modules cannot: TestClient runs the application on an event loop of its own, which must not
+# share an open transaction of the test's loop, and their tests are steps of one scenario that build
+# on each other's data (create, read, update, delete). So every module gets fresh tables instead.
 import asyncio
+import contextlib
+import os
+import tempfile
 from unittest.mock import Mock, AsyncMock
 
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.pool import StaticPool
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+
 from main import app
 from src.entity.models import Base, User
 from src.database.connect import get_db
+from src.database.instrumentation import capture_queries
 from src.services.auth import auth_service
 
-SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+TEST_DATABASE_PATH = os.path.join(tempfile.gettempdir(), f"contacts_test_{os.getpid()}.db")
+SQLALCHEMY_DATABASE_URL = os.getenv("TEST_DATABASE_URL", f"sqlite+aiosqlite:///{TEST_DATABASE_PATH}")
 
 engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool
 )
 
+
+@event.listens_for(engine.sync_engine, "connect")
+def _sqlite_autocommit(dbapi_connection, connection_record):
+    # Let SQLAlchemy emit BEGIN itself, otherwise pysqlite breaks SAVEPOINT (see db_session)
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA journal_mode = MEMORY")
+    cursor.close()
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def _sqlite_begin(connection):
+    # On the DBAPI cursor, so query budgets do not count it
+    connection.connection.cursor().execute("BEGIN")
+
 TestingSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 test_user = {"username": "deadpool", "email": "deadpool@example.com", "password": "12345678"}
 
 
+@pytest.fixture(scope="session", autouse=True)
+def remove_test_database():
+    yield
+    asyncio.run(engine.dispose())
+    if SQLALCHEMY_DATABASE_URL.endswith(TEST_DATABASE_PATH):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(TEST_DATABASE_PATH)
+
+
 @pytest.fixture(scope="module", autouse=True)
 def init_models_wrap():
     async def init_models():
@@ -58,6 +101,23 @@ def client():
     yield TestClient(app)
 
 
+@pytest_asyncio.fixture()
+async def db_session():
+    """
+    A session whose changes, commits included, are rolled back after the test: commits only release
+    a SAVEPOINT of the outer transaction. Every test of test_db_repository_contacts uses it.
+    Do not use it together with `client`, both share the single connection of the test database.
+    """
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+
 @pytest_asyncio.fixture()
 async def get_access_token():
     token = await auth_service.create_access_token(data={"sub": test_user["email"]})
@@ -75,6 +135,7 @@ async def mock_redis(monkeypatch):
     mock_redis = Mock()
     monkeypatch.setattr("src.services.cache_redis.cache", mock_redis)
     mock_redis.get.return_value = None
+    mock_redis.hgetall.return_value = {}
 
     monkeypatch.setattr("src.services.cache_redis.update_user_cache", Mock())
 
@@ -84,3 +145,19 @@ def mock_rate_limiter(monkeypatch):
     monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
     monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
     monkeypatch.setattr("fastapi_limiter.FastAPILimiter.http_callback", AsyncMock())
+
+
+@pytest.fixture()
+def assert_max_queries():
+    """
+    Usage: with assert_max_queries(2): client.get(...)
+    Fails if the block runs more SQL statements than allowed, listing the statements.
+    """
+    @contextlib.contextmanager
+    def _assert_max_queries(maximum: int):
+        with capture_queries(engine.sync_engine) as statements:
+            yield statements
+        assert len(statements) <= maximum, f"{len(statements)} queries, expected at most {maximum}:\n" + \
+                                           "\n".join(statements)
+
+    return _assert_max_queries
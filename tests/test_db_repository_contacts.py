@@ -0,0 +1,43 @@
+import pytest
+
+from src.database.instrumentation import capture_queries
+from src.repository.contacts import create_contact, search_contacts, update_contact, delete_contact
+from src.repository.users import get_user_by_email, purge_user
+from src.schemas.contact import ContactSchema
+from tests.conftest import test_user
+
+# Every test runs in a transaction rolled back afterwards, see conftest.db_session
+pytestmark = pytest.mark.usefixtures("db_session")
+
+body = ContactSchema(name="isolated", last_name="contact", email="isolated@example.com",
+                     phone_number="123456789", birthday="2000-01-01")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("attempt", [1, 2])
+async def test_create_contact_is_rolled_back(db_session, attempt):
+    user = await get_user_by_email(test_user["email"], db_session)
+
+    await create_contact(body, db_session, user)
+    contacts = await search_contacts("isolated", db_session, user)
+
+    assert len(contacts) == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_filter_by_partition_key(db_session):
+    user = await get_user_by_email(test_user["email"], db_session)
+    contact = await create_contact(body, db_session, user)
+
+    connection = await db_session.connection()
+    with capture_queries(connection.sync_connection) as statements:
+        await update_contact(contact.id, body.model_copy(update={"name": "renamed"}), db_session, user)
+        await delete_contact(contact.id, db_session, user)
+        await create_contact(body, db_session, user)
+        await purge_user(user.id, db_session)
+
+    writes = [statement for statement in statements if statement.lstrip().startswith(("UPDATE contacts",
+                                                                                      "DELETE FROM contacts"))]
+    assert len(writes) == 3
+    # On the statement itself, not only in a subquery
+    assert all("user_id" in statement.split("WHERE", 1)[1].split("SELECT", 1)[0] for statement in writes)
@@ -0,0 +1,143 @@
+# Shards are SQLite files in a temporary directory. The application runs on local SQLite shards the same way:
+# DB_SHARD_URLS=sqlite+aiosqlite:///./shard0.db,sqlite+aiosqlite:///./shard1.db,sqlite+aiosqlite:///./shard2.db
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.schema import CreateTable
+
+from scripts.rebalance_shards import IdMapping, move_user
+from src.database.sharding import HashRing, ShardedSessionManager
+from src.entity.models import Base, Contact, User
+from src.repository.contacts import create_contact, search_contacts
+from src.repository.users import purge_user
+from src.schemas.contact import ContactSchema
+
+body = ContactSchema(name="sharded", last_name="contact", email="sharded@example.com",
+                     phone_number="123456789", birthday="2000-01-01")
+
+
+@pytest_asyncio.fixture()
+async def shards(tmp_path):
+    urls = [f"sqlite+aiosqlite:///{tmp_path / f'shard{number}.db'}" for number in range(3)]
+    for url in urls:
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+    manager = ShardedSessionManager(urls)
+    yield manager
+    await manager.close()
+
+
+def make_user(user_id: uuid.UUID) -> User:
+    return User(id=user_id, username="sharded", email=f"{user_id.hex}@example.com", password="-",
+                email_verified=True)
+
+
+async def key_contacts_by_user(manager: ShardedSessionManager, shard: int) -> None:
+    # The primary key of the partitioned table on PostgreSQL, under which two users may share a contact id
+    ddl = str(CreateTable(Contact.__table__).compile(manager.shards[shard]._engine))
+    async with manager.shards[shard].session() as db:
+        await db.execute(text("DROP TABLE contacts"))
+        await db.execute(text(ddl.replace("PRIMARY KEY (id)", "PRIMARY KEY (id, user_id)")))
+        await db.commit()
+
+
+async def count_contacts(manager: ShardedSessionManager, user: User) -> list[int]:
+    counts = []
+    for shard in manager.shards:
+        async with shard.session() as db:
+            counts.append(len(await search_contacts("sharded", db, user)))
+    return counts
+
+
+def test_ring_moves_keys_only_to_added_shard():
+    keys = [uuid.uuid5(uuid.NAMESPACE_OID, str(number)) for number in range(2000)]
+    three, four = HashRing(3), HashRing(4)
+
+    moved = [key for key in keys if three.shard_for(key) != four.shard_for(key)]
+
+    assert all(four.shard_for(key) == 3 for key in moved)
+    assert 0.15 < len(moved) / len(keys) < 0.35
+
+
+@pytest.mark.asyncio
+async def test_contacts_stored_on_user_shard(shards):
+    user = make_user(uuid.uuid4())
+
+    async with shards.session(user.id) as db:
+        await shards.ensure_user(user, db)
+        await create_contact(body, db, user)
+
+    counts = await count_contacts(shards, user)
+    assert counts[shards.shard_for(user.id)] == 1
+    assert sum(counts) == 1
+
+
+async def add_user_with_contacts(manager: ShardedSessionManager, shard: int, user_id: uuid.UUID,
+                                 contacts: int) -> list[int]:
+    async with manager.shards[shard].session() as db:
+        db.add(make_user(user_id))
+        await db.commit()
+        return [(await create_contact(body, db, make_user(user_id))).id for _ in range(contacts)]
+
+
+@pytest.mark.asyncio
+async def test_move_user(shards, tmp_path):
+    user_id, other_id = uuid.uuid4(), uuid.uuid4()
+    target = shards.shard_for(user_id)
+    source = (target + 1) % len(shards.shards)
+    ids = await add_user_with_contacts(shards, source, user_id, 3)
+    # Holds the same ids on the target
+    other_ids = await add_user_with_contacts(shards, target, other_id, 3)
+
+    moved = await move_user(shards, user_id, source, batch_size=2, mapping=IdMapping(str(tmp_path / "moves.csv")))
+
+    counts = await count_contacts(shards, make_user(user_id))
+    assert sorted(moved) == ids
+    assert counts[target] == 3
+    assert counts[source] == 0
+    async with shards.shards[target].session() as db:
+        assert sorted(contact.id for contact in await search_contacts("sharded", db, make_user(user_id))) == \
+            sorted(moved.values())
+        assert [contact.id for contact in await search_contacts("sharded", db, make_user(other_id))] == other_ids
+    assert IdMapping(str(tmp_path / "moves.csv")).ids == {user_id: moved}
+
+
+@pytest.mark.asyncio
+async def test_move_user_resumes_interrupted_run(shards, tmp_path):
+    user_id = uuid.uuid4()
+    target = shards.shard_for(user_id)
+    source = (target + 1) % len(shards.shards)
+    ids = await add_user_with_contacts(shards, source, user_id, 3)
+    # An interrupted run copied the first contact and recorded its new id, but did not delete it from the source
+    copied_id = (await add_user_with_contacts(shards, target, user_id, 1))[0]
+    mapping = IdMapping(str(tmp_path / "moves.csv"))
+    mapping.record(user_id, {ids[0]: copied_id})
+
+    moved = await move_user(shards, user_id, source, batch_size=2, mapping=IdMapping(mapping.path))
+
+    counts = await count_contacts(shards, make_user(user_id))
+    assert moved[ids[0]] == copied_id
+    assert counts[target] == 3
+    assert counts[source] == 0
+
+
+@pytest.mark.asyncio
+async def test_purge_user_keeps_other_users_contacts_with_same_id(shards):
+    await key_contacts_by_user(shards, 0)
+    deleted_id, kept_id = uuid.uuid4(), uuid.uuid4()
+    async with shards.shards[0].session() as db:
+        for user_id in (deleted_id, kept_id):
+            db.add(make_user(user_id))
+            db.add(Contact(id=1, **body.model_dump(), user_id=user_id))
+        await db.commit()
+
+    async with shards.shards[0].session() as db:
+        assert await purge_user(deleted_id, db) == 1
+
+    counts = await count_contacts(shards, make_user(kept_id))
+    assert counts[0] == 1
@@ -1,16 +1,72 @@
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from src.conf import messages
+from src.services.health import health_prober
 
 
 def test_healthchecker(client):
-    params = {"request_string": "SELECT 2"}
-    response = client.get("api_service/health_checker", params=params)
+    response = client.get("api_service/health_checker")
     assert response.status_code == 200
     assert response.json() == {"message": messages.HEALTH_CHECKER}
 
 
-def test_healthchecker_not_connection_to_db(client):
-    params = {"request_string": "Wrong_request"}
-    response = client.get("api_service/health_checker", params=params)
+def test_healthchecker_ignores_query_string(client, monkeypatch):
+    statements = []
+    execute = AsyncSession.execute
+
+    async def recording_execute(self, statement, *args, **kwargs):
+        statements.append(str(statement))
+        return await execute(self, statement, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncSession, "execute", recording_execute)
+    response = client.get("api_service/health_checker", params={"request_string": "DELETE FROM users"})
+    assert response.status_code == 200, response.text
+    assert statements == ["SELECT 1"]
+
+
+def test_healthchecker_not_connection_to_db(client, monkeypatch):
+    async def failing_execute(self, statement, *args, **kwargs):
+        raise ConnectionRefusedError("database is down")
+
+    monkeypatch.setattr(AsyncSession, "execute", failing_execute)
+    response = client.get("api_service/health_checker")
     assert response.status_code == 500, response.text
     data = response.json()
     assert data["detail"] == messages.ERROR_CONNECTION_TO_DB
+
+
+def test_livez(client):
+    response = client.get("api_service/livez")
+    assert response.status_code == 200, response.text
+    assert response.json() == {"status": "alive"}
+
+
+def test_readyz_before_first_probe(client):
+    response = client.get("api_service/readyz")
+    assert response.status_code == 503, response.text
+    assert response.json()["status"] == "not ready"
+
+
+def test_readyz(client, monkeypatch):
+    dependencies = {"postgres": {"ok": True, "latency_ms": 1.5, "error": None},
+                    "redis": {"ok": True, "latency_ms": 0.5, "error": None},
+                    "smtp": {"ok": False, "latency_ms": 2000.0, "error": "TimeoutError"}}
+    monkeypatch.setattr(health_prober, "status", dependencies)
+    monkeypatch.setattr(health_prober, "checked_at", time.time())
+    response = client.get("api_service/readyz")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["dependencies"] == dependencies
+
+
+def test_readyz_required_dependency_down(client, monkeypatch):
+    dependencies = {"postgres": {"ok": False, "latency_ms": 2000.0, "error": "TimeoutError"},
+                    "redis": {"ok": True, "latency_ms": 0.5, "error": None}}
+    monkeypatch.setattr(health_prober, "status", dependencies)
+    monkeypatch.setattr(health_prober, "checked_at", time.time())
+    response = client.get("api_service/readyz")
+    assert response.status_code == 503, response.text
+    assert response.json()["dependencies"]["postgres"]["ok"] is False
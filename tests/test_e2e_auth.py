@@ -4,6 +4,7 @@ import pytest
 from sqlalchemy import select
 
 from src.entity.models import User
+from src.services.auth import auth_service
 from tests.conftest import TestingSessionLocal
 from src.conf import messages
 
@@ -58,6 +59,20 @@ async def test_login(client):
     assert "token_type" in data
 
 
+def test_login_mixed_case_email(client):
+    response = client.post("rest_api/auth/login",
+                           data={"username": user_data.get("email").upper(), "password": user_data.get("password")})
+    assert response.status_code == 200, response.text
+    email = auth_service.decode_access_token(response.json()["access_token"])
+    assert email == user_data["email"]
+
+
+def test_repeat_signup_mixed_case_email(client):
+    response = client.post("rest_api/auth/signup", json={**user_data, "email": "CatNota@catmail.com"})
+    assert response.status_code == 409
+    assert response.json()["detail"] == messages.ACCOUNT_EXIST
+
+
 #
 def test_login_wrong_email(client):
     response = client.post("rest_api/auth/login",
@@ -1,3 +1,5 @@
+from datetime import date
+
 import pytest
 
 from src.conf import messages
@@ -16,6 +18,7 @@ def test_get_contacts(client, mock_rate_limiter, get_access_token):
     data = response.json()
     assert response.status_code == 200
     assert len(data) == 0
+    assert response.headers["X-Total-Count"] == "0"
 
 
 def test_create_contact(client, mock_rate_limiter, get_access_token):
@@ -54,6 +57,53 @@ def test_get_contact(client, mock_rate_limiter, get_access_token):
     assert data["name"] == "test_contact_name"
 
 
+def test_get_contact_query_budget(client, mock_rate_limiter, get_access_token, assert_max_queries):
+    token = get_access_token
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with assert_max_queries(2):
+        response = client.get("rest_api/contacts/1", headers=headers)
+
+    assert response.status_code == 200
+
+
+def test_get_contacts_not_modified(client, mock_rate_limiter, get_access_token):
+    token = get_access_token
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("rest_api/contacts", headers=headers)
+    etag = response.headers["ETag"]
+    not_modified = client.get("rest_api/contacts", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert etag.startswith('W/"')
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.content == b""
+
+
+def test_get_contacts_batch(client, mock_rate_limiter, get_access_token):
+    token = get_access_token
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post("rest_api/contacts/batch", json={"ids": [9999, 1, 1]}, headers=headers)
+
+    data = response.json()
+    assert response.status_code == 200, response.text
+    assert [contact["id"] for contact in data["contacts"]] == [1]
+    assert data["contacts"][0]["name"] == test_contact["name"]
+    assert data["missing"] == [9999]
+
+
+def test_get_contacts_batch_too_many_ids(client, mock_rate_limiter, get_access_token):
+    token = get_access_token
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post("rest_api/contacts/batch", json={"ids": list(range(1, 1000))}, headers=headers)
+
+    assert response.status_code == 422
+
+
 def test_update_contact(client, mock_rate_limiter, get_access_token):
     token = get_access_token
     headers = {"Authorization": f"Bearer {token}"}
@@ -128,3 +178,87 @@ def test_search_contacts(client, mock_rate_limiter, get_access_token):
     assert response.status_code == 200
     assert test_contact["email"] in data[0]["email"]
     assert "id" in data[0]
+
+
+def test_get_contacts_by_phone(client, mock_rate_limiter, get_access_token):
+    token = get_access_token
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("rest_api/contacts/phone/0123456789", headers=headers)
+
+    data = response.json()
+    assert response.status_code == 200, response.text
+    assert [contact["id"] for contact in data] == [1]
+
+
+def test_get_duplicate_contacts(client, mock_rate_limiter, get_access_token):
+    token = get_access_token
+    headers = {"Authorization": f"Bearer {token}"}
+    duplicate = {**test_contact, "email": test_contact["email"].upper(), "phone_number": "+380 12 345 6789"}
+    created = client.post("rest_api/contacts", json=duplicate, headers=headers).json()
+
+    response = client.get("rest_api/contacts/duplicates/", headers=headers)
+
+    data = response.json()
+    assert response.status_code == 200, response.text
+    assert {(group["field"], group["key"]) for group in data} == {("phone", "+380123456789"),
+                                                                 ("email", test_contact["email"])}
+    for group in data:
+        assert [contact["id"] for contact in group["contacts"]] == [1, created["id"]]
+
+
+def test_get_birthdays_today(client, mock_rate_limiter, get_access_token):
+    token = get_access_token
+    headers = {"Authorization": f"Bearer {token}"}
+    birthday = date.today().replace(year=1992)
+    contact = {**test_contact, "name": "birthday_today", "birthday": birthday.isoformat()}
+    created = client.post("rest_api/contacts", json=contact, headers=headers).json()
+
+    response = client.get("rest_api/contacts/birthdate/", headers=headers)
+
+    data = response.json()
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/json"
+    assert data[0]["id"] == created["id"]
+
+
+def test_get_contacts_stats(client, mock_rate_limiter, get_access_token):
+    token = get_access_token
+    headers = {"Authorization": f"Bearer {token}"}
+    contacts = client.get("rest_api/contacts", params={"limit": 500}, headers=headers)
+
+    response = client.get("rest_api/contacts/stats/", headers=headers)
+
+    data = response.json()
+    assert response.status_code == 200, response.text
+    assert data["total"] == len(contacts.json()) == int(contacts.headers["X-Total-Count"])
+    assert sum(data["by_month"].values()) == data["total"]
+    assert data["by_month"][str(date.today().month)] >= 1
+
+
+def test_import_contacts_invalid_rows(client, mock_rate_limiter, get_access_token):
+    token = get_access_token
+    headers = {"Authorization": f"Bearer {token}"}
+    rows = [test_contact, {**test_contact, "email": "not-an-email"}, {**test_contact, "birthday": "someday"}]
+
+    response = client.post("rest_api/contacts/import/", json=rows, headers=headers)
+
+    data = response.json()
+    assert response.status_code == 422, response.text
+    assert [(error["index"], error["field"]) for error in data["detail"]] == [(1, "email"), (2, "birthday")]
+
+
+def test_import_contacts(client, mock_rate_limiter, get_access_token):
+    token = get_access_token
+    headers = {"Authorization": f"Bearer {token}"}
+    before = client.get("rest_api/contacts", params={"limit": 500}, headers=headers).json()
+    rows = [{**test_contact, "name": f"imported_{number}", "email": f"imported_{number}@Example.com"}
+            for number in range(3)]
+
+    response = client.post("rest_api/contacts/import/", json=rows, headers=headers)
+
+    assert response.status_code == 201, response.text
+    assert response.json() == {"created": 3}
+    contacts = client.get("rest_api/contacts", params={"limit": 500}, headers=headers).json()
+    assert len(contacts) == len(before) + 3
+    assert contacts[-1]["email"] == "imported_2@example.com"
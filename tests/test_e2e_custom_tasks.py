@@ -7,3 +7,31 @@ def test_get_signup_users(client):
     data = response.json()
     assert data[0]["email"] == test_user["email"]
     assert data[0]["username"] == test_user["username"]
+
+
+def test_get_signup_users_page(client):
+    response = client.get("custom_tasks/get_users", params={"limit": 1})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert response.headers["X-Next-Cursor"] == data[0]["id"]
+
+    response = client.get("custom_tasks/get_users", params={"limit": 1, "after": data[0]["id"]})
+    assert response.status_code == 200
+    assert response.json() == []
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_signup_users_filter(client):
+    response = client.get("custom_tasks/get_users", params={"email_verified": False})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_get_signup_users_stream(client):
+    response = client.get("custom_tasks/get_users", params={"stream": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert len(lines) == 1
+    assert test_user["email"] in lines[0]
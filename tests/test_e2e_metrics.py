@@ -0,0 +1,31 @@
+from src.services.metrics import Histogram
+
+
+def test_metrics(client):
+    client.get("api_service/livez")
+    response = client.get("metrics")
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/api_service/livez",status="200"}' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api_service/livez",le="+Inf"}' in text
+    assert "http_requests_in_flight" in text
+
+
+def test_metrics_route_template(client, mock_rate_limiter):
+    client.get("rest_api/contacts/12345")
+    response = client.get("metrics")
+    assert 'route="/rest_api/contacts/{contact_id}"' in response.text
+    assert 'route="/rest_api/contacts/12345"' not in response.text
+
+
+def test_histogram_render():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+STATIC_DIR = Path(__file__).parent.parent / "src" / "static"
+
+
+def test_static_precompressed(client):
+    response = client.get("static/product.css", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert response.content == (STATIC_DIR / "product.css").read_bytes()
+
+
+def test_static_without_gzip(client):
+    response = client.get("static/product.css", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200, response.text
+    assert "content-encoding" not in response.headers
+    assert response.headers["cache-control"].startswith("public, max-age=")
+
+
+def test_static_not_compressible(client):
+    response = client.get("static/loudmouth.png", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200, response.text
+    assert "content-encoding" not in response.headers
+    assert response.content == (STATIC_DIR / "loudmouth.png").read_bytes()
+
+
+def test_large_response_compressed(client):
+    response = client.get("metrics", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-encoding"] == "gzip"
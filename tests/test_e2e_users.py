@@ -1,7 +1,14 @@
+import contextlib
 from datetime import date
 from unittest.mock import MagicMock, Mock, patch, AsyncMock
 
-from tests.conftest import test_user
+import pytest
+from sqlalchemy import select, func
+
+from src.conf import messages
+from src.entity.models import User, Contact
+from src.routes.users import _purge_account
+from tests.conftest import test_user, TestingSessionLocal
 
 test_contact = {"name": "test_contact", "last_name": "test_contact", "email": "test_email@gmail.com",
                 "phone_number": "123456789", "birthday": "2022-01-01"}
@@ -17,6 +24,14 @@ def test_get_me(client, get_access_token, mock_rate_limiter):
     assert "id" in data
 
 
+def test_get_me_query_budget(client, get_access_token, mock_rate_limiter, assert_max_queries):
+    token = get_access_token
+    headers = {"Authorization": f"Bearer {token}"}
+    with assert_max_queries(1):
+        response = client.get("rest_api/users/me", headers=headers)
+    assert response.status_code == 200, response.text
+
+
 def test_upload_avatar_from_cloudinary(client, get_access_token, mock_rate_limiter, monkeypatch):
     token = get_access_token
     headers = {"Authorization": f"Bearer {token}"}
@@ -31,3 +46,39 @@ def test_upload_avatar_from_cloudinary(client, get_access_token, mock_rate_limit
     assert data[
                "avatar"] == ("https://res.cloudinary.com/fastapihw13/image/upload/c_fill,h_250,"
                              "w_250/v1/FastAPI_contacts/deadpool%40example.com")
+
+
+@pytest.mark.asyncio
+async def test_delete_me(client, get_access_token, mock_rate_limiter, monkeypatch):
+    token = get_access_token
+    headers = {"Authorization": f"Bearer {token}"}
+    revoke_mock = AsyncMock()
+    monkeypatch.setattr("src.services.refresh_tokens.revoke_all_refresh_tokens", revoke_mock)
+    scheduled_purge = AsyncMock()
+    monkeypatch.setattr("src.routes.users._purge_account", scheduled_purge)
+    async with TestingSessionLocal() as session:
+        user = (await session.execute(select(User).filter_by(email=test_user["email"]))).scalar_one()
+        session.add_all(Contact(**{**test_contact, "birthday": date(2022, 1, 1)}, user_id=user.id) for _ in range(3))
+        await session.commit()
+
+    response = client.delete("rest_api/users/me", headers=headers)
+    assert response.status_code == 202, response.text
+    assert response.json()["message"] == messages.ACCOUNT_DELETION_SCHEDULED
+    revoke_mock.assert_awaited_once_with(test_user["email"])
+    scheduled_purge.assert_awaited_once_with(user.id)
+
+    # The purge opens sessions of its own, so it also works once the sessions of the request are closed
+    @contextlib.asynccontextmanager
+    async def purge_session(reraise=False):
+        async with TestingSessionLocal() as session:
+            yield session
+
+    monkeypatch.setattr("src.routes.users.sessionmanager", Mock(session=purge_session))
+    await _purge_account(user.id)
+
+    async with TestingSessionLocal() as session:
+        assert (await session.execute(select(User).filter_by(email=test_user["email"]))).scalar_one_or_none() is None
+        assert (await session.execute(select(func.count(Contact.id)))).scalar_one() == 0
+
+    response = client.get("rest_api/users/me", headers=headers)
+    assert response.status_code == 401, response.text
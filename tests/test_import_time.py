@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 3000))
+LAZY_MODULES = ("cloudinary", "fastapi_mail")
+
+
+def import_times(module: str) -> dict[str, int]:
+    """
+    Import the module in a fresh interpreter with -X importtime.
+    Returns the cumulative import time in microseconds of every module loaded on the way.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.fixture(scope="module")
+def main_import_times():
+    return import_times("main")
+
+
+def test_import_main_time_budget(main_import_times):
+    main_time_ms = main_import_times["main"] / 1000
+    assert main_time_ms <= IMPORT_TIME_BUDGET_MS, f"importing main took {main_time_ms:.0f} ms"
+
+
+def test_heavy_clients_are_imported_lazily(main_import_times):
+    for module in LAZY_MODULES:
+        assert module not in main_import_times, f"{module} is imported at application start"
@@ -0,0 +1,46 @@
+import contextlib
+import unittest
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, inspect, text
+
+from migrations.helpers import batched_update, create_index_concurrently, lock_timeout
+
+
+class TestMigrationHelpers(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, name_key TEXT)"))
+            connection.execute(text("INSERT INTO items (id, name) VALUES (:id, :name)"),
+                               [{"id": number, "name": f"Item {number}"} for number in range(1, 26)])
+        self.connection = self.engine.connect()
+        self.addCleanup(self.engine.dispose)
+        self.addCleanup(self.connection.close)
+        stack = contextlib.ExitStack()
+        stack.enter_context(Operations.context(MigrationContext.configure(self.connection)))
+        self.addCleanup(stack.close)
+
+    def test_batched_update(self):
+        with self.assertLogs("alembic.migrations.helpers", "INFO") as logs:
+            updated = batched_update("items", "name_key = lower(name)", "id > :skip", {"skip": 5}, batch_size=10)
+
+        self.assertEqual(updated, 20)
+        self.assertEqual(len(logs.records), 3)
+        rows = self.connection.execute(text("SELECT id, name_key FROM items ORDER BY id")).all()
+        self.assertEqual(rows[0].name_key, None)
+        self.assertEqual(rows[-1].name_key, "item 25")
+
+    def test_batched_update_empty_table(self):
+        self.connection.execute(text("DELETE FROM items"))
+        self.connection.commit()
+
+        self.assertEqual(batched_update("items", "name_key = lower(name)"), 0)
+
+    def test_create_index_falls_back_outside_postgres(self):
+        with lock_timeout(1000):
+            create_index_concurrently("ix_items_name_key", "items", ["name_key"])
+
+        self.assertIn("ix_items_name_key", [index["name"] for index in inspect(self.connection).get_indexes("items")])
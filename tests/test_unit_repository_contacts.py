@@ -1,4 +1,5 @@
 import unittest
+from datetime import date
 from typing import Sequence
 from unittest.mock import MagicMock, AsyncMock
 
@@ -6,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.schemas.contact import ContactSchema
 from src.entity.models import User, Contact
-from src.repository.contacts import (get_contact, get_contacts,
+from src.repository.contacts import (get_contact, get_contacts, get_contacts_by_ids,
                                      get_birthdays, create_contact,
                                      update_contact, delete_contact, search_contacts)
 
@@ -61,12 +62,13 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
                                                                last_name="Pluchka",
                                                                email="I_am_cat_not@catmail.com",
                                                                phone_number="+380_kss_kss_kss",
-                                                               birthday="2023-09-01", user=self.user)
+                                                               birthday=date(2023, 8, 1), user=self.user)
 
         self.session.execute.return_value = mock_contact
-        result = await update_contact(1, body, self.session, user=self.user)
+        result, old_birthday = await update_contact(1, body, self.session, user=self.user)
         self.assertIsInstance(result, Contact)
         self.assertEqual(result.last_name, body.last_name)
+        self.assertEqual(old_birthday, date(2023, 8, 1))
         self.session.execute.assert_called_once()
         self.session.commit.assert_called_once()
         self.session.refresh.assert_called_once()
@@ -88,6 +90,16 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
         self.session.execute.assert_called_once()
         mock_contact.scalar_one_or_none.assert_called_once()
 
+    async def test_get_contacts_by_ids(self):
+        contacts = [Contact(id=1, name='test', user=self.user),
+                    Contact(id=3, name='test3', user=self.user)]
+        mocked_contacts = MagicMock()
+        mocked_contacts.scalars.return_value.all.return_value = contacts
+        self.session.execute.return_value = mocked_contacts
+        result = await get_contacts_by_ids([1, 2, 3], self.session, self.user)
+        self.assertEqual(result, contacts)
+        self.session.execute.assert_called_once()
+
     async def test_get_birthdays(self):
         contacts = [Contact(id=1, name='test', user=self.user),
                     Contact(id=2, name='test2', user=self.user)]
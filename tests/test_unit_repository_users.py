@@ -5,7 +5,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.schemas.user import UserSchema
 from src.entity.models import User
-from src.repository.users import get_user_by_email, create_user, email_verified, update_token, update_avatar_url
+from src.repository.users import (get_user_by_email, create_user, email_verified, update_token, update_avatar_url,
+                                  purge_user)
 
 
 class TestAsyncUsers(unittest.IsolatedAsyncioTestCase):
@@ -64,3 +65,12 @@ class TestAsyncUsers(unittest.IsolatedAsyncioTestCase):
         mock_get_user_by_email.assert_called_once_with(self.user.email, self.session)
         self.session.commit.assert_called_once()
         self.session.refresh.assert_called_once()
+
+    async def test_purge_user(self):
+        self.session.execute.side_effect = [MagicMock(rowcount=2), MagicMock(rowcount=2), MagicMock(rowcount=1),
+                                            MagicMock(rowcount=1)]
+        deleted = await purge_user(self.user.id, self.session, batch_size=2)
+        self.assertEqual(deleted, 5)
+        self.assertEqual(self.session.execute.call_count, 4)
+        self.assertEqual(self.session.commit.call_count, 4)
+        self.assertIn("DELETE FROM users", str(self.session.execute.call_args.args[0]))
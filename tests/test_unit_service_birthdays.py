@@ -0,0 +1,121 @@
+import contextlib
+import json
+import unittest
+import uuid
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from src.conf.config import config
+from src.database.connect import DatabaseSessionManager
+from src.entity.models import User, Contact
+from src.repository.contacts import birthday_keys
+from src.services.birthdays import (get_birthday_digest, invalidate_birthday_digest, render_digest,
+                                    birthday_digest_job, INVALIDATED, LOCK_KEY)
+
+
+def make_contact(contact_id: int, name: str, birthday: date, **fields):
+    return SimpleNamespace(id=contact_id, name=name, last_name="last_name", email=f"c{contact_id}@example.com",
+                           phone_number="123456789", birthday=birthday, **fields)
+
+
+class TestBirthdayKeys(unittest.TestCase):
+
+    def test_new_year(self):
+        self.assertEqual(birthday_keys(date(2025, 12, 30), 4), [1230, 1231, 101, 102])
+
+    def test_february_29_in_common_year(self):
+        self.assertEqual(birthday_keys(date(2025, 2, 27), 3), [227, 228, 229, 301])
+        self.assertEqual(birthday_keys(date(2024, 2, 27), 3), [227, 228, 229])
+
+    def test_render_digest_nearest_first(self):
+        contacts = [make_contact(1, "later", date(1990, 1, 2)), make_contact(2, "sooner", date(1985, 12, 31))]
+        data = json.loads(render_digest(contacts, date(2025, 12, 30)))
+        self.assertEqual([contact["id"] for contact in data], [2, 1])
+
+
+class TestAsyncBirthdayDigest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.user = User(id=uuid.uuid4(), username='Tsiri', email='I_am_cat_not@catmail.com')
+        self.session = AsyncMock()
+        self.cache = MagicMock()
+        patcher = patch('src.services.cache_redis.cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_digest_from_cache(self):
+        self.cache.get.return_value = b"[]"
+        with patch('src.repository.contacts.get_birthdays', AsyncMock()) as get_birthdays:
+            result = await get_birthday_digest(self.user, self.session)
+        self.assertEqual(result, b"[]")
+        get_birthdays.assert_not_called()
+
+    async def test_digest_computed_on_miss(self):
+        self.cache.get.return_value = None
+        contact = Contact(id=1, name="test", last_name="contact", email="test@example.com",
+                          phone_number="123456789", birthday=date.today().replace(year=1992))
+        with patch('src.repository.contacts.get_birthdays', AsyncMock(return_value=[contact])):
+            result = await get_birthday_digest(self.user, self.session)
+        self.assertEqual([item["id"] for item in json.loads(result)], [1])
+        key, value = self.cache.set.call_args.args
+        self.assertEqual(key, f"birthday_digest:{self.user.id}")
+        self.assertEqual(value, result)
+
+    async def test_digest_computed_after_invalidation(self):
+        invalidate_birthday_digest(self.user)
+        key, marker = self.cache.set.call_args.args
+        self.assertEqual((key, marker), (f"birthday_digest:{self.user.id}", INVALIDATED))
+
+        self.cache.get.return_value = marker
+        with patch('src.repository.contacts.get_birthdays', AsyncMock(return_value=[])) as get_birthdays:
+            result = await get_birthday_digest(self.user, self.session)
+        get_birthdays.assert_awaited_once()
+        self.assertEqual(result, b"[]")
+
+    async def test_job_skipped_when_locked(self):
+        self.cache.set.return_value = None
+        self.assertFalse(await birthday_digest_job.run_once())
+        self.cache.pipeline.assert_not_called()
+
+    async def test_job_builds_digests_and_reminds(self):
+        self.cache.set.return_value = True
+        user_id = uuid.uuid4()
+        rows = [make_contact(1, "first", date(1990, 5, 1), user_id=user_id, user_email="a@example.com",
+                             username="a"),
+                make_contact(2, "second", date(1990, 5, 2), user_id=user_id, user_email="a@example.com",
+                             username="a")]
+
+        @contextlib.asynccontextmanager
+        async def session(reraise=False):
+            yield self.session
+
+        with patch('src.services.birthdays.contact_databases', return_value=[SimpleNamespace(session=session)]), \
+                patch('src.repository.contacts.get_all_birthdays', AsyncMock(return_value=rows)), \
+                patch('src.services.birthdays.send_birthday_reminder', AsyncMock()) as send_reminder, \
+                patch.object(config, 'BIRTHDAY_REMINDERS_ENABLED', True):
+            self.assertTrue(await birthday_digest_job.run_once())
+        self.assertEqual(self.cache.set.call_args.args[0], LOCK_KEY)
+        pipe = self.cache.pipeline.return_value
+        pipe.set.assert_called_once()
+        self.assertEqual(pipe.set.call_args.args[0], f"birthday_digest:{user_id}")
+        # Never over a digest or an invalidation written since the query
+        self.assertTrue(pipe.set.call_args.kwargs["nx"])
+        pipe.execute.assert_called_once()
+        send_reminder.assert_awaited_once()
+        email, username, contacts = send_reminder.call_args.args
+        self.assertEqual((email, username), ("a@example.com", "a"))
+        self.assertEqual([contact["birthday"] for contact in contacts], ["01.05", "02.05"])
+
+    async def test_job_fails_when_query_fails(self):
+        self.cache.set.return_value = True
+        database = DatabaseSessionManager("sqlite+aiosqlite://")
+        self.addAsyncCleanup(database.close)
+
+        failing_query = AsyncMock(side_effect=ConnectionError("shard down"))
+        with patch('src.services.birthdays.contact_databases', return_value=[database]), \
+                patch('src.repository.contacts.get_all_birthdays', failing_query):
+            with self.assertRaises(ConnectionError):
+                await birthday_digest_job.run_once()
+        self.cache.delete.assert_called_once_with(LOCK_KEY)
+        self.cache.pipeline.assert_not_called()
@@ -0,0 +1,35 @@
+import unittest
+
+from src.services.bulk_validation import contacts_bulk_adapter, users_bulk_adapter, validate_rows
+
+contact = {"name": "Tsiri", "last_name": "Plushka", "email": "Cat@CatMail.com", "phone_number": "+380501234567",
+           "birthday": "2023-09-01"}
+
+
+class TestBulkValidation(unittest.TestCase):
+
+    def test_valid_rows(self):
+        valid, errors = validate_rows(contacts_bulk_adapter, [contact, {**contact, "name": "Murchyk"}])
+
+        self.assertEqual(errors, [])
+        self.assertEqual([body.name for body in valid], ["Tsiri", "Murchyk"])
+        self.assertEqual(valid[0].email, "Cat@catmail.com")
+
+    def test_errors_by_row_index(self):
+        rows = [contact, {**contact, "email": "cat"}, contact, "not a row", {**contact, "name": "Ts", "birthday": "-"}]
+
+        valid, errors = validate_rows(contacts_bulk_adapter, rows)
+
+        self.assertEqual(len(valid), 2)
+        self.assertEqual([(error["index"], error["field"]) for error in errors],
+                         [(1, "email"), (3, None), (4, "name"), (4, "birthday")])
+        self.assertTrue(errors[0]["message"].startswith("value is not a valid email address"))
+
+    def test_users(self):
+        rows = [{"username": "cat", "email": "cat@catmail.com", "password": "secret"},
+                {"username": "cat", "email": "cat@catmail", "password": "secret"}]
+
+        valid, errors = validate_rows(users_bulk_adapter, rows)
+
+        self.assertEqual([user.email for user in valid], ["cat@catmail.com"])
+        self.assertEqual([(error["index"], error["field"]) for error in errors], [(1, "email")])
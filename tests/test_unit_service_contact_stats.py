@@ -0,0 +1,75 @@
+import unittest
+import uuid
+from datetime import date
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from redis.exceptions import WatchError
+
+from src.entity.models import User
+from src.services.contact_stats import get_contact_stats, record_contacts_changed
+
+
+class TestAsyncContactStats(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.user = User(id=uuid.uuid4(), username='Tsiri', email='I_am_cat_not@catmail.com')
+        self.session = AsyncMock()
+        self.cache = MagicMock()
+        patcher = patch('src.services.cache_redis.cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_stats_from_cache(self):
+        self.cache.hgetall.return_value = {b"ready": b"1", b"total": b"3", b"month:4": b"2", b"month:12": b"1"}
+        with patch('src.repository.contacts.count_contacts_by_month', AsyncMock()) as count:
+            result = await get_contact_stats(self.user, self.session)
+        count.assert_not_called()
+        self.assertEqual(result["total"], 3)
+        self.assertEqual(result["by_month"][4], 2)
+        self.assertEqual(result["by_month"][1], 0)
+
+    async def test_stats_recounted_without_complete_hash(self):
+        # Increments alone leave a hash without the "ready" field
+        self.cache.hgetall.return_value = {b"total": b"1", b"month:5": b"1"}
+        with patch('src.repository.contacts.count_contacts_by_month', AsyncMock(return_value={5: 2, 7: 1})):
+            result = await get_contact_stats(self.user, self.session)
+        self.assertEqual(result["total"], 3)
+        self.assertEqual(result["by_month"][5], 2)
+        pipe = self.cache.pipeline.return_value
+        pipe.watch.assert_called_once_with(f"contact_stats:{self.user.id}")
+        mapping = pipe.hset.call_args.kwargs["mapping"]
+        self.assertEqual(mapping["total"], 3)
+        self.assertEqual(mapping["month:7"], 1)
+
+    async def test_stats_not_stored_after_concurrent_write(self):
+        # A write changed the hash between the WATCH and the count
+        self.cache.hgetall.return_value = {}
+        self.cache.pipeline.return_value.execute.side_effect = WatchError
+        with patch('src.repository.contacts.count_contacts_by_month', AsyncMock(return_value={5: 2})):
+            result = await get_contact_stats(self.user, self.session)
+        self.assertEqual(result["total"], 2)
+        self.cache.pipeline.return_value.reset.assert_called_once()
+
+    def test_record_contacts_changed(self):
+        record_contacts_changed(self.user, added=[date(1990, 5, 1), date(1991, 5, 2)], removed=[date(1990, 7, 1)])
+        pipe = self.cache.pipeline.return_value
+        key = f"contact_stats:{self.user.id}"
+        self.assertEqual({call.args for call in pipe.hincrby.call_args_list},
+                         {(key, "total", 1), (key, "month:5", 2), (key, "month:7", -1)})
+        # Sets the TTL of a hash the increments create, never extends it
+        pipe.expire.assert_called_once_with(key, 86400, nx=True)
+        pipe.execute.assert_called_once()
+
+    def test_record_birthday_moved_by_update(self):
+        record_contacts_changed(self.user, added=[date(1990, 5, 1)], removed=[date(1990, 7, 1)])
+        key = f"contact_stats:{self.user.id}"
+        self.assertEqual({call.args for call in self.cache.pipeline.return_value.hincrby.call_args_list},
+                         {(key, "month:5", 1), (key, "month:7", -1)})
+
+    def test_record_update_within_month(self):
+        record_contacts_changed(self.user, added=[date(1990, 5, 1)], removed=[date(1990, 5, 20)])
+        self.cache.pipeline.assert_not_called()
+
+    def test_record_nothing(self):
+        record_contacts_changed(self.user)
+        self.cache.pipeline.assert_not_called()
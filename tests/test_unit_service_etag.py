@@ -0,0 +1,78 @@
+import unittest
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from src.services.auth import auth_service
+from src.services.etag import data_version, bump_data_version, make_etag, etag_guard, daily_etag_guard, etag_headers
+
+
+def make_request(path: str = "/rest_api/contacts/", query: str = "", headers: dict | None = None) -> Request:
+    raw_headers = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query.encode(),
+                    "headers": raw_headers, "server": ("testserver", 80), "scheme": "http"})
+
+
+class TestAsyncEtag(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.email = 'I_am_cat_not@catmail.com'
+        self.cache = MagicMock()
+        self.cache.get.return_value = b"3"
+        patcher = patch('src.services.cache_redis.cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncSetUp(self):
+        self.token = await auth_service.create_access_token(data={"sub": self.email})
+
+    def test_data_version(self):
+        self.assertEqual(data_version(self.email), 3)
+        self.cache.get.return_value = None
+        self.assertEqual(data_version(self.email), 0)
+
+    def test_bump_data_version(self):
+        bump_data_version(self.email)
+        self.cache.incr.assert_called_once_with(f"data_version:{self.email.lower()}")
+
+    def test_make_etag(self):
+        etag = make_etag(self.email, 3, make_request())
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(etag, make_etag(self.email, 3, make_request()))
+        self.assertNotEqual(etag, make_etag(self.email, 4, make_request()))
+        self.assertNotEqual(etag, make_etag(self.email, 3, make_request(query="limit=20")))
+
+    def test_make_etag_day(self):
+        today = date.today()
+        etag = make_etag(self.email, 3, make_request(), today)
+        self.assertNotEqual(etag, make_etag(self.email, 3, make_request()))
+        self.assertNotEqual(etag, make_etag(self.email, 3, make_request(), today + timedelta(days=1)))
+
+    async def test_etag_guard_sets_etag(self):
+        request = make_request(headers={"Authorization": f"Bearer {self.token}"})
+        await etag_guard(request)
+        self.assertEqual(etag_headers(request), {"ETag": make_etag(self.email, 3, request)})
+
+    async def test_etag_guard_not_modified(self):
+        etag = make_etag(self.email, 3, make_request())
+        request = make_request(headers={"Authorization": f"Bearer {self.token}", "If-None-Match": etag})
+        with self.assertRaises(HTTPException) as context:
+            await etag_guard(request)
+        self.assertEqual(context.exception.status_code, 304)
+        self.assertEqual(context.exception.headers, {"ETag": etag})
+
+    async def test_daily_etag_guard_changes_at_midnight(self):
+        yesterday = date.today() - timedelta(days=1)
+        etag = make_etag(self.email, 3, make_request(path="/rest_api/contacts/birthdate/"), yesterday)
+        request = make_request(path="/rest_api/contacts/birthdate/",
+                               headers={"Authorization": f"Bearer {self.token}", "If-None-Match": etag})
+        await daily_etag_guard(request)
+        self.assertEqual(etag_headers(request), {"ETag": make_etag(self.email, 3, request, date.today())})
+
+    async def test_etag_guard_without_token(self):
+        request = make_request(headers={"If-None-Match": "*"})
+        await etag_guard(request)
+        self.assertIsNone(etag_headers(request))
+        self.cache.get.assert_not_called()
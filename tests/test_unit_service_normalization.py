@@ -0,0 +1,49 @@
+import unittest
+
+from pydantic import EmailStr, TypeAdapter, ValidationError
+
+from src.entity.models import Contact
+from src.services.normalization import EmailAddress, normalize_email, normalize_phone
+
+
+class TestNormalization(unittest.TestCase):
+
+    def test_normalize_email(self):
+        self.assertEqual(normalize_email("  Cat.Not@CatMail.com "), "cat.not@catmail.com")
+        self.assertIsNone(normalize_email(""))
+        self.assertIsNone(normalize_email(None))
+
+    def test_normalize_phone(self):
+        for phone_number in ("+380 (50) 123-45-67", "380501234567", "050 123 45 67", "00380501234567",
+                             "501234567"):
+            with self.subTest(phone_number=phone_number):
+                self.assertEqual(normalize_phone(phone_number), "+380501234567")
+
+    def test_normalize_phone_country_code(self):
+        self.assertEqual(normalize_phone("030 1234567", country_code="49"), "+49301234567")
+        self.assertEqual(normalize_phone("+1 (202) 555-0143", country_code="49"), "+12025550143")
+
+    def test_normalize_phone_invalid(self):
+        self.assertIsNone(normalize_phone("+12"))
+        self.assertIsNone(normalize_phone("+1234567890123456"))
+        self.assertIsNone(normalize_phone(None))
+
+    def test_contact_keys_follow_values(self):
+        contact = Contact(email="Cat@CatMail.com", phone_number="050 123 45 67")
+        self.assertEqual((contact.email_key, contact.phone_key), ("cat@catmail.com", "+380501234567"))
+        contact.phone_number = "+1 202 555 0143"
+        self.assertEqual(contact.phone_key, "+12025550143")
+
+    def test_email_address_matches_email_str(self):
+        email_str, email_address = TypeAdapter(EmailStr), TypeAdapter(EmailAddress)
+        for value in ("Cat.Not@CatMail.COM", " cat@catmail.com", "Cat <cat@catmail.com>", "кіт@catmail.com",
+                      "cat@мур.укр", "a" * 65 + "@catmail.com", "cat..not@catmail.com", "cat@localhost", "cat@"):
+            with self.subTest(value=value):
+                try:
+                    expected = email_str.validate_python(value)
+                except ValidationError as error:
+                    with self.assertRaises(ValidationError) as raised:
+                        email_address.validate_python(value)
+                    self.assertEqual(raised.exception.errors()[0]["msg"], error.errors()[0]["msg"])
+                else:
+                    self.assertEqual(email_address.validate_python(value), expected)
@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.services.auth import auth_service
+from src.services.refresh_tokens import (store_refresh_token, consume_refresh_token,
+                                         revoke_all_refresh_tokens, ACTIVE, USED)
+
+
+class TestAsyncRefreshTokens(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.email = 'I_am_cat_not@catmail.com'
+        self.cache = MagicMock()
+        patcher = patch('src.services.cache_redis.cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_store_refresh_token(self):
+        token = await auth_service.create_refresh_token(data={"sub": self.email}, expires_delta=3600)
+        await store_refresh_token(self.email, token)
+        pipe = self.cache.pipeline.return_value
+        key, value = pipe.set.call_args.args
+        self.assertTrue(key.startswith(f"refresh_token:{self.email.lower()}:"))
+        self.assertNotIn(token, key)
+        self.assertEqual(value, ACTIVE)
+        self.assertTrue(3590 <= pipe.set.call_args.kwargs["ex"] <= 3600)
+        pipe.execute.assert_called_once()
+
+    async def test_consume_active_token(self):
+        self.cache.set.return_value = ACTIVE
+        result = await consume_refresh_token(self.email, "token")
+        self.assertTrue(result)
+        self.cache.delete.assert_not_called()
+
+    async def test_consume_unknown_token(self):
+        self.cache.set.return_value = None
+        result = await consume_refresh_token(self.email, "token")
+        self.assertFalse(result)
+        self.cache.delete.assert_not_called()
+
+    async def test_consume_reused_token_revokes_all(self):
+        self.cache.set.return_value = USED
+        self.cache.smembers.return_value = {b"hash_1", b"hash_2"}
+        result = await consume_refresh_token(self.email, "token")
+        self.assertFalse(result)
+        self.cache.delete.assert_called_once()
+        deleted = self.cache.delete.call_args.args
+        self.assertIn(f"refresh_token:{self.email.lower()}:hash_1", deleted)
+        self.assertIn(f"refresh_token:{self.email.lower()}:hash_2", deleted)
+
+    async def test_revoke_all_refresh_tokens(self):
+        self.cache.smembers.return_value = set()
+        await revoke_all_refresh_tokens(self.email)
+        self.cache.delete.assert_called_once_with(f"refresh_tokens:{self.email.lower()}")
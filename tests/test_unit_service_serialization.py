@@ -0,0 +1,30 @@
+import json
+import unittest
+from datetime import date
+
+from src.entity.models import Contact
+from src.schemas.contact import ContactResponse
+from src.services.serialization import render, contacts_adapter, token_adapter, FastJSONResponse
+
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        self.contacts = [Contact(id=i, name=f"Tsiri_{i}", last_name="Plushka", email=f"cat_{i}@catmail.com",
+                                 phone_number="+380501234567", birthday=date(2023, 9, i)) for i in range(1, 4)]
+
+    def test_render_contacts(self):
+        result = json.loads(render(contacts_adapter, self.contacts))
+        expected = [json.loads(ContactResponse.model_validate(contact, from_attributes=True).model_dump_json())
+                    for contact in self.contacts]
+        self.assertEqual(result, expected)
+        self.assertEqual(result[0]["birthday"], "2023-09-01")
+
+    def test_render_token(self):
+        result = json.loads(render(token_adapter, {"access_token": "access", "refresh_token": "refresh"}))
+        self.assertEqual(result, {"access_token": "access", "refresh_token": "refresh", "token_type": "bearer"})
+
+    def test_fast_json_response(self):
+        response = FastJSONResponse({"message": "Привіт", "ids": [1, 2]})
+        self.assertEqual(json.loads(response.body), {"message": "Привіт", "ids": [1, 2]})
+        self.assertEqual(response.media_type, "application/json")
@@ -0,0 +1,115 @@
+import asyncio
+import copy
+import pickle
+import threading
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.routes.contacts import contacts_rate_limit
+from src.services.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.flight = SingleFlight("test")
+        self.flight.enabled = True
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def read(self, result="contacts"):
+        self.calls += 1
+        await self.release.wait()
+        return result
+
+    async def run_concurrently(self, *calls):
+        tasks = [asyncio.create_task(call) for call in calls]
+        await asyncio.sleep(0)
+        self.release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def test_identical_calls_share_one_read(self):
+        results = await self.run_concurrently(*(self.flight.do("key", self.read) for _ in range(5)))
+
+        self.assertEqual(results, ["contacts"] * 5)
+        self.assertEqual(self.calls, 1)
+
+    async def test_other_keys_and_later_calls_read_again(self):
+        await self.run_concurrently(self.flight.do("key", self.read), self.flight.do("other", self.read))
+        await self.flight.do("key", self.read)
+
+        self.assertEqual(self.calls, 3)
+
+    async def test_disabled(self):
+        self.flight.enabled = False
+
+        await self.run_concurrently(*(self.flight.do("key", self.read) for _ in range(3)))
+
+        self.assertEqual(self.calls, 3)
+
+    async def test_error_raised_in_every_caller(self):
+        async def fail():
+            await self.read()
+            raise ValueError("database is gone")
+
+        results = await self.run_concurrently(self.flight.do("key", fail), self.flight.do("key", self.read))
+
+        self.assertEqual([type(result) for result in results], [ValueError, ValueError])
+        self.assertEqual(self.calls, 1)
+
+    async def test_follower_reads_itself_when_leader_is_cancelled(self):
+        leader = asyncio.create_task(self.flight.do("key", self.read))
+        follower = asyncio.create_task(self.flight.do("key", self.read))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+
+        self.assertEqual(await follower, "contacts")
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(self.calls, 2)
+
+    async def test_followers_get_own_copies(self):
+        self.flight = SingleFlight("test", share=copy.deepcopy, unshare=copy.deepcopy)
+        self.flight.enabled = True
+        user = {"email": "cat@catmail.com"}
+
+        results = await self.run_concurrently(*(self.flight.do("key", lambda: self.read(user)) for _ in range(3)))
+
+        self.assertIs(results[0], user)
+        self.assertEqual(results[1:], [user, user])
+        self.assertIsNot(results[1], results[2])
+
+    async def test_followers_fail_when_result_cannot_be_shared(self):
+        self.flight = SingleFlight("test", share=pickle.dumps, unshare=pickle.loads)
+        self.flight.enabled = True
+
+        results = await asyncio.wait_for(self.run_concurrently(
+            *(self.flight.do("key", lambda: self.read(threading.Lock())) for _ in range(3))), timeout=1)
+
+        self.assertEqual([type(result) for result in results], [TypeError] * 3)
+
+    async def test_running(self):
+        task = asyncio.create_task(self.flight.do("key", self.read))
+        await asyncio.sleep(0)
+
+        self.assertTrue(self.flight.running("key"))
+        self.assertFalse(self.flight.running("other"))
+        self.release.set()
+        await task
+        self.assertFalse(self.flight.running("key"))
+
+    async def test_contacts_rate_limit_skipped_for_running_read(self):
+        request = MagicMock()
+        request.state.etag = 'W/"page"'
+        with patch("src.routes.contacts.contacts_flight", self.flight), \
+                patch("src.routes.contacts.contacts_rate_limiter", AsyncMock()) as limiter:
+            await contacts_rate_limit(request, MagicMock())
+            task = asyncio.create_task(self.flight.do('W/"page"', self.read))
+            await asyncio.sleep(0)
+            await contacts_rate_limit(request, MagicMock())
+            self.release.set()
+            await task
+
+        limiter.assert_called_once()